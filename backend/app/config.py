@@ -9,6 +9,20 @@ class Settings:
     FIREBASE_PROJECT_ID: str = os.getenv("FIREBASE_PROJECT_ID", "delhi-water-logging")
     FRONTEND_URL: str = os.getenv("FRONTEND_URL", "http://localhost:3000")
     
+    # Firebase ID token verification (signing certs cached per their Cache-Control)
+    FIREBASE_CERTS_URL: str = os.getenv(
+        "FIREBASE_CERTS_URL",
+        "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com",
+    )
+    AUTH_CLAIMS_CACHE_SIZE: int = 10000  # verified tokens kept in memory
+    AUTH_CLAIMS_CACHE_SECONDS: int = 300
+    
+    # Connection pools (sync psycopg2 engine and async asyncpg engine each get one)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds waiting for a connection
+    
     # Risk calculation weights
     WEIGHT_RAINFALL: float = 0.35
     WEIGHT_RECURRENCE: float = 0.25
@@ -16,12 +30,60 @@ class Settings:
     WEIGHT_DRAINAGE: float = 0.10
     WEIGHT_POPULATION: float = 0.10
     
+    # Risk level thresholds (score >= threshold)
+    RISK_THRESHOLD_MEDIUM: float = 0.3
+    RISK_THRESHOLD_HIGH: float = 0.6
+    
+    # How long the what-if simulation reuses its ward feature matrix (seconds)
+    SIMULATION_CACHE_SECONDS: int = 300
+    
+    # Report-driven ward risk updates: each dirty ward is recomputed at most once per window
+    RISK_DEBOUNCE_SECONDS: float = float(os.getenv("RISK_DEBOUNCE_SECONDS", "10"))
+    
+    # Published risk snapshots: rows kept in risk_snapshots / versions kept in memory
+    RISK_SNAPSHOT_KEEP: int = int(os.getenv("RISK_SNAPSHOT_KEEP", "1000"))
+    RISK_SNAPSHOT_MEMORY: int = 8
+    
+    # Reports table: monthly partitions created ahead, and retention (0 = keep everything)
+    REPORT_PARTITIONS_AHEAD: int = 2
+    REPORT_RETENTION_MONTHS: int = int(os.getenv("REPORT_RETENTION_MONTHS", "0"))
+    REPORT_RETENTION_MODE: str = os.getenv("REPORT_RETENTION_MODE", "archive")  # archive | drop
+    
+    # Ward risk history retention (daily rollups are kept forever)
+    HISTORY_RAW_RETENTION_DAYS: int = int(os.getenv("HISTORY_RAW_RETENTION_DAYS", "180"))
+    HISTORY_HOURLY_RETENTION_DAYS: int = int(os.getenv("HISTORY_HOURLY_RETENTION_DAYS", "730"))
+    HISTORY_TIMEZONE: str = os.getenv("HISTORY_TIMEZONE", "Asia/Kolkata")  # hour/day rollup boundaries
+    
     # Hotspot detection thresholds
     HOTSPOT_MIN_REPORTS: int = 5
     HOTSPOT_RADIUS_METERS: float = 100
     HOTSPOT_MIN_DAYS: int = 3
+    HOTSPOT_FULL_REBUILD_HOURS: int = 24  # between incremental runs, re-cluster everything
+    HOTSPOT_ENGINE: str = os.getenv("HOTSPOT_ENGINE", "postgis")  # postgis | python (full rebuilds)
     
     # Weather cache duration (seconds)
     WEATHER_CACHE_DURATION: int = 1800  # 30 minutes
+    WEATHER_MEMORY_CACHE_SIZE: int = 4096  # entries in the in-process tier
+
+    # Weather fetching (override the base URL to point at a mock server)
+    OPENWEATHER_BASE_URL: str = os.getenv("OPENWEATHER_BASE_URL", "https://api.openweathermap.org/data/2.5/weather")
+    WEATHER_MAX_CONCURRENCY: int = int(os.getenv("WEATHER_MAX_CONCURRENCY", "10"))
+    WEATHER_TIMEOUT_SECONDS: float = float(os.getenv("WEATHER_TIMEOUT_SECONDS", "10"))
+    WEATHER_MAX_RETRIES: int = int(os.getenv("WEATHER_MAX_RETRIES", "3"))
+    WEATHER_RATE_PER_MINUTE: int = int(os.getenv("WEATHER_RATE_PER_MINUTE", "60"))  # free-tier quota
+
+    # Rainfall grid: one observation per cell, IDW-interpolated to ward centroids
+    WEATHER_GRID_DEG: float = float(os.getenv("WEATHER_GRID_DEG", "0.05"))  # ~5.5 km
+    WEATHER_IDW_POWER: float = 2.0
+
+    # Write-behind report ingestion (journal + micro-batched inserts)
+    INGEST_JOURNAL_PATH: str = os.getenv("INGEST_JOURNAL_PATH", "data/ingest/reports.jsonl")
+    INGEST_BATCH_SIZE: int = int(os.getenv("INGEST_BATCH_SIZE", "500"))
+    INGEST_FLUSH_MS: int = int(os.getenv("INGEST_FLUSH_MS", "200"))
+    INGEST_FSYNC: bool = os.getenv("INGEST_FSYNC", "false").lower() == "true"  # fsync every append
+    INGEST_STOP_TIMEOUT_SECONDS: float = float(os.getenv("INGEST_STOP_TIMEOUT_SECONDS", "10"))
+
+    # Vector tile LRU size (encoded tiles kept in memory)
+    TILE_CACHE_SIZE: int = int(os.getenv("TILE_CACHE_SIZE", "2048"))
 
 settings = Settings()
@@ -1,15 +1,94 @@
+import ssl
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+POOL_OPTIONS = dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=True,
+)
+
+engine = create_engine(settings.DATABASE_URL, **POOL_OPTIONS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# libpq query parameters asyncpg.connect() doesn't take; translated or dropped below
+LIBPQ_ONLY_PARAMS = (
+    "sslmode", "sslrootcert", "sslcert", "sslkey", "sslcrl", "sslpassword",
+    "connect_timeout", "application_name", "options", "target_session_attrs",
+    "channel_binding", "gssencmode", "keepalives", "keepalives_idle",
+)
+
+
+def asyncpg_url(database_url: str) -> tuple[URL, dict]:
+    """
+    The psycopg-style DATABASE_URL as an asyncpg URL plus connect_args:
+    sslmode (and ssl cert files) -> ssl, connect_timeout -> timeout,
+    application_name -> server_settings; other libpq-only parameters dropped
+    """
+    url = make_url(database_url)
+    query = url.query
+    connect_args = {}
+
+    sslmode = query.get("sslmode")
+    if any(query.get(name) for name in ("sslrootcert", "sslcert", "sslkey")):
+        context = ssl.create_default_context(cafile=query.get("sslrootcert"))
+        if query.get("sslcert"):
+            context.load_cert_chain(query["sslcert"], query.get("sslkey"))
+        # Like libpq: only verify-full checks the host name, only verify-* (or a root cert) the chain
+        context.check_hostname = sslmode == "verify-full"
+        if not query.get("sslrootcert") and sslmode not in ("verify-ca", "verify-full"):
+            context.verify_mode = ssl.CERT_NONE
+        connect_args["ssl"] = context
+    elif sslmode:
+        connect_args["ssl"] = sslmode  # asyncpg takes the libpq mode names
+    if query.get("connect_timeout"):
+        connect_args["timeout"] = float(query["connect_timeout"])
+    if query.get("application_name"):
+        connect_args["server_settings"] = {"application_name": query["application_name"]}
+
+    url = url.difference_update_query(LIBPQ_ONLY_PARAMS).set(drivername="postgresql+asyncpg")
+    return url, connect_args
+
+
+# Same database through asyncpg, for hot read endpoints that must not block the event loop
+_async_url, _async_connect_args = asyncpg_url(settings.DATABASE_URL)
+async_engine = create_async_engine(
+    _async_url,
+    connect_args=_async_connect_args,
+    **POOL_OPTIONS,
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def pool_status() -> dict:
+    """Connection pool counters for the sync and async engines"""
+    def describe(pool):
+        return {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+        }
+
+    return {
+        "sync": describe(engine.pool),
+        "async": describe(async_engine.sync_engine.pool),
+    }
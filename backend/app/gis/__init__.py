@@ -1,3 +1,4 @@
 from .operations import GISOperations
+from .ward_index import WardIndex, ward_index
 
-__all__ = ["GISOperations"]
+__all__ = ["GISOperations", "WardIndex", "ward_index"]
@@ -0,0 +1,197 @@
+import math
+import numpy as np
+
+EARTH_RADIUS_M = 6371008.8
+
+# Candidate point pairs materialized per vectorized step (bounds peak memory)
+PAIR_CHUNK = 4_000_000
+
+# Neighbouring grid cells visited from each cell. Only half the 3x3 block,
+# so every unordered cell pair is seen exactly once.
+_HALF_NEIGHBOURHOOD = ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1))
+
+
+def project_to_metres(lat: np.ndarray, lng: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Local equirectangular projection around the cloud's mean latitude (fine at city scale)"""
+    lat0 = float(np.mean(lat)) if len(lat) else 0.0
+    k = math.pi / 180.0 * EARTH_RADIUS_M
+    return lng * k * math.cos(math.radians(lat0)), lat * k
+
+
+def _compress(parent: np.ndarray) -> None:
+    """Point every node straight at its root (pointer doubling, O(n log depth))"""
+    while True:
+        grand = parent[parent]
+        if np.array_equal(grand, parent):
+            return
+        parent[:] = grand
+
+
+def _union(parent: np.ndarray, a: np.ndarray, b: np.ndarray) -> None:
+    """Vectorized union; conflicting writes are simply retried until all pairs agree"""
+    while len(a):
+        _compress(parent)
+        ra, rb = parent[a], parent[b]
+        differ = ra != rb
+        if not differ.any():
+            return
+        ra, rb = ra[differ], rb[differ]
+        parent[np.maximum(ra, rb)] = np.minimum(ra, rb)
+        a, b = a[differ], b[differ]
+
+
+def _cell_pair_tasks(cx: np.ndarray, cy: np.ndarray):
+    """
+    Sort points by grid cell and list (a_start, a_count, b_start, b_count, same_cell)
+    blocks to compare, with big blocks split so no block exceeds PAIR_CHUNK pairs
+    """
+    span = int(cy.max() - cy.min()) + 3
+    key = (cx - cx.min() + 1) * span + (cy - cy.min() + 1)
+    order = np.argsort(key, kind="stable")
+    cells, starts, counts = np.unique(key[order], return_index=True, return_counts=True)
+
+    a_start, a_count, b_start, b_count, same = [], [], [], [], []
+    for dx, dy in _HALF_NEIGHBOURHOOD:
+        target = cells + dx * span + dy
+        idx = np.searchsorted(cells, target)
+        idx[idx >= len(cells)] = 0
+        found = cells[idx] == target
+        a_start.append(starts[found])
+        a_count.append(counts[found])
+        b_start.append(starts[idx[found]])
+        b_count.append(counts[idx[found]])
+        same.append(np.full(found.sum(), dx == 0 and dy == 0))
+
+    a_start, a_count = np.concatenate(a_start), np.concatenate(a_count)
+    b_start, b_count = np.concatenate(b_start), np.concatenate(b_count)
+    same = np.concatenate(same)
+
+    # Split blocks whose a-side is too tall into row blocks
+    rows = np.maximum(1, PAIR_CHUNK // b_count)
+    pieces = -(-a_count // rows)
+    owner = np.repeat(np.arange(len(a_count)), pieces)
+    piece = np.arange(len(owner)) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    offset = piece * rows[owner]
+    return (
+        order,
+        a_start[owner] + offset,
+        np.minimum(rows[owner], a_count[owner] - offset),
+        b_start[owner],
+        b_count[owner],
+        same[owner],
+    )
+
+
+def _iter_close_pairs(x, y, eps, tasks):
+    """Yield (i, j) index arrays (into sorted order) of point pairs within eps"""
+    _, a_start, a_count, b_start, b_count, same = tasks
+    sizes = a_count * b_count
+    eps2 = eps * eps
+
+    begin = 0
+    bounds = np.cumsum(sizes)
+    while begin < len(sizes):
+        end = max(begin + 1, int(np.searchsorted(bounds, bounds[begin] - sizes[begin] + PAIR_CHUNK, "right")))
+        s = sizes[begin:end]
+        owner = np.repeat(np.arange(begin, end), s)
+        t = np.arange(int(s.sum())) - np.repeat(np.cumsum(s) - s, s)
+        i = a_start[owner] + t // b_count[owner]
+        j = b_start[owner] + t % b_count[owner]
+
+        keep = ~same[owner] | (i < j)
+        i, j = i[keep], j[keep]
+        close = (x[i] - x[j]) ** 2 + (y[i] - y[j]) ** 2 <= eps2
+        yield i[close], j[close]
+        begin = end
+
+
+def dbscan(x: np.ndarray, y: np.ndarray, eps: float, min_points: int) -> np.ndarray:
+    """
+    DBSCAN over projected coordinates using a grid hash with cell size eps.
+    Same semantics as ST_ClusterDBSCAN: a point is core when at least
+    `min_points` points (itself included) lie within eps. Returns cluster
+    labels 0..k-1 per input point, -1 for noise.
+    """
+    n = len(x)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    tasks = _cell_pair_tasks(np.floor(x / eps).astype(np.int64), np.floor(y / eps).astype(np.int64))
+    order = tasks[0]
+    xs, ys = x[order], y[order]
+
+    # Pass 1: neighbour counts
+    neighbours = np.ones(n, dtype=np.int64)
+    for i, j in _iter_close_pairs(xs, ys, eps, tasks):
+        neighbours += np.bincount(i, minlength=n) + np.bincount(j, minlength=n)
+    core = neighbours >= min_points
+
+    # Pass 2: connect core points, remember one core neighbour per border point
+    parent = np.arange(n)
+    border_of = np.full(n, -1, dtype=np.int64)
+    for i, j in _iter_close_pairs(xs, ys, eps, tasks):
+        both = core[i] & core[j]
+        _union(parent, i[both], j[both])
+        border_of[j[core[i] & ~core[j]]] = i[core[i] & ~core[j]]
+        border_of[i[core[j] & ~core[i]]] = j[core[j] & ~core[i]]
+
+    _compress(parent)
+    roots = np.where(core, parent, -1)
+    border = np.flatnonzero(~core & (border_of >= 0))
+    roots[border] = roots[border_of[border]]
+
+    labels_sorted = np.full(n, -1, dtype=np.int64)
+    clustered = roots >= 0
+    labels_sorted[clustered] = np.unique(roots[clustered], return_inverse=True)[1]
+
+    labels = np.empty(n, dtype=np.int64)
+    labels[order] = labels_sorted
+    return labels
+
+
+def detect_hotspots(
+    lat: np.ndarray,
+    lng: np.ndarray,
+    created_at: np.ndarray,
+    ward_id: np.ndarray,
+    radius_m: float,
+    min_reports: int,
+    min_days: int,
+) -> dict:
+    """
+    Cluster reports and keep clusters with at least `min_reports` reports on
+    at least `min_days` distinct (UTC) days. `created_at` is epoch seconds,
+    `ward_id` uses -1 for unknown. Returns columnar arrays: latitude,
+    longitude, report_count, ward_id, last_occurrence (epoch seconds), labels.
+    """
+    created_at = created_at.astype(np.int64)
+    day = created_at // 86400
+    x, y = project_to_metres(lat, lng)
+    labels = dbscan(x, y, radius_m, min_reports)
+
+    member = labels >= 0
+    k = int(labels.max()) + 1 if member.any() else 0
+    lab = labels[member]
+
+    counts = np.bincount(lab, minlength=k)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        latitude = np.bincount(lab, weights=lat[member], minlength=k) / counts
+        longitude = np.bincount(lab, weights=lng[member], minlength=k) / counts
+
+    distinct = np.unique(np.stack([lab, day[member]]), axis=1)
+    days = np.bincount(distinct[0], minlength=k)
+
+    last_occurrence = np.full(k, np.iinfo(np.int64).min, dtype=np.int64)
+    np.maximum.at(last_occurrence, lab, created_at[member])
+    wards = np.full(k, -1, dtype=np.int64)
+    np.maximum.at(wards, lab, ward_id[member].astype(np.int64))
+
+    keep = (counts >= min_reports) & (days >= min_days)
+    return {
+        "latitude": latitude[keep],
+        "longitude": longitude[keep],
+        "report_count": counts[keep],
+        "ward_id": wards[keep],
+        "last_occurrence": last_occurrence[keep],
+        "labels": labels,
+    }
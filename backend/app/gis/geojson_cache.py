@@ -0,0 +1,195 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import threading
+from typing import Awaitable, Callable, NamedTuple
+from fastapi import Request, Response
+
+from ..utils.cache import LRUCache
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+WARDS_KEY = "wards"
+WARDS_RISK_KEY = "wards-risk"
+RISK_CURVES_KEY = "risk-curves"
+
+# Entries kept for open-ended variants (e.g. pinned snapshot versions)
+BOUNDED_ENTRIES = 16
+
+
+def accepted_encodings(header: str) -> dict[str, float]:
+    """Accept-Encoding as {coding: q}; codings with q=0 are refused, "*" covers unlisted ones"""
+    accepted = {}
+    for token in header.split(","):
+        coding, _, params = token.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(header: str, available: tuple[str, ...]) -> str | None:
+    """Best of `available` (in server preference order) for an Accept-Encoding header; None = identity"""
+    accepted = accepted_encodings(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class HeadedPayload(NamedTuple):
+    """Builder result carrying response headers that describe this body (cached with it)"""
+    data: object
+    headers: dict
+
+
+class CachedPayload:
+    """A JSON payload serialized once, with its compressed variants, ETag and headers"""
+
+    def __init__(self, data):
+        self.headers = {}
+        if isinstance(data, HeadedPayload):
+            data, self.headers = data
+        self.body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        self.gzip = gzip.compress(self.body, compresslevel=6)
+        self.br = brotli.compress(self.body, quality=5) if brotli else None
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest() + '"'
+
+
+class GeoJSONCache:
+    """
+    Process-wide cache of pre-serialized, pre-compressed GeoJSON payloads.
+
+    Entries are built on first request and kept until invalidated by the
+    scheduler (wards reloaded or risk scores recomputed). Keys are either a
+    payload name or a (name, variant) tuple, e.g. (WARDS_KEY, tolerance).
+    Variants a caller can multiply (bounded=True) live in a small LRU
+    instead of the unbounded map. A payload whose build overlapped an
+    invalidate() is served to its caller but not stored: it may have been
+    read before the change that triggered the invalidation. Builders
+    should therefore read their inputs inside the builder, and return a
+    HeadedPayload when response headers depend on those inputs.
+    """
+
+    def __init__(self, bounded_entries: int = BOUNDED_ENTRIES):
+        self._entries: dict = {}
+        self._bounded = LRUCache(bounded_entries)
+        self._generation = 0  # bumped by every invalidate()
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._async_lock = asyncio.Lock()
+
+    def _store(self, key, entry: CachedPayload, generation: int, bounded: bool = False) -> None:
+        with self._lock:
+            if self._generation != generation:
+                return  # invalidated mid-build
+            if bounded:
+                self._bounded.set(key, entry)
+            else:
+                self._entries[key] = entry
+
+    def get(self, key, builder: Callable[[], object]) -> CachedPayload:
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        with self._build_lock:
+            # Another request may have built it while we waited
+            entry = self._entries.get(key)
+            if entry is None:
+                generation = self._generation
+                entry = CachedPayload(builder())
+                self._store(key, entry, generation)
+        return entry
+
+    async def aget(self, key, builder: Callable[[], Awaitable[object]], bounded: bool = False) -> CachedPayload:
+        """get() for async builders; serialization/compression runs off the event loop"""
+        lookup = self._bounded.get if bounded else self._entries.get
+        entry = lookup(key)
+        if entry is not None:
+            return entry
+
+        async with self._async_lock:
+            entry = lookup(key)
+            if entry is None:
+                generation = self._generation
+                entry = await asyncio.to_thread(CachedPayload, await builder())
+                self._store(key, entry, generation, bounded)
+        return entry
+
+    def invalidate(self, *names: str) -> None:
+        """Drop cached payloads (all variants of each name); with no names, drop everything"""
+        with self._lock:
+            self._generation += 1
+            if not names:
+                self._entries.clear()
+                self._bounded.clear()
+                return
+            for key in list(self._entries):
+                name = key[0] if isinstance(key, tuple) else key
+                if name in names:
+                    del self._entries[key]
+            for key in self._bounded.keys():
+                name = key[0] if isinstance(key, tuple) else key
+                if name in names:
+                    self._bounded.pop(key)
+
+    def response(self, request: Request, key, builder: Callable[[], object]) -> Response:
+        """Serve a cached payload, honouring If-None-Match and Accept-Encoding"""
+        return self.serve(request, self.get(key, builder))
+
+    async def aresponse(
+        self,
+        request: Request,
+        key,
+        builder: Callable[[], Awaitable[object]],
+        bounded: bool = False,
+    ) -> Response:
+        """response() for async builders"""
+        return self.serve(request, await self.aget(key, builder, bounded))
+
+    @staticmethod
+    def serve(request: Request, entry: CachedPayload) -> Response:
+        headers = {
+            "ETag": entry.etag,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+            **entry.headers,
+        }
+
+        if_none_match = request.headers.get("if-none-match", "")
+        if entry.etag in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+
+        available = ("br", "gzip") if entry.br is not None else ("gzip",)
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""), available)
+        if encoding == "br":
+            body = entry.br
+            headers["Content-Encoding"] = "br"
+        elif encoding == "gzip":
+            body = entry.gzip
+            headers["Content-Encoding"] = "gzip"
+        else:
+            body = entry.body
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+geojson_cache = GeoJSONCache()
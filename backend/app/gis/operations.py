@@ -1,8 +1,28 @@
+import json
+from shapely.geometry import mapping
 from sqlalchemy.orm import Session
 from sqlalchemy import text, func
 from geoalchemy2.functions import ST_Within
 from ..models import Ward, Report
+from .ward_index import ward_index
+from .simplification import SIMPLIFIED_GEOJSON_DIGITS
+from .ward_geometry import DERIVED_SELECT, WardGeometry, bbox_list, centroid_dict
 
+# Ward `w` geometry as GeoJSON at level :tol — the precomputed row in
+# ward_geometry_levels `l` when present, otherwise simplified on the fly
+WARD_GEOJSON_AT_LEVEL = f"""
+    CASE WHEN CAST(:tol AS double precision) > 0
+        THEN ST_AsGeoJSON(
+            COALESCE(l.geometry, ST_SimplifyPreserveTopology(w.geometry, :tol)),
+            {SIMPLIFIED_GEOJSON_DIGITS}
+        )
+        ELSE ST_AsGeoJSON(w.geometry)
+    END
+"""
+WARD_LEVEL_JOIN = """
+    LEFT JOIN ward_geometry_levels l
+        ON l.ward_id = w.id AND l.tolerance = :tol
+"""
 
 class GISOperations:
     @staticmethod
@@ -14,6 +34,49 @@ class GISOperations:
         ).first()
         return ward
 
+    @staticmethod
+    def find_ward_id(db: Session, lat: float, lng: float) -> int | None:
+        """Resolve ward id from the in-memory index, falling back to PostGIS if it isn't built"""
+        if ward_index.is_loaded:
+            return ward_index.find_ward_id(lat, lng)
+        ward = GISOperations.find_ward_for_point(db, lat, lng)
+        return ward.id if ward else None
+
+    @staticmethod
+    def find_ward_ids(db: Session, lats: list, lngs: list) -> list[int | None]:
+        """Batch find_ward_id: one index query, or one PostGIS join if the index isn't built"""
+        if ward_index.is_loaded:
+            return ward_index.find_ward_ids(lats, lngs)
+        if not lats:
+            return []
+
+        rows = db.execute(
+            text("""
+                SELECT p.i, (
+                    SELECT w.id FROM wards w
+                    WHERE ST_Contains(w.geometry, ST_SetSRID(ST_MakePoint(p.lng, p.lat), 4326))
+                    LIMIT 1
+                ) AS ward_id
+                FROM unnest(
+                    CAST(:lats AS double precision[]),
+                    CAST(:lngs AS double precision[])
+                ) WITH ORDINALITY AS p(lat, lng, i)
+            """),
+            {"lats": list(lats), "lngs": list(lngs)}
+        ).fetchall()
+
+        result = [None] * len(lats)
+        for row in rows:
+            result[row.i - 1] = row.ward_id
+        return result
+
+    @staticmethod
+    def ward_exists(db: Session, ward_id: int) -> bool:
+        return db.execute(
+            text("SELECT EXISTS (SELECT 1 FROM wards WHERE id = :ward_id)"),
+            {"ward_id": ward_id}
+        ).scalar()
+
     @staticmethod
     def get_ward_geometry_as_geojson(db: Session, ward_id: int) -> dict | None:
         """Get ward geometry as GeoJSON"""
@@ -27,34 +90,96 @@ class GISOperations:
         ).fetchone()
 
         if result and result[0]:
-            import json
             return json.loads(result[0])
         return None
 
     @staticmethod
-    def get_all_wards_with_geometry(db: Session) -> list:
+    def get_ward_with_geometry(db: Session, ward_id: int, simplify: float | None = None) -> dict | None:
         """
-        FINAL SAFE VERSION
-        Matches actual database schema
+        Get one ward with geometry and its stored centroid, area, bbox and
+        neighbour ids, from the in-memory store when available, otherwise
+        with a single-row query. `simplify` is a tolerance in degrees.
         """
-        result = db.execute(
-            text("""
+        if ward_index.is_loaded:
+            entry = ward_index.get(ward_id)
+            if entry is None:
+                return None
+            ward_name, geom = entry
+            if simplify:
+                geom = geom.simplify(simplify, preserve_topology=True)
+            return {
+                "id": ward_id,
+                "ward_name": ward_name,
+                "geometry": mapping(geom),
+                **ward_index.details(ward_id),
+            }
+
+        row = db.execute(
+            text(f"""
                 SELECT
                     id,
                     ward_name,
-                    ST_AsGeoJSON(geometry) AS geometry
+                    {DERIVED_SELECT},
+                    ST_AsGeoJSON(
+                        CASE WHEN CAST(:tol AS double precision) > 0
+                            THEN ST_SimplifyPreserveTopology(geometry, :tol)
+                            ELSE geometry
+                        END
+                    ) AS geometry
                 FROM wards
-                ORDER BY ward_name
-            """)
+                WHERE id = :ward_id
+            """),
+            {"ward_id": ward_id, "tol": simplify or 0.0}
+        ).fetchone()
+
+        if not row:
+            return None
+        return {
+            "id": row.id,
+            "ward_name": row.ward_name,
+            "geometry": json.loads(row.geometry) if row.geometry else None,
+            "centroid": centroid_dict(row),
+            "area_sq_km": row.area_sq_km,
+            "bbox": bbox_list(row),
+            "neighbours": WardGeometry.neighbours_of(db, ward_id),
+        }
+
+    @staticmethod
+    def get_all_wards_with_geometry(db: Session, tolerance: float = 0.0) -> list:
+        """
+        FINAL SAFE VERSION
+        Matches actual database schema
+        `tolerance` selects a precomputed simplification level (see gis.simplification)
+        """
+        result = db.execute(
+            text(f"""
+                SELECT
+                    w.id,
+                    w.ward_name,
+                    {WARD_GEOJSON_AT_LEVEL} AS geometry,
+                    w.centroid_lat,
+                    w.centroid_lng,
+                    w.area_sq_km,
+                    w.bbox_min_lng,
+                    w.bbox_min_lat,
+                    w.bbox_max_lng,
+                    w.bbox_max_lat
+                FROM wards w
+                {WARD_LEVEL_JOIN}
+                ORDER BY w.ward_name
+            """),
+            {"tol": tolerance}
         ).fetchall()
 
-        import json
         wards = []
         for row in result:
             wards.append({
                 "id": row.id,
                 "ward_name": row.ward_name,
-                "geometry": json.loads(row.geometry) if row.geometry else None
+                "geometry": json.loads(row.geometry) if row.geometry else None,
+                "centroid": centroid_dict(row),
+                "area_sq_km": row.area_sq_km,
+                "bbox": bbox_list(row)
             })
 
         return wards
@@ -0,0 +1,26 @@
+# Simplification levels (degrees) precomputed per ward by scripts/load_wards.py.
+# 0.0 is the full-resolution geometry.
+SIMPLIFY_TOLERANCES = (0.0, 0.0001, 0.0005, 0.002)
+
+# Fewer coordinate digits for simplified levels (6 digits ≈ 0.1 m)
+SIMPLIFIED_GEOJSON_DIGITS = 6
+
+
+def tolerance_for_zoom(zoom: int) -> float:
+    """Largest precomputed tolerance that stays below one pixel at this web-map zoom"""
+    degrees_per_pixel = 360.0 / (256 * 2 ** zoom)
+    return max(t for t in SIMPLIFY_TOLERANCES if t <= degrees_per_pixel)
+
+
+def snap_tolerance(tolerance: float) -> float:
+    """Snap a requested tolerance down to the nearest precomputed level"""
+    return max(t for t in SIMPLIFY_TOLERANCES if t <= tolerance)
+
+
+def resolve_tolerance(zoom: int | None = None, tolerance: float | None = None) -> float:
+    """Pick the level for a request; explicit tolerance wins over zoom"""
+    if tolerance is not None:
+        return snap_tolerance(tolerance)
+    if zoom is not None:
+        return tolerance_for_zoom(zoom)
+    return 0.0
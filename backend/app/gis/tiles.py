@@ -0,0 +1,145 @@
+import math
+from collections import OrderedDict
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..utils.cache import LRUCache
+
+# Individual reports are only drawn once the map is zoomed in this far
+REPORT_MIN_ZOOM = 12
+MAX_ZOOM = 22
+TILE_EXTENT = 4096
+
+
+def lnglat_to_tile(lng: float, lat: float, z: int) -> tuple[int, int]:
+    """Web-mercator tile (x, y) containing a point at zoom z"""
+    n = 2 ** z
+    x = int((lng + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+class TileCache(LRUCache):
+    """
+    LRU of encoded tiles keyed by (z, x, y).
+
+    Invalidations are numbered. A tile built from a query that started
+    before an invalidation of its key (or a clear) is not stored — it may
+    predate the change — so builders take generation() first and store with
+    set_if_current().
+    """
+
+    def __init__(self, maxsize: int):
+        super().__init__(maxsize)
+        self._generation = 0
+        self._cleared_at = 0
+        self._invalidated = OrderedDict()  # key -> generation it was last invalidated at
+        self._forgotten_at = 0  # newest generation dropped from _invalidated
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def _mark_invalidated(self, key) -> None:
+        self._invalidated[key] = self._generation
+        self._invalidated.move_to_end(key)
+        while len(self._invalidated) > self.maxsize:
+            _, self._forgotten_at = self._invalidated.popitem(last=False)
+
+    def invalidate_point(self, lat: float, lng: float) -> None:
+        """Drop the report-bearing tiles that contain a newly reported point"""
+        with self._lock:
+            self._generation += 1
+            for z in range(REPORT_MIN_ZOOM, MAX_ZOOM + 1):
+                x, y = lnglat_to_tile(lng, lat, z)
+                self._data.pop((z, x, y), None)
+                self._mark_invalidated((z, x, y))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._cleared_at = self._generation
+            self._data.clear()
+            self._invalidated.clear()
+
+    def set_if_current(self, key, value, generation: int) -> bool:
+        """Store a tile built after generation(); False if it was invalidated since"""
+        with self._lock:
+            newest = max(self._cleared_at, self._forgotten_at, self._invalidated.get(key, 0))
+            if newest > generation:
+                return False
+            self._store(key, value)
+            return True
+
+
+tile_cache = TileCache(settings.TILE_CACHE_SIZE)
+
+
+class VectorTiles:
+    @staticmethod
+    def build_tile(db: Session, z: int, x: int, y: int) -> bytes:
+        """Encode wards, hotspots and (zoomed-in) reports for one tile with ST_AsMVT"""
+        row = db.execute(
+            text("""
+                WITH bounds AS (
+                    SELECT
+                        ST_TileEnvelope(:z, :x, :y) AS geom,
+                        ST_Transform(ST_TileEnvelope(:z, :x, :y), 4326) AS geom_4326
+                ),
+                ward_features AS (
+                    SELECT
+                        ST_AsMVTGeom(ST_Transform(w.geometry, 3857), b.geom, :extent) AS geom,
+                        w.id AS ward_id,
+                        w.ward_name,
+                        COALESCE(w.risk_score, 0) AS risk_score,
+                        COALESCE(w.risk_level, 'LOW') AS risk_level
+                    FROM wards w, bounds b
+                    WHERE w.geometry && b.geom_4326
+                ),
+                hotspot_features AS (
+                    SELECT
+                        ST_AsMVTGeom(ST_Transform(h.location, 3857), b.geom, :extent) AS geom,
+                        h.id,
+                        h.ward_id,
+                        h.frequency,
+                        h.avg_rainfall
+                    FROM hotspots h, bounds b
+                    WHERE h.frequency > 0 AND h.location && b.geom_4326
+                ),
+                report_features AS (
+                    SELECT
+                        ST_AsMVTGeom(ST_Transform(r.location, 3857), b.geom, :extent) AS geom,
+                        r.id,
+                        r.ward_id,
+                        r.severity,
+                        EXTRACT(EPOCH FROM r.created_at)::bigint AS created_at
+                    FROM reports r, bounds b
+                    WHERE :z >= :report_min_zoom AND r.location && b.geom_4326
+                )
+                SELECT
+                    COALESCE((SELECT ST_AsMVT(f, 'wards', :extent, 'geom') FROM ward_features f), ''::bytea)
+                    || COALESCE((SELECT ST_AsMVT(f, 'hotspots', :extent, 'geom') FROM hotspot_features f), ''::bytea)
+                    || COALESCE((SELECT ST_AsMVT(f, 'reports', :extent, 'geom') FROM report_features f), ''::bytea)
+                    AS tile
+            """),
+            {
+                "z": z,
+                "x": x,
+                "y": y,
+                "extent": TILE_EXTENT,
+                "report_min_zoom": REPORT_MIN_ZOOM,
+            }
+        ).fetchone()
+
+        return bytes(row.tile) if row and row.tile else b""
+
+    @staticmethod
+    def get_tile(db: Session, z: int, x: int, y: int) -> bytes:
+        key = (z, x, y)
+        tile = tile_cache.get(key)
+        if tile is None:
+            generation = tile_cache.generation()
+            tile = VectorTiles.build_tile(db, z, x, y)
+            tile_cache.set_if_current(key, tile, generation)
+        return tile
@@ -0,0 +1,162 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Wards closer than this (degrees, ~1 m) are neighbours — source boundaries
+# rarely share vertices exactly
+NEIGHBOUR_GAP_DEG = 0.00001
+
+# Derived columns a loaded ward set must have (older tables predate them)
+DERIVED_COLUMNS = (
+    ("ward_code", "VARCHAR"),
+    ("centroid_lat", "DOUBLE PRECISION"),
+    ("centroid_lng", "DOUBLE PRECISION"),
+    ("area_sq_km", "DOUBLE PRECISION"),
+    ("bbox_min_lng", "DOUBLE PRECISION"),
+    ("bbox_min_lat", "DOUBLE PRECISION"),
+    ("bbox_max_lng", "DOUBLE PRECISION"),
+    ("bbox_max_lat", "DOUBLE PRECISION"),
+    ("geometry_updated_at", "TIMESTAMPTZ"),
+)
+
+# The one definition of area_sq_km (geodesic, on the WGS84 spheroid) —
+# used by the backfill and by scripts/load_wards.py
+AREA_SQ_KM = "ST_Area(geometry::geography) / 1e6"
+
+# Centroid (point on surface when it falls outside), geodesic area, bbox
+BACKFILL_DERIVED = f"""
+    UPDATE wards w SET
+        centroid_lat = ST_Y(d.anchor),
+        centroid_lng = ST_X(d.anchor),
+        area_sq_km = {AREA_SQ_KM},
+        bbox_min_lng = ST_XMin(w.geometry),
+        bbox_min_lat = ST_YMin(w.geometry),
+        bbox_max_lng = ST_XMax(w.geometry),
+        bbox_max_lat = ST_YMax(w.geometry)
+    FROM (
+        SELECT
+            id,
+            CASE WHEN ST_Contains(geometry, ST_Centroid(geometry))
+                THEN ST_Centroid(geometry)
+                ELSE ST_PointOnSurface(geometry)
+            END AS anchor
+        FROM wards
+        WHERE geometry IS NOT NULL
+          AND (
+              NOT CAST(:only_missing AS boolean)
+              OR centroid_lat IS NULL
+              OR area_sq_km IS NULL
+              OR bbox_min_lat IS NULL
+          )
+    ) d
+    WHERE w.id = d.id
+"""
+
+REBUILD_NEIGHBOURS = """
+    WITH pairs AS (
+        SELECT
+            a.id AS ward_id,
+            b.id AS neighbour_id,
+            COALESCE(ST_Length(ST_CollectionExtract(
+                ST_Intersection(ST_Boundary(a.geometry), ST_Boundary(b.geometry)), 2
+            )::geography), 0) AS shared_border_m
+        FROM wards a
+        JOIN wards b
+          ON a.id < b.id
+         AND ST_DWithin(a.geometry, b.geometry, :gap)
+    )
+    INSERT INTO ward_neighbours (ward_id, neighbour_id, shared_border_m)
+    SELECT ward_id, neighbour_id, shared_border_m FROM pairs
+    UNION ALL
+    SELECT neighbour_id, ward_id, shared_border_m FROM pairs
+"""
+
+# Stored derived columns, for SELECT lists
+DERIVED_SELECT = "centroid_lat, centroid_lng, area_sq_km, bbox_min_lng, bbox_min_lat, bbox_max_lng, bbox_max_lat"
+
+
+def bbox_list(ward) -> list[float] | None:
+    """GeoJSON-order bbox [min_lng, min_lat, max_lng, max_lat] of a ward row/model"""
+    if ward.bbox_min_lng is None:
+        return None
+    return [ward.bbox_min_lng, ward.bbox_min_lat, ward.bbox_max_lng, ward.bbox_max_lat]
+
+
+def centroid_dict(ward) -> dict | None:
+    if ward.centroid_lat is None:
+        return None
+    return {"lat": ward.centroid_lat, "lng": ward.centroid_lng}
+
+
+class WardGeometry:
+    """
+    Per-ward geometry facts computed once at load time and stored on the
+    wards table (centroid, area, bbox) and in ward_neighbours, so the
+    weather grid, hotspot-to-ward join and API reads never derive them.
+    scripts/load_wards.py fills them while loading; these helpers backfill
+    tables loaded before the columns existed.
+    """
+
+    @staticmethod
+    def ensure_columns(db: Session) -> None:
+        """Add any missing derived columns (ALTER only when needed — it locks wards)"""
+        existing = set(db.execute(text("""
+            SELECT column_name FROM information_schema.columns WHERE table_name = 'wards'
+        """)).scalars().all())
+        missing = [(name, sql_type) for name, sql_type in DERIVED_COLUMNS if name not in existing]
+        if missing:
+            columns = ", ".join(f"ADD COLUMN IF NOT EXISTS {name} {sql_type}" for name, sql_type in missing)
+            db.execute(text(f"ALTER TABLE wards {columns}"))
+        db.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS wards_ward_code_key ON wards (ward_code)"))
+
+    @staticmethod
+    def backfill(db: Session, only_missing: bool = True) -> int:
+        """Fill centroid/area/bbox (only where missing by default); caller commits"""
+        return db.execute(text(BACKFILL_DERIVED), {"only_missing": only_missing}).rowcount
+
+    @staticmethod
+    def rebuild_neighbours(db: Session) -> int:
+        """Recompute the whole adjacency table; caller commits"""
+        db.execute(text("DELETE FROM ward_neighbours"))
+        return db.execute(text(REBUILD_NEIGHBOURS), {"gap": NEIGHBOUR_GAP_DEG}).rowcount
+
+    @staticmethod
+    def ensure_derived(db: Session) -> None:
+        """Startup backfill: derived columns and adjacency for wards that lack them (commits)"""
+        WardGeometry.ensure_columns(db)
+        filled = WardGeometry.backfill(db)
+        if filled:
+            print(f"[WARD GEOMETRY] Backfilled centroid/area/bbox for {filled} ward(s)")
+
+        missing_neighbours = db.execute(text("""
+            SELECT (SELECT COUNT(*) FROM wards) > 1
+               AND NOT EXISTS (SELECT 1 FROM ward_neighbours)
+        """)).scalar()
+        if missing_neighbours:
+            pairs = WardGeometry.rebuild_neighbours(db)
+            print(f"[WARD GEOMETRY] Built {pairs // 2} neighbour pair(s)")
+        db.commit()
+
+    @staticmethod
+    def neighbours(db: Session) -> dict[int, list[int]]:
+        """ward_id -> neighbour ids, longest shared border first"""
+        rows = db.execute(text("""
+            SELECT ward_id, neighbour_id
+            FROM ward_neighbours
+            ORDER BY ward_id, shared_border_m DESC, neighbour_id
+        """)).fetchall()
+        result = {}
+        for row in rows:
+            result.setdefault(row.ward_id, []).append(row.neighbour_id)
+        return result
+
+    @staticmethod
+    def neighbours_of(db: Session, ward_id: int) -> list[int]:
+        return db.execute(
+            text("""
+                SELECT neighbour_id
+                FROM ward_neighbours
+                WHERE ward_id = :ward_id
+                ORDER BY shared_border_m DESC, neighbour_id
+            """),
+            {"ward_id": ward_id}
+        ).scalars().all()
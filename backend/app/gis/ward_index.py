@@ -0,0 +1,127 @@
+import threading
+import numpy as np
+from shapely import STRtree, points, wkb
+from shapely.geometry import Point
+from shapely.prepared import prep
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .ward_geometry import DERIVED_SELECT, WardGeometry, bbox_list, centroid_dict
+
+
+class WardIndex:
+    """
+    Memory-resident point-in-polygon index over ward geometries.
+
+    Built once from the wards table and swapped atomically on rebuild, so
+    lookups never touch the database. Also keeps an id-keyed geometry store
+    and the stored centroid/area/bbox/neighbours for single-ward reads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signature = None
+        # (ward ids, prepared geometries, STRtree, {id: (name, geometry)},
+        # {id: stored details}) — replaced as one tuple
+        self._state = ([], [], None, {}, {})
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._state[2] is not None
+
+    @staticmethod
+    def get_signature(db: Session) -> tuple:
+        """Cheap fingerprint of the ward set; changes whenever wards are reloaded"""
+        row = db.execute(text("""
+            SELECT COUNT(*), COALESCE(MAX(id), 0), MAX(geometry_updated_at)
+            FROM wards
+        """)).fetchone()
+        return (row[0], row[1], row[2])
+
+    def rebuild(self, db: Session) -> int:
+        """Load all ward geometries and rebuild the index"""
+        signature = self.get_signature(db)
+        rows = db.execute(
+            text(f"""
+                SELECT id, ward_name, ST_AsBinary(geometry) AS geom, {DERIVED_SELECT}
+                FROM wards
+                WHERE geometry IS NOT NULL
+                ORDER BY id
+            """)
+        ).fetchall()
+
+        neighbours = WardGeometry.neighbours(db)
+
+        ids = []
+        geometries = []
+        by_id = {}
+        details = {}
+        for row in rows:
+            geom = wkb.loads(bytes(row.geom))
+            ids.append(row.id)
+            geometries.append(geom)
+            by_id[row.id] = (row.ward_name, geom)
+            details[row.id] = {
+                "centroid": centroid_dict(row),
+                "area_sq_km": row.area_sq_km,
+                "bbox": bbox_list(row),
+                "neighbours": neighbours.get(row.id, []),
+            }
+
+        state = (
+            ids,
+            [prep(g) for g in geometries],
+            STRtree(geometries) if geometries else None,
+            by_id,
+            details,
+        )
+
+        with self._lock:
+            self._state = state
+            self._signature = signature
+
+        print(f"[WARD INDEX] Indexed {len(ids)} ward(s)")
+        return len(ids)
+
+    def refresh_if_changed(self, db: Session) -> bool:
+        """Rebuild the index if the ward set changed since the last build"""
+        if self.is_loaded and self.get_signature(db) == self._signature:
+            return False
+        self.rebuild(db)
+        return True
+
+    def find_ward_id(self, lat: float, lng: float) -> int | None:
+        """Return the id of the ward containing the point, without a DB query"""
+        ids, prepared, tree, _, _ = self._state
+        if tree is None:
+            return None
+
+        point = Point(lng, lat)
+        for i in tree.query(point):
+            if prepared[i].covers(point):
+                return ids[i]
+        return None
+
+    def find_ward_ids(self, lats, lngs) -> list[int | None]:
+        """Vectorized find_ward_id: one STRtree query for a whole batch of points"""
+        ids, _, tree, _, _ = self._state
+        result = [None] * len(lats)
+        if tree is None or not len(lats):
+            return result
+
+        pairs = tree.query(points(np.asarray(lngs, dtype=float), np.asarray(lats, dtype=float)), predicate="intersects")
+        # Keep the first ward per point (points on a shared border hit both)
+        for point_i, ward_i in zip(pairs[0][::-1].tolist(), pairs[1][::-1].tolist()):
+            result[point_i] = ids[ward_i]
+        return result
+
+    def get(self, ward_id: int) -> tuple[str, object] | None:
+        """Return (ward_name, shapely geometry) for a ward id"""
+        return self._state[3].get(ward_id)
+
+    def details(self, ward_id: int) -> dict | None:
+        """Stored centroid, area_sq_km, bbox and neighbour ids for a ward id"""
+        return self._state[4].get(ward_id)
+
+
+ward_index = WardIndex()
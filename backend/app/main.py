@@ -3,18 +3,62 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .config import settings
-from .database import engine, Base
-from .routes import reports_router, wards_router, hotspots_router, admin_router
+from .database import engine, Base, SessionLocal, async_engine, pool_status
+from .gis.ward_index import ward_index
+from .gis.ward_geometry import WardGeometry
+from .services.ingest_queue import report_ingest_queue
+from .services.risk_service import RiskService
+from .services.risk_snapshot import risk_snapshots
+from .services.report_partitions import ReportPartitions
+from .services.hotspot_service import HotspotService
+from .services.report_service import ReportService
+from .routes import reports_router, wards_router, hotspots_router, admin_router, tiles_router
 from .tasks import start_scheduler, stop_scheduler
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        # Reports are written as soon as the ingest queue starts
+        ReportPartitions.maintain(db)
+        # Idempotent journal replay needs reports.ingest_id
+        ReportService.ensure_ingest_key(db)
+    except Exception as e:
+        print("Report table maintenance failed:", e)
+        db.rollback()
+    try:
+        # Hotspot rebuilds write latitude/longitude/ward_name
+        HotspotService.ensure_columns(db)
+    except Exception as e:
+        print("Hotspot table maintenance failed:", e)
+        db.rollback()
+    try:
+        # Wards loaded before centroid/area/bbox/adjacency were stored
+        WardGeometry.ensure_derived(db)
+    except Exception as e:
+        print("Ward geometry backfill failed:", e)
+        db.rollback()
+    try:
+        ward_index.rebuild(db)
+    except Exception as e:
+        print("Ward index build failed:", e)
+    try:
+        risk_snapshots.load(db)
+    except Exception as e:
+        print("Risk snapshot load failed:", e)
+    finally:
+        db.close()
+    # Ingested reports mark their wards for a debounced risk update
+    report_ingest_queue.add_flush_hook(RiskService.on_reports_ingested)
+    await report_ingest_queue.start()
     start_scheduler()
     yield
     # Shutdown
     stop_scheduler()
+    await report_ingest_queue.stop()
+    await async_engine.dispose()
 
 app = FastAPI(
     title="Stealth Ping API",
@@ -42,6 +86,7 @@ app.include_router(wards_router)
 app.include_router(hotspots_router)
 app.include_router(admin_router)
 app.include_router(ward_risk_router)
+app.include_router(tiles_router)
 
 
 @app.get("/")
@@ -55,3 +100,8 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/health/db")
+async def db_health():
+    """Connection pool metrics (checked out / idle / overflow per engine)"""
+    return pool_status()
@@ -1,6 +1,11 @@
 from .ward import Ward
+from .ward_geometry_level import WardGeometryLevel
+from .ward_neighbour import WardNeighbour
 from .report import Report
 from .hotspot import Hotspot
 from .weather_cache import WeatherCache
+from .risk_snapshot import RiskSnapshot
+from .ward_risk_history import WardRiskHistory, WardRiskHourly, WardRiskDaily
 
-__all__ = ["Ward", "Report", "Hotspot", "WeatherCache"]
+__all__ = ["Ward", "WardGeometryLevel", "WardNeighbour", "Report", "Hotspot", "WeatherCache", "RiskSnapshot",
+           "WardRiskHistory", "WardRiskHourly", "WardRiskDaily"]
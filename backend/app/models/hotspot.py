@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey
 from sqlalchemy.sql import func
 from geoalchemy2 import Geometry
 from ..database import Base
@@ -10,9 +10,13 @@ class Hotspot(Base):
 
     # 🔥 SINGLE SOURCE OF TRUTH
     location = Column(Geometry("POINT", srid=4326), nullable=False)
+    # Copies written alongside location by HotspotService (location wins if they disagree)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
 
     frequency = Column(Integer, default=0)
     ward_id = Column(Integer, ForeignKey("wards.id"), nullable=True)
+    ward_name = Column(String, nullable=True)
 
     avg_rainfall = Column(Float, default=0.0)
     last_occurrence = Column(DateTime(timezone=True), nullable=True)
@@ -1,12 +1,27 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, Index
 from sqlalchemy.sql import func
 from geoalchemy2 import Geometry
 from ..database import Base
 
 class Report(Base):
+    """Range-partitioned by month on created_at (scripts/partition_reports.py migrates old tables)"""
     __tablename__ = "reports"
+    __table_args__ = (
+        # Keyset pagination order for /api/reports/all
+        Index("ix_reports_created_at_id", "created_at", "id"),
+        # Time-windowed scans (recurrence, hotspots) on append-ordered data
+        Index("ix_reports_created_at_brin", "created_at", postgresql_using="brin"),
+        # Per-ward counts over a window
+        Index("ix_reports_ward_id_created_at", "ward_id", "created_at"),
+        # Journal replays are idempotent (unique keys must include the partition key)
+        Index("ux_reports_ingest_id_created_at", "ingest_id", "created_at", unique=True),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    # The partition key has to be part of the table's primary key; rows are
+    # still identified by id alone
+    __mapper_args__ = {"primary_key": ["id"]}
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
     location = Column(Geometry("POINT", srid=4326), nullable=False)
@@ -14,9 +29,11 @@ class Report(Base):
     description = Column(Text, nullable=True)
     user_id = Column(String, nullable=False)  # Firebase UID
     ward_id = Column(Integer, ForeignKey("wards.id"), nullable=True)
+    # Set for reports that came through the ingest queue (services/ingest_queue.py)
+    ingest_id = Column(String, nullable=True)
 
     # ✅ ADD THIS LINE
     status = Column(String, default="PENDING")  
     # PENDING | APPROVED | REJECTED
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from ..database import Base
+
+class RiskSnapshot(Base):
+    """Immutable risk state published once per scheduler cycle; id is the version"""
+    __tablename__ = "risk_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    total_reports = Column(Integer, nullable=False, default=0)
+    total_hotspots = Column(Integer, nullable=False, default=0)
+    high_risk_wards = Column(Integer, nullable=False, default=0)
+    payload = Column(JSONB, nullable=False)  # {"wards": [...], "hotspots": [...]}
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -7,10 +7,20 @@ class Ward(Base):
     __tablename__ = "wards"
     
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
+    # Stable source key (scripts/load_wards.py merges on it, so ids survive reloads)
+    ward_code = Column(String, unique=True, nullable=True)
+    name = Column("ward_name", String, nullable=False)  # column is ward_name (scripts/load_wards.py)
     geometry = Column(Geometry("MULTIPOLYGON", srid=4326), nullable=False)
+    # Centroid, or a point on the surface when the centroid falls outside (concave wards)
     centroid_lat = Column(Float, nullable=True)
     centroid_lng = Column(Float, nullable=True)
+    area_sq_km = Column(Float, nullable=True)
+    # Bounding box in degrees (cheap prefilter before an exact geometry test)
+    bbox_min_lng = Column(Float, nullable=True)
+    bbox_min_lat = Column(Float, nullable=True)
+    bbox_max_lng = Column(Float, nullable=True)
+    bbox_max_lat = Column(Float, nullable=True)
+    geometry_updated_at = Column(DateTime(timezone=True), nullable=True)  # set by the loader
     
     # Risk factors (updated by background job)
     risk_score = Column(Float, default=0.0)
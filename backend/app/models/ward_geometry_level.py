@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey
+from geoalchemy2 import Geometry
+from ..database import Base
+
+class WardGeometryLevel(Base):
+    """Precomputed simplified ward geometry (filled by scripts/load_wards.py)"""
+    __tablename__ = "ward_geometry_levels"
+
+    ward_id = Column(Integer, ForeignKey("wards.id", ondelete="CASCADE"), primary_key=True)
+    tolerance = Column(Float, primary_key=True)  # degrees
+    geometry = Column(Geometry("GEOMETRY", srid=4326, spatial_index=False), nullable=False)
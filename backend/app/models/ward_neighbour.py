@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey
+from ..database import Base
+
+class WardNeighbour(Base):
+    """Ward adjacency, stored in both directions (filled by gis.ward_geometry)"""
+    __tablename__ = "ward_neighbours"
+
+    ward_id = Column(Integer, ForeignKey("wards.id", ondelete="CASCADE"), primary_key=True)
+    neighbour_id = Column(Integer, ForeignKey("wards.id", ondelete="CASCADE"), primary_key=True)
+    shared_border_m = Column(Float, nullable=False, default=0.0)  # 0 when they only touch at a point
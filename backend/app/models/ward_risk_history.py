@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, Float, String, DateTime
+from ..database import Base
+
+class WardRiskHistory(Base):
+    """Per-ward risk at every scheduler tick; range-partitioned by month"""
+    __tablename__ = "ward_risk_history"
+    __table_args__ = {"postgresql_partition_by": "RANGE (recorded_at)"}
+
+    ward_id = Column(Integer, primary_key=True)
+    recorded_at = Column(DateTime(timezone=True), primary_key=True)
+    risk_score = Column(Float, nullable=False)
+    risk_level = Column(String(8), nullable=False)
+    rainfall_mm = Column(Float, nullable=False)
+    report_count = Column(Integer, nullable=False)
+    hotspot_count = Column(Integer, nullable=False)
+
+
+# No foreign keys to wards: history outlives ward reloads
+class WardRiskRollupMixin:
+    ward_id = Column(Integer, primary_key=True)
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    samples = Column(Integer, nullable=False)
+    risk_avg = Column(Float, nullable=False)
+    risk_max = Column(Float, nullable=False)
+    rainfall_avg = Column(Float, nullable=False)
+    rainfall_max = Column(Float, nullable=False)
+    report_count = Column(Integer, nullable=False)  # at the end of the bucket
+    hotspot_count = Column(Integer, nullable=False)
+
+
+class WardRiskHourly(WardRiskRollupMixin, Base):
+    """Hourly rollup of ward_risk_history"""
+    __tablename__ = "ward_risk_history_hourly"
+
+
+class WardRiskDaily(WardRiskRollupMixin, Base):
+    """Daily rollup of ward_risk_history_hourly"""
+    __tablename__ = "ward_risk_history_daily"
@@ -1,3 +1,7 @@
 from .risk_calculator import RiskCalculator
+from .risk_matrix import WardFeatureMatrix, get_feature_matrix, invalidate_feature_matrix, build_risk_curves
 
-__all__ = ["RiskCalculator"]
+__all__ = [
+    "RiskCalculator",
+    "WardFeatureMatrix", "get_feature_matrix", "invalidate_feature_matrix", "build_risk_curves",
+]
@@ -1,9 +1,14 @@
+import numpy as np
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from datetime import datetime, timedelta
 from ..config import settings
 from ..models import Ward, Report, Hotspot
 
+# Wards per UPDATE ... FROM (VALUES ...) statement
+BULK_UPDATE_CHUNK = 1000
+BULK_UPDATE_COLUMNS = ("id", "risk_score", "risk_level", "rainfall_mm", "report_count", "hotspot_count")
+
 class RiskCalculator:
     @staticmethod
     def calculate_risk_score(
@@ -30,12 +35,42 @@ class RiskCalculator:
         
         return min(max(risk_score, 0.0), 1.0)
     
+    @staticmethod
+    def calculate_risk_scores(
+        rainfall_mm: np.ndarray,
+        recurrence_rate: np.ndarray,
+        hotspot_persistence: np.ndarray,
+        drainage_stress: np.ndarray,
+        population_exposure: np.ndarray
+    ) -> np.ndarray:
+        """Vectorized calculate_risk_score; rainfall may carry a leading scenario axis"""
+        rainfall_normalized = np.minimum(np.asarray(rainfall_mm, dtype=float) / 50.0, 1.0)
+
+        risk_score = (
+            settings.WEIGHT_RAINFALL * rainfall_normalized +
+            settings.WEIGHT_RECURRENCE * recurrence_rate +
+            settings.WEIGHT_HOTSPOT * hotspot_persistence +
+            settings.WEIGHT_DRAINAGE * drainage_stress +
+            settings.WEIGHT_POPULATION * population_exposure
+        )
+
+        return np.clip(risk_score, 0.0, 1.0)
+
+    @staticmethod
+    def get_risk_levels(scores: np.ndarray) -> np.ndarray:
+        """Vectorized get_risk_level"""
+        return np.select(
+            [scores >= settings.RISK_THRESHOLD_HIGH, scores >= settings.RISK_THRESHOLD_MEDIUM],
+            ["HIGH", "MEDIUM"],
+            default="LOW"
+        )
+
     @staticmethod
     def get_risk_level(score: float) -> str:
         """Convert risk score to risk level"""
-        if score >= 0.6:
+        if score >= settings.RISK_THRESHOLD_HIGH:
             return "HIGH"
-        elif score >= 0.3:
+        elif score >= settings.RISK_THRESHOLD_MEDIUM:
             return "MEDIUM"
         return "LOW"
     
@@ -84,6 +119,111 @@ class RiskCalculator:
         
         db.commit()
     
+    @staticmethod
+    def load_ward_aggregates(db: Session) -> dict:
+        """
+        Per-ward counts in one grouped query per source table:
+        {ward_id: {"recent_reports", "report_count", "hotspot_count"}}
+        """
+        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+        aggregates = {}
+
+        report_rows = db.execute(
+            text("""
+                SELECT
+                    ward_id,
+                    COUNT(*) AS report_count,
+                    COUNT(*) FILTER (WHERE created_at >= :since) AS recent_reports
+                FROM reports
+                WHERE ward_id IS NOT NULL
+                GROUP BY ward_id
+            """),
+            {"since": thirty_days_ago}
+        ).fetchall()
+        for row in report_rows:
+            aggregates.setdefault(row.ward_id, {}).update(
+                report_count=row.report_count,
+                recent_reports=row.recent_reports,
+            )
+
+        hotspot_rows = db.execute(
+            text("""
+                SELECT ward_id, COUNT(*) AS hotspot_count
+                FROM hotspots
+                WHERE ward_id IS NOT NULL
+                GROUP BY ward_id
+            """)
+        ).fetchall()
+        for row in hotspot_rows:
+            aggregates.setdefault(row.ward_id, {})["hotspot_count"] = row.hotspot_count
+
+        return aggregates
+
+    @staticmethod
+    def update_all_ward_risks(db: Session, wards: list, rainfall_by_ward: dict) -> int:
+        """
+        Recompute every ward's risk from grouped aggregates and write all
+        results back with one UPDATE ... FROM (VALUES ...) and one commit
+        """
+        aggregates = RiskCalculator.load_ward_aggregates(db)
+
+        rows = []
+        for ward in wards:
+            counts = aggregates.get(ward.id, {})
+            rainfall_mm = rainfall_by_ward.get(ward.id, 0.0)
+            risk_score = RiskCalculator.calculate_risk_score(
+                rainfall_mm=rainfall_mm,
+                recurrence_rate=min(counts.get("recent_reports", 0) / 10.0, 1.0),
+                hotspot_persistence=min(counts.get("hotspot_count", 0) / 5.0, 1.0),
+                drainage_stress=ward.drainage_stress or 0.5,
+                population_exposure=ward.population_density or 0.5
+            )
+            rows.append((
+                ward.id,
+                risk_score,
+                RiskCalculator.get_risk_level(risk_score),
+                rainfall_mm,
+                counts.get("report_count", 0),
+                counts.get("hotspot_count", 0),
+            ))
+
+        RiskCalculator.write_ward_risks(db, rows)
+        # Ward objects loaded before the UPDATE hold old values
+        db.expire_all()
+        return len(rows)
+
+    @staticmethod
+    def write_ward_risks(db: Session, rows: list) -> None:
+        """
+        Write (BULK_UPDATE_COLUMNS) tuples back with UPDATE ... FROM (VALUES ...)
+        in chunks, then commit once
+        """
+        for start in range(0, len(rows), BULK_UPDATE_CHUNK):
+            chunk = rows[start:start + BULK_UPDATE_CHUNK]
+            params = {}
+            values = []
+            for i, row in enumerate(chunk):
+                names = [f"{column}{i}" for column in BULK_UPDATE_COLUMNS]
+                values.append("(" + ", ".join(f":{name}" for name in names) + ")")
+                params.update(zip(names, row))
+
+            db.execute(
+                text(f"""
+                    UPDATE wards AS w SET
+                        risk_score = v.risk_score::double precision,
+                        risk_level = v.risk_level,
+                        rainfall_mm = v.rainfall_mm::double precision,
+                        report_count = v.report_count::integer,
+                        hotspot_count = v.hotspot_count::integer,
+                        updated_at = NOW()
+                    FROM (VALUES {", ".join(values)}) AS v({", ".join(BULK_UPDATE_COLUMNS)})
+                    WHERE w.id = v.id::integer
+                """),
+                params
+            )
+
+        db.commit()
+
     @staticmethod
     def simulate_risk(
         ward: Ward,
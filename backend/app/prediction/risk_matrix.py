@@ -0,0 +1,153 @@
+import threading
+import time
+import numpy as np
+from sqlalchemy.orm import Session, defer
+from ..config import settings
+from ..models import Ward
+from .risk_calculator import RiskCalculator
+
+
+class WardFeatureMatrix:
+    """
+    Columnar snapshot of every ward's risk inputs, scored with NumPy.
+
+    Loaded with one ward query plus the grouped aggregates, then reused
+    across simulation calls until the scheduler invalidates it.
+    """
+
+    def __init__(self, wards: list, aggregates: dict):
+        self.ids = np.array([w.id for w in wards], dtype=np.int64)
+        self.names = [w.name for w in wards]
+        self.position = {w.id: i for i, w in enumerate(wards)}
+
+        recent = np.array([aggregates.get(w.id, {}).get("recent_reports", 0) for w in wards], dtype=float)
+        hotspots = np.array([aggregates.get(w.id, {}).get("hotspot_count", 0) for w in wards], dtype=float)
+
+        self.rainfall = np.array([w.rainfall_mm or 0.0 for w in wards], dtype=float)
+        self.recurrence = np.minimum(recent / 10.0, 1.0)
+        self.hotspot = np.minimum(hotspots / 5.0, 1.0)
+        self.drainage = np.array([w.drainage_stress or 0.5 for w in wards], dtype=float)
+        self.population = np.array([w.population_density or 0.5 for w in wards], dtype=float)
+
+        self.original_risk = np.array([w.risk_score or 0.0 for w in wards], dtype=float)
+        self.original_level = [w.risk_level or "LOW" for w in wards]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def load(cls, db: Session) -> "WardFeatureMatrix":
+        # Numeric columns only — the boundaries aren't needed to score
+        wards = db.query(Ward).options(defer(Ward.geometry)).order_by(Ward.id).all()
+        return cls(wards, RiskCalculator.load_ward_aggregates(db))
+
+    def score(self, rainfall_mm: np.ndarray) -> np.ndarray:
+        """Risk scores for rainfall of shape (n_wards,) or (n_scenarios, n_wards)"""
+        return RiskCalculator.calculate_risk_scores(
+            rainfall_mm,
+            self.recurrence,
+            self.hotspot,
+            self.drainage,
+            self.population,
+        )
+
+    def scenario_rainfall(self, multipliers, ward_rainfall: dict | None = None) -> np.ndarray:
+        """
+        (n_scenarios, n_wards) rainfall: current rainfall scaled by each
+        multiplier, with absolute per-ward overrides (mm) applied on top
+        """
+        rainfall = np.outer(np.asarray(multipliers, dtype=float), self.rainfall)
+        if ward_rainfall:
+            for ward_id, mm in ward_rainfall.items():
+                i = self.position.get(ward_id)
+                if i is not None:
+                    rainfall[:, i] = mm
+        return rainfall
+
+    def base_risk(self) -> np.ndarray:
+        """Score contribution of everything except rainfall"""
+        return (
+            settings.WEIGHT_RECURRENCE * self.recurrence +
+            settings.WEIGHT_HOTSPOT * self.hotspot +
+            settings.WEIGHT_DRAINAGE * self.drainage +
+            settings.WEIGHT_POPULATION * self.population
+        )
+
+    def saturation_multipliers(self) -> np.ndarray:
+        """Multiplier at which rainfall hits the 50 mm cap (inf for dry wards)"""
+        with np.errstate(divide="ignore"):
+            return np.where(self.rainfall > 0, 50.0 / self.rainfall, np.inf)
+
+    def crossing_multipliers(self, threshold: float) -> np.ndarray:
+        """
+        Smallest rainfall multiplier at which each ward's score reaches
+        `threshold`, solved in closed form from the linear weights:
+            W_RAINFALL * min(rainfall * m / 50, 1) + base = threshold
+        0 when the ward is already there without rain, NaN when it never gets there
+        """
+        base = self.base_risk()
+        needed = (threshold - base) / settings.WEIGHT_RAINFALL  # normalized rainfall required
+        with np.errstate(divide="ignore", invalid="ignore"):
+            m = needed * 50.0 / self.rainfall
+        m = np.where((needed > 1.0) | (self.rainfall <= 0), np.nan, m)
+        return np.where(needed <= 0, 0.0, m)
+
+
+# Multipliers sampled for the precomputed risk-vs-rainfall curves
+CURVE_MULTIPLIERS = np.round(np.arange(0.1, 10.0 + 1e-9, 0.1), 2)
+
+
+def build_risk_curves(matrix: WardFeatureMatrix) -> dict:
+    """Per-ward risk curve over CURVE_MULTIPLIERS plus exact MEDIUM/HIGH crossing multipliers"""
+
+    def as_list(values: np.ndarray) -> list:
+        return [float(v) if np.isfinite(v) else None for v in values]
+
+    curves = matrix.score(matrix.scenario_rainfall(CURVE_MULTIPLIERS)).T
+    base = matrix.base_risk()
+    saturation = as_list(matrix.saturation_multipliers())
+    medium = as_list(matrix.crossing_multipliers(settings.RISK_THRESHOLD_MEDIUM))
+    high = as_list(matrix.crossing_multipliers(settings.RISK_THRESHOLD_HIGH))
+
+    return {
+        "rainfall_multipliers": CURVE_MULTIPLIERS.tolist(),
+        "thresholds": {
+            "MEDIUM": settings.RISK_THRESHOLD_MEDIUM,
+            "HIGH": settings.RISK_THRESHOLD_HIGH,
+        },
+        "wards": [
+            {
+                "id": int(matrix.ids[i]),
+                "name": matrix.names[i],
+                "rainfall_mm": float(matrix.rainfall[i]),
+                "base_risk": round(float(base[i]), 4),
+                "saturation_multiplier": saturation[i],
+                "medium_multiplier": medium[i],
+                "high_multiplier": high[i],
+                "curve": np.round(curves[i], 4).tolist(),
+            }
+            for i in range(len(matrix))
+        ],
+    }
+
+
+_lock = threading.Lock()
+_cached = None  # (loaded_at, WardFeatureMatrix)
+
+
+def get_feature_matrix(db: Session) -> WardFeatureMatrix:
+    """Cached feature matrix, reloaded after SIMULATION_CACHE_SECONDS or invalidation"""
+    global _cached
+    with _lock:
+        if _cached is not None and time.monotonic() - _cached[0] < settings.SIMULATION_CACHE_SECONDS:
+            return _cached[1]
+    matrix = WardFeatureMatrix.load(db)
+    with _lock:
+        _cached = (time.monotonic(), matrix)
+    return matrix
+
+
+def invalidate_feature_matrix() -> None:
+    global _cached
+    with _lock:
+        _cached = None
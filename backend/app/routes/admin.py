@@ -1,36 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+import math
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session, defer
+from typing import List, Optional
 from ..database import get_db
 from ..models import Report, Ward, Hotspot
 from ..schemas import (
     AdminDashboardResponse, 
     SimulationRequest, 
     SimulationResponse,
+    SimulationSweep,
     ReportResponse,
     WardRiskResponse
 )
 from ..services.auth import require_admin
 from ..prediction.risk_calculator import RiskCalculator
+from ..prediction.risk_matrix import get_feature_matrix, build_risk_curves
+from ..gis.geojson_cache import geojson_cache, RISK_CURVES_KEY
 from ..gis.operations import GISOperations
+from ..gis.ward_geometry import bbox_list, centroid_dict
+from ..services.risk_snapshot import risk_snapshots
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
+MAX_SWEEP_SCENARIOS = 1000
+
 @router.get("/dashboard", response_model=AdminDashboardResponse)
 async def get_admin_dashboard(
+    response: Response,
+    version: Optional[int] = Query(None, description="Risk snapshot version; latest when omitted"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
-    """Get admin dashboard data"""
-    total_reports = db.query(Report).count()
-    total_hotspots = db.query(Hotspot).count()
-    high_risk_wards = db.query(Ward).filter(Ward.risk_level == "HIGH").count()
+    """Get admin dashboard data (totals and ward stats from the risk snapshot)"""
+    snapshot = risk_snapshots.load(db, version)
+    if snapshot is None and version is not None:
+        raise HTTPException(status_code=404, detail="Snapshot version not found")
     
-    # Recent reports
-    recent_reports_db = db.query(Report).order_by(Report.created_at.desc()).limit(20).all()
+    # Recent reports stay live — new submissions show up before the next snapshot
+    recent_reports_db = (
+        db.query(Report, Ward.name)
+        .outerjoin(Ward, Ward.id == Report.ward_id)
+        .order_by(Report.created_at.desc())
+        .limit(20)
+        .all()
+    )
     recent_reports = []
-    for r in recent_reports_db:
-        ward = db.query(Ward).filter(Ward.id == r.ward_id).first() if r.ward_id else None
+    for r, ward_name in recent_reports_db:
         recent_reports.append(ReportResponse(
             id=r.id,
             latitude=r.latitude,
@@ -38,12 +53,27 @@ async def get_admin_dashboard(
             severity=r.severity,
             description=r.description,
             ward_id=r.ward_id,
-            ward_name=ward.name if ward else None,
+            ward_name=ward_name,
             created_at=r.created_at
         ))
     
+    if snapshot is not None:
+        response.headers["X-Snapshot-Version"] = str(snapshot.version)
+        return AdminDashboardResponse(
+            total_reports=snapshot.total_reports,
+            total_hotspots=snapshot.total_hotspots,
+            high_risk_wards=snapshot.high_risk_wards,
+            recent_reports=recent_reports,
+            ward_stats=[WardRiskResponse(**ward) for ward in snapshot.wards]
+        )
+    
+    # Nothing published yet (fresh database) — read the live tables
+    total_reports = db.query(Report).count()
+    total_hotspots = db.query(Hotspot).count()
+    high_risk_wards = db.query(Ward).filter(Ward.risk_level == "HIGH").count()
+    
     # Ward stats (without geometry for dashboard)
-    wards = db.query(Ward).all()
+    wards = db.query(Ward).options(defer(Ward.geometry)).all()
     ward_stats = [
         WardRiskResponse(
             id=w.id,
@@ -54,7 +84,9 @@ async def get_admin_dashboard(
             report_count=w.report_count or 0,
             hotspot_count=w.hotspot_count or 0,
             geometry=None,
-            centroid={"lat": w.centroid_lat, "lng": w.centroid_lng} if w.centroid_lat else None
+            centroid=centroid_dict(w),
+            area_sq_km=w.area_sq_km,
+            bbox=bbox_list(w)
         )
         for w in wards
     ]
@@ -73,31 +105,54 @@ async def run_simulation(
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
-    """Run rainfall simulation"""
-    if request.rainfall_multiplier < 0.1 or request.rainfall_multiplier > 10:
+    """Run rainfall simulation (one scenario or a multiplier sweep)"""
+    multipliers = request.rainfall_multipliers or [
+        request.rainfall_multiplier if request.rainfall_multiplier is not None else 1.0
+    ]
+    if len(multipliers) > MAX_SWEEP_SCENARIOS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SWEEP_SCENARIOS} rainfall multipliers per sweep")
+    if not all(0.1 <= m <= 10 for m in multipliers):  # also rejects NaN
         raise HTTPException(status_code=400, detail="Rainfall multiplier must be between 0.1 and 10")
+    if request.ward_rainfall and not all(math.isfinite(mm) and mm >= 0 for mm in request.ward_rainfall.values()):
+        raise HTTPException(status_code=400, detail="Ward rainfall overrides must be finite and non-negative (mm)")
     
-    wards = db.query(Ward).all()
-    results = []
+    matrix = get_feature_matrix(db)
+    scores = matrix.score(matrix.scenario_rainfall(multipliers, request.ward_rainfall))
+    levels = RiskCalculator.get_risk_levels(scores)
     
-    for ward in wards:
-        recurrence = RiskCalculator.calculate_recurrence_rate(db, ward.id)
-        hotspot_persistence = RiskCalculator.calculate_hotspot_persistence(db, ward.id)
-        
-        simulated_risk, simulated_level = RiskCalculator.simulate_risk(
-            ward=ward,
-            rainfall_multiplier=request.rainfall_multiplier,
-            recurrence_rate=recurrence,
-            hotspot_persistence=hotspot_persistence
+    results = [
+        {
+            "id": int(matrix.ids[i]),
+            "name": matrix.names[i],
+            "original_risk": float(matrix.original_risk[i]),
+            "simulated_risk": float(scores[0, i]),
+            "original_level": matrix.original_level[i],
+            "simulated_level": str(levels[0, i])
+        }
+        for i in range(len(matrix))
+    ]
+    
+    sweep = None
+    if request.rainfall_multipliers:
+        sweep = SimulationSweep(
+            ward_ids=matrix.ids.tolist(),
+            rainfall_multipliers=multipliers,
+            simulated_risk=scores.tolist(),
+            simulated_level=levels.tolist()
         )
-        
-        results.append({
-            "id": ward.id,
-            "name": ward.name,
-            "original_risk": ward.risk_score or 0,
-            "simulated_risk": simulated_risk,
-            "original_level": ward.risk_level or "LOW",
-            "simulated_level": simulated_level
-        })
     
-    return SimulationResponse(wards=results)
+    return SimulationResponse(wards=results, sweep=sweep)
+
+@router.get("/simulate/curves")
+async def get_risk_curves(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin)
+):
+    """
+    Precomputed risk-vs-rainfall curve per ward with the exact multipliers at
+    which it crosses MEDIUM and HIGH (rebuilt after every scheduler run)
+    """
+    return geojson_cache.response(
+        request, RISK_CURVES_KEY, lambda: build_risk_curves(get_feature_matrix(db))
+    )
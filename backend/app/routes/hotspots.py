@@ -1,44 +1,28 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import List
+from typing import List, Optional
 
-from ..database import get_db
+from ..database import get_async_db
 from ..schemas import HotspotResponse
+from ..services.risk_snapshot import risk_snapshots, HOTSPOTS_SQL, hotspot_to_dict
 
 router = APIRouter(prefix="/api/hotspots", tags=["hotspots"])
 
 
 @router.get("", response_model=List[HotspotResponse])
-def get_all_hotspots(db: Session = Depends(get_db)):
-    rows = db.execute(
-        text("""
-            SELECT
-                h.id,
-                ST_Y(h.location) AS latitude,
-                ST_X(h.location) AS longitude,
-                h.frequency,
-                h.ward_id,
-                w.ward_name AS ward_name,
-                h.avg_rainfall,
-                COALESCE(h.last_occurrence, h.created_at) AS last_occurrence
-            FROM hotspots h
-            LEFT JOIN wards w ON w.id = h.ward_id
-            WHERE h.frequency > 0
-            ORDER BY h.last_occurrence DESC NULLS LAST
-        """)
-    ).fetchall()
+async def get_all_hotspots(
+    response: Response,
+    version: Optional[int] = Query(None, description="Risk snapshot version; latest when omitted"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    snapshot = await risk_snapshots.aload(db, version)
+    if snapshot is not None:
+        response.headers["X-Snapshot-Version"] = str(snapshot.version)
+        return snapshot.hotspots
+    if version is not None:
+        raise HTTPException(status_code=404, detail="Snapshot version not found")
 
-    return [
-        {
-            "id": r.id,
-            "latitude": r.latitude,
-            "longitude": r.longitude,
-            "frequency": r.frequency,
-            "ward_id": r.ward_id or 0,
-            "ward_name": r.ward_name or "Unknown",
-            "avg_rainfall": r.avg_rainfall or 0.0,
-            "last_occurrence": r.last_occurrence,
-        }
-        for r in rows
-    ]
+    # Nothing published yet (fresh database) — read the live table
+    rows = (await db.execute(text(HOTSPOTS_SQL))).fetchall()
+    return [hotspot_to_dict(r) for r in rows]
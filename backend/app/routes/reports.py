@@ -1,91 +1,160 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import datetime
 
-from ..database import get_db
-from ..models import Report, Ward
+from ..database import get_db, get_async_db, AsyncSessionLocal
 from ..schemas import ReportCreate, ReportResponse
-from ..gis.operations import GISOperations
+from ..gis.tiles import tile_cache
+from ..services.ingest_queue import report_ingest_queue
+from ..services.risk_service import RiskService
+from ..services.report_service import ReportService, BulkRowError, SEVERITIES, STREAM_BATCH_SIZE, BULK_MAX_ITEMS
 
 router = APIRouter(prefix="/api/reports", tags=["reports"])
 
 
 # ===================== CREATE REPORT (PUBLIC) =====================
-@router.post("", response_model=dict)
-async def create_report(
-    report_data: ReportCreate,
-    db: Session = Depends(get_db),
-):
+@router.post("", response_model=dict, status_code=202)
+async def create_report(report_data: ReportCreate):
+    """
+    Accept a report for write-behind ingestion: it's journaled locally and
+    queued, then inserted with the next micro-batch (usually within
+    INGEST_FLUSH_MS). Returns 202 with an ingest id.
+    """
     # Validate severity
-    if report_data.severity not in ["LOW", "MEDIUM", "HIGH"]:
+    if report_data.severity not in SEVERITIES:
         raise HTTPException(status_code=400, detail="Invalid severity level")
 
-    ward = None  # TEMP: disable GIS ward lookup
-
-
-    # Create report
-    report = Report(
-        latitude=report_data.latitude,
-        longitude=report_data.longitude,
-        location=func.ST_SetSRID(
-            func.ST_Point(report_data.longitude, report_data.latitude),
-            4326,
-        ),
-        severity=report_data.severity,
-        description=report_data.description,
-        user_id="public",   # ✅ NO AUTH
-        ward_id=ward.id if ward else None,
-    )
+    try:
+        ingest_id = report_ingest_queue.submit(report_data)
+    except RuntimeError:
+        raise HTTPException(status_code=503, detail="Report ingestion is not available")
+
+    return {
+        "ingest_id": ingest_id,
+        "message": "Report submitted successfully",
+    }
+
+
+# ===================== BULK CREATE (PUBLIC) =====================
+def insert_bulk(db: Session, reports: list) -> list[int]:
+    """Blocking part of a bulk create (ward lookup, INSERT, counters, tiles); run off the event loop"""
+    ids, ward_ids = ReportService.bulk_create(db, reports)
+    RiskService.on_reports_ingested(reports, ward_ids)
+
+    # Large batches touch too many tiles to drop one by one
+    if len(reports) > 100:
+        tile_cache.clear()
+    else:
+        for report in reports:
+            tile_cache.invalidate_point(report.latitude, report.longitude)
+    return ids
+
+
+@router.post("/bulk", response_model=dict)
+async def create_reports_bulk(
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    """
+    Submit many reports at once (partner apps, IVR gateways).
+    Body is a JSON array, or NDJSON with Content-Type application/x-ndjson.
+    Valid items are inserted in one transaction; invalid ones are reported
+    per index and skipped. If the database rejects an item that passed
+    validation, nothing is inserted and the response is a 422 naming it.
+    """
+    try:
+        items = ReportService.parse_bulk(await request.body(), request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    db.add(report)
-    db.commit()
-    db.refresh(report)
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} reports per request")
 
-    # Optional risk recalculation (SAFE)
+    valid, errors = ReportService.validate_bulk(items)
+    reports = [report for _, report in valid]
     try:
-        from app.services.risk_service import RiskService
-        if report.ward_id:
-            RiskService.compute_for_ward(db, report.ward_id)
-            db.commit()
-    except Exception:
-        pass
+        ids = await asyncio.to_thread(insert_bulk, db, reports)
+    except BulkRowError as e:
+        raise HTTPException(status_code=422, detail={"index": valid[e.position][0], "error": str(e)})
+
+    results = [{"index": index, "id": report_id} for (index, _), report_id in zip(valid, ids)]
+    results.extend(errors)
+    results.sort(key=lambda r: r["index"])
 
     return {
-        "id": report.id,
-        "message": "Report submitted successfully",
+        "inserted": len(ids),
+        "failed": len(errors),
+        "results": results,
     }
 
 
 # ===================== 🔓 PUBLIC REPORTS (NO AUTH) =====================
+MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "geojsonseq": "application/geo+json-seq",
+}
+
+
 @router.get("/all", response_model=List[ReportResponse])
-async def get_all_reports(db: Session = Depends(get_db)):
-    reports = (
-        db.query(Report)
-        .order_by(Report.created_at.desc())
-        .all()
-    )
+async def get_all_reports(
+    limit: Optional[int] = Query(None, ge=1, le=5000, description="Page size; omit to stream every report"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    since: Optional[datetime] = None,
+    bbox: Optional[str] = Query(None, description="min_lng,min_lat,max_lng,max_lat"),
+    severity: Optional[str] = Query(None, description="Comma-separated, e.g. MEDIUM,HIGH"),
+    format: str = Query("json", pattern="^(json|ndjson|geojsonseq)$"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Newest-first reports.
+    With `limit`, returns one keyset page and the next cursor in X-Next-Cursor.
+    Without it, streams every matching report using a server-side cursor.
+    """
+    try:
+        bounds = tuple(float(v) for v in bbox.split(",")) if bbox else None
+        if bounds is not None and len(bounds) != 4:
+            raise ValueError
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be min_lng,min_lat,max_lng,max_lat")
+
+    severities = [v.strip().upper() for v in severity.split(",")] if severity else None
+    if severities and any(v not in SEVERITIES for v in severities):
+        raise HTTPException(status_code=400, detail="Invalid severity level")
+
+    try:
+        after = ReportService.decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    filters = dict(since=since, bbox=bounds, severities=severities, cursor=after)
+    media_type = MEDIA_TYPES[format]
 
-    result = []
-    for r in reports:
-        ward = (
-            db.query(Ward)
-            .filter(Ward.id == r.ward_id)
-            .first()
-            if r.ward_id else None
-        )
-
-        result.append(
-            ReportResponse(
-                id=r.id,
-                latitude=r.latitude,
-                longitude=r.longitude,
-                severity=r.severity,
-                description=r.description,
-                ward_id=r.ward_id,
-                ward_name=ward.ward_name if ward else None,
-                created_at=r.created_at,
-            )
-        )
-
-    return result
+    if limit is None:
+        # The request session is closed before a streamed body is sent,
+        # so the stream owns its own session
+        async def stream():
+            async with AsyncSessionLocal() as stream_db:
+                rows = await stream_db.stream(
+                    ReportService.list_statement(**filters).execution_options(yield_per=STREAM_BATCH_SIZE)
+                )
+                async for chunk in ReportService.aserialize(rows, format):
+                    yield chunk
+
+        return StreamingResponse(stream(), media_type=media_type)
+
+    rows = (await db.execute(ReportService.list_statement(**filters).limit(limit + 1))).all()
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = ReportService.encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return Response(
+        content="".join(ReportService.serialize(rows, format)),
+        media_type=media_type,
+        headers=headers,
+    )
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..gis.tiles import VectorTiles, MAX_ZOOM
+
+router = APIRouter(prefix="/api/tiles", tags=["tiles"])
+
+
+@router.get("/{z}/{x}/{y}.mvt")
+def get_vector_tile(z: int, x: int, y: int, db: Session = Depends(get_db)):
+    """
+    Mapbox Vector Tile with `wards`, `hotspots` and `reports` layers
+    """
+    if z < 0 or z > MAX_ZOOM or not (0 <= x < 2 ** z) or not (0 <= y < 2 ** z):
+        raise HTTPException(status_code=404, detail="Tile out of range")
+
+    tile = VectorTiles.get_tile(db, z, x, y)
+    return Response(
+        content=tile,
+        media_type="application/vnd.mapbox-vector-tile",
+        headers={"Cache-Control": "public, max-age=60"},
+    )
@@ -1,40 +1,111 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from app.database import get_db
+from app.database import get_async_db
+from app.gis.geojson_cache import geojson_cache, HeadedPayload, WARDS_RISK_KEY
+from app.gis.operations import WARD_GEOJSON_AT_LEVEL, WARD_LEVEL_JOIN
+from app.gis.simplification import resolve_tolerance
+from app.gis.ward_geometry import bbox_list
+from app.services.risk_snapshot import risk_snapshots, Snapshot
 
 router = APIRouter(
     prefix="/api/wards-risk",
     tags=["wards-risk"]
 )
 
-@router.get("")
-def get_wards_risk(db: Session = Depends(get_db)):
-    rows = db.execute(
-        text("""
+
+async def build_wards_risk(db: AsyncSession, tolerance: float = 0.0, snapshot: Snapshot | None = None) -> dict:
+    """
+    Build the ward risk FeatureCollection (served from geojson_cache).
+    Scores come from `snapshot` when given, else from the live wards table.
+    """
+    rows = (await db.execute(
+        text(f"""
             SELECT
                 w.id,
                 w.ward_name,
-                ST_AsGeoJSON(w.geometry)::json AS geometry,
+                ({WARD_GEOJSON_AT_LEVEL})::json AS geometry,
                 COALESCE(w.risk_score, 0) AS risk_score,
-                COALESCE(w.risk_level, 'LOW') AS risk_level
+                COALESCE(w.risk_level, 'LOW') AS risk_level,
+                w.area_sq_km,
+                w.bbox_min_lng,
+                w.bbox_min_lat,
+                w.bbox_max_lng,
+                w.bbox_max_lat
             FROM wards w
-        """)
-    ).fetchall()
+            {WARD_LEVEL_JOIN}
+        """),
+        {"tol": tolerance}
+    )).fetchall()
+
+    features = []
+    for row in rows:
+        risk_score, risk_level = float(row.risk_score), row.risk_level
+        if snapshot is not None:
+            ward = snapshot.by_ward.get(row.id)
+            if ward is None:
+                continue  # ward loaded after this snapshot was published
+            risk_score, risk_level = ward["risk_score"], ward["risk_level"]
+
+        feature = {
+            "type": "Feature",
+            "geometry": row.geometry,
+            "properties": {
+                "ward_id": row.id,
+                "ward_name": row.ward_name,
+                "risk_score": risk_score,
+                "risk_level": risk_level,
+                "area_sq_km": row.area_sq_km
+            }
+        }
+        bbox = bbox_list(row)
+        if bbox:
+            feature["bbox"] = bbox  # stored at load; lets clients fit bounds without walking rings
+        features.append(feature)
 
     return {
         "type": "FeatureCollection",
-        "features": [
-            {
-                "type": "Feature",
-                "geometry": row.geometry,
-                "properties": {
-                    "ward_id": row.id,
-                    "ward_name": row.ward_name,
-                    "risk_score": float(row.risk_score),
-                    "risk_level": row.risk_level
-                }
-            }
-            for row in rows
-        ]
+        "features": features
     }
+
+
+async def build_snapshot_payload(db: AsyncSession, tolerance: float, version: int | None) -> HeadedPayload:
+    """
+    FeatureCollection for snapshot `version` (latest when None) plus its
+    X-Snapshot-Version header. The snapshot is loaded here, inside the cache
+    build, so the cached body and header always come from the same version
+    and a publish during the build keeps it out of the cache.
+    """
+    snapshot = await risk_snapshots.aload(db, version)
+    headers = {"X-Snapshot-Version": str(snapshot.version)} if snapshot else {}
+    return HeadedPayload(await build_wards_risk(db, tolerance, snapshot), headers)
+
+
+@router.get("")
+async def get_wards_risk(
+    request: Request,
+    zoom: Optional[int] = Query(None, ge=0, le=22),
+    tolerance: Optional[float] = Query(None, ge=0),
+    version: Optional[int] = Query(None, description="Risk snapshot version; latest when omitted"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    level = resolve_tolerance(zoom, tolerance)
+    if version is None:
+        # Latest view (published version + overlay): one entry per level
+        return await geojson_cache.aresponse(
+            request,
+            (WARDS_RISK_KEY, level),
+            lambda: build_snapshot_payload(db, level, None),
+        )
+
+    if await risk_snapshots.aload(db, version) is None:
+        raise HTTPException(status_code=404, detail="Snapshot version not found")
+
+    # Pinned versions go to a bounded LRU: callers can't grow the cache by walking versions
+    return await geojson_cache.aresponse(
+        request,
+        (WARDS_RISK_KEY, level, version),
+        lambda: build_snapshot_payload(db, level, version),
+        bounded=True,
+    )
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime, timedelta, timezone
 
 from ..database import get_db
 from ..gis.operations import GISOperations
+from ..gis.geojson_cache import geojson_cache, WARDS_KEY
+from ..gis.simplification import resolve_tolerance
+from ..services.history_service import HistoryService
 
 router = APIRouter(
     prefix="/api/wards",
@@ -12,23 +16,69 @@ router = APIRouter(
 
 
 @router.get("", response_model=List[dict])
-async def get_all_wards(db: Session = Depends(get_db)):
+async def get_all_wards(
+    request: Request,
+    zoom: Optional[int] = Query(None, ge=0, le=22),
+    tolerance: Optional[float] = Query(None, ge=0),
+    db: Session = Depends(get_db),
+):
     """
     Get all wards with geometry (GeoJSON)
+    Serialized once per simplification level and served compressed from geojson_cache
     """
-    wards = GISOperations.get_all_wards_with_geometry(db)
-    return wards
+    level = resolve_tolerance(zoom, tolerance)
+    return geojson_cache.response(
+        request,
+        (WARDS_KEY, level),
+        lambda: GISOperations.get_all_wards_with_geometry(db, level),
+    )
 
 
 @router.get("/{ward_id}", response_model=dict)
-async def get_single_ward(ward_id: int, db: Session = Depends(get_db)):
+async def get_single_ward(
+    ward_id: int,
+    simplify: Optional[float] = Query(None, ge=0, le=0.01, description="Simplification tolerance in degrees"),
+    db: Session = Depends(get_db),
+):
     """
     Get a single ward by ID
     """
-    wards = GISOperations.get_all_wards_with_geometry(db)
-    ward = next((w for w in wards if w["id"] == ward_id), None)
+    ward = GISOperations.get_ward_with_geometry(db, ward_id, simplify)
 
     if not ward:
         raise HTTPException(status_code=404, detail="Ward not found")
 
     return ward
+
+
+@router.get("/{ward_id}/history", response_model=dict)
+async def get_ward_history(
+    ward_id: int,
+    start: Optional[datetime] = Query(None, alias="from", description="Default: 30 days before `to`"),
+    end: Optional[datetime] = Query(None, alias="to", description="Default: now"),
+    step: Optional[str] = Query(None, pattern="^(raw|hour|day)$", description="Default: chosen from the range"),
+    db: Session = Depends(get_db),
+):
+    """
+    Risk, rainfall and report-count time series for a ward, as parallel arrays.
+    Raw scheduler ticks, or hourly/daily rollups (avg + max).
+    """
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=30)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="`from` must be before `to`")
+    if not GISOperations.ward_exists(db, ward_id):
+        raise HTTPException(status_code=404, detail="Ward not found")
+
+    step = step or HistoryService.choose_step(start, end)
+    return {
+        "ward_id": ward_id,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "step": step,
+        **HistoryService.query(db, ward_id, start, end, step),
+    }
@@ -1,11 +1,11 @@
 from .report import ReportCreate, ReportResponse
 from .ward import WardRiskResponse
 from .hotspot import HotspotResponse
-from .admin import AdminDashboardResponse, SimulationRequest, SimulationResponse
+from .admin import AdminDashboardResponse, SimulationRequest, SimulationResponse, SimulationSweep
 
 __all__ = [
     "ReportCreate", "ReportResponse",
     "WardRiskResponse",
     "HotspotResponse",
-    "AdminDashboardResponse", "SimulationRequest", "SimulationResponse"
+    "AdminDashboardResponse", "SimulationRequest", "SimulationResponse", "SimulationSweep"
 ]
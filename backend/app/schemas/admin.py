@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Dict, Optional
 from .report import ReportResponse
 from .ward import WardRiskResponse
 
@@ -11,7 +11,9 @@ class AdminDashboardResponse(BaseModel):
     ward_stats: List[WardRiskResponse]
 
 class SimulationRequest(BaseModel):
-    rainfall_multiplier: float  # e.g., 2.0 for double rainfall
+    rainfall_multiplier: Optional[float] = None  # e.g., 2.0 for double rainfall
+    rainfall_multipliers: Optional[List[float]] = None  # sweep, scored in one call
+    ward_rainfall: Optional[Dict[int, float]] = None  # per-ward rainfall overrides (mm)
 
 class SimulatedWard(BaseModel):
     id: int
@@ -21,5 +23,12 @@ class SimulatedWard(BaseModel):
     original_level: str
     simulated_level: str
 
+class SimulationSweep(BaseModel):
+    ward_ids: List[int]
+    rainfall_multipliers: List[float]
+    simulated_risk: List[List[float]]  # [multiplier][ward]
+    simulated_level: List[List[str]]
+
 class SimulationResponse(BaseModel):
     wards: List[SimulatedWard]
+    sweep: Optional[SimulationSweep] = None
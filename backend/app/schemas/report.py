@@ -1,13 +1,21 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional
 from datetime import datetime
 
 class ReportCreate(BaseModel):
-    latitude: float
-    longitude: float
+    latitude: float = Field(ge=-90, le=90, allow_inf_nan=False)
+    longitude: float = Field(ge=-180, le=180, allow_inf_nan=False)
     severity: str  # LOW, MEDIUM, HIGH
     description: Optional[str] = None
 
+    @field_validator("description")
+    @classmethod
+    def no_nul(cls, value: Optional[str]) -> Optional[str]:
+        # Postgres text can't store NUL
+        if value is not None and "\x00" in value:
+            raise ValueError("must not contain NUL characters")
+        return value
+
 class ReportResponse(BaseModel):
     id: int
     latitude: float
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Any
+from typing import Optional, Any, List
 from datetime import datetime
 
 class Centroid(BaseModel):
@@ -16,6 +16,8 @@ class WardRiskResponse(BaseModel):
     hotspot_count: int
     geometry: Optional[Any] = None
     centroid: Optional[Centroid] = None
+    area_sq_km: Optional[float] = None
+    bbox: Optional[List[float]] = None  # [min_lng, min_lat, max_lng, max_lat]
     
     class Config:
         from_attributes = True
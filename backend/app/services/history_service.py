@@ -0,0 +1,177 @@
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..utils.partitions import ensure_monthly_partitions, partitions_before
+
+HISTORY_TABLE = "ward_risk_history"
+
+# Auto step: raw ticks up to 3 days, hourly up to ~a season, daily beyond
+RAW_MAX_SPAN = timedelta(days=3)
+HOURLY_MAX_SPAN = timedelta(days=120)
+
+RAW_COLUMNS = ("risk_score", "risk_level", "rainfall_mm", "report_count", "hotspot_count")
+ROLLUP_COLUMNS = ("samples", "risk_avg", "risk_max", "rainfall_avg", "rainfall_max", "report_count", "hotspot_count")
+ROLLUP_TABLES = {"hour": "ward_risk_history_hourly", "day": "ward_risk_history_daily"}
+
+# Upsert one hourly bucket from raw ticks (counts are taken from the bucket's last tick)
+ROLLUP_HOURLY = """
+    INSERT INTO ward_risk_history_hourly (
+        ward_id, bucket, samples, risk_avg, risk_max, rainfall_avg, rainfall_max, report_count, hotspot_count
+    )
+    SELECT
+        ward_id,
+        :bucket,
+        COUNT(*),
+        AVG(risk_score),
+        MAX(risk_score),
+        AVG(rainfall_mm),
+        MAX(rainfall_mm),
+        (ARRAY_AGG(report_count ORDER BY recorded_at DESC))[1],
+        (ARRAY_AGG(hotspot_count ORDER BY recorded_at DESC))[1]
+    FROM ward_risk_history
+    WHERE recorded_at >= :bucket AND recorded_at < :bucket_end
+    GROUP BY ward_id
+    ON CONFLICT (ward_id, bucket) DO UPDATE SET
+        samples = EXCLUDED.samples,
+        risk_avg = EXCLUDED.risk_avg,
+        risk_max = EXCLUDED.risk_max,
+        rainfall_avg = EXCLUDED.rainfall_avg,
+        rainfall_max = EXCLUDED.rainfall_max,
+        report_count = EXCLUDED.report_count,
+        hotspot_count = EXCLUDED.hotspot_count
+"""
+
+# Upsert one daily bucket from its hourly buckets (sample-weighted averages)
+ROLLUP_DAILY = """
+    INSERT INTO ward_risk_history_daily (
+        ward_id, bucket, samples, risk_avg, risk_max, rainfall_avg, rainfall_max, report_count, hotspot_count
+    )
+    SELECT
+        ward_id,
+        :bucket,
+        SUM(samples),
+        SUM(risk_avg * samples) / SUM(samples),
+        MAX(risk_max),
+        SUM(rainfall_avg * samples) / SUM(samples),
+        MAX(rainfall_max),
+        (ARRAY_AGG(report_count ORDER BY bucket DESC))[1],
+        (ARRAY_AGG(hotspot_count ORDER BY bucket DESC))[1]
+    FROM ward_risk_history_hourly
+    WHERE bucket >= :bucket AND bucket < :bucket_end
+    GROUP BY ward_id
+    ON CONFLICT (ward_id, bucket) DO UPDATE SET
+        samples = EXCLUDED.samples,
+        risk_avg = EXCLUDED.risk_avg,
+        risk_max = EXCLUDED.risk_max,
+        rainfall_avg = EXCLUDED.rainfall_avg,
+        rainfall_max = EXCLUDED.rainfall_max,
+        report_count = EXCLUDED.report_count,
+        hotspot_count = EXCLUDED.hotspot_count
+"""
+
+
+class HistoryService:
+    """
+    Append-only per-ward risk history.
+
+    Every scheduler tick appends one row per ward to ward_risk_history
+    (monthly RANGE partitions) and refreshes the current hourly and daily
+    rollup buckets. Raw partitions past HISTORY_RAW_RETENTION_DAYS are
+    dropped whole; hourly rollups are kept HISTORY_HOURLY_RETENTION_DAYS,
+    daily rollups forever. Buckets start on local hours and midnights in
+    HISTORY_TIMEZONE (IST is UTC+5:30, so UTC hours would straddle its days).
+    """
+
+    @staticmethod
+    def buckets(now: datetime) -> tuple[datetime, datetime, datetime, datetime]:
+        """(hour, hour_end, day, day_end) containing `now`, in HISTORY_TIMEZONE"""
+        zone = ZoneInfo(settings.HISTORY_TIMEZONE)
+        local = now.astimezone(zone)
+        hour = local.replace(minute=0, second=0, microsecond=0)
+        day = datetime.combine(local.date(), datetime.min.time(), tzinfo=zone)
+        day_end = datetime.combine(local.date() + timedelta(days=1), datetime.min.time(), tzinfo=zone)
+        return hour, hour + timedelta(hours=1), day, day_end
+
+    @staticmethod
+    def record_tick(db: Session, now: datetime | None = None) -> int:
+        """Append the wards' current risk, rainfall and counts, then roll up (commits)"""
+        now = now or datetime.now(timezone.utc)
+        ensure_monthly_partitions(db, HISTORY_TABLE, now, months_ahead=1)
+
+        result = db.execute(
+            text("""
+                INSERT INTO ward_risk_history (
+                    ward_id, recorded_at, risk_score, risk_level, rainfall_mm, report_count, hotspot_count
+                )
+                SELECT
+                    id,
+                    :now,
+                    COALESCE(risk_score, 0),
+                    COALESCE(risk_level, 'LOW'),
+                    COALESCE(rainfall_mm, 0),
+                    COALESCE(report_count, 0),
+                    COALESCE(hotspot_count, 0)
+                FROM wards
+                ON CONFLICT DO NOTHING
+            """),
+            {"now": now}
+        )
+
+        hour, hour_end, day, day_end = HistoryService.buckets(now)
+        db.execute(text(ROLLUP_HOURLY), {"bucket": hour, "bucket_end": hour_end})
+        db.execute(text(ROLLUP_DAILY), {"bucket": day, "bucket_end": day_end})
+        db.commit()
+        return result.rowcount
+
+    @staticmethod
+    def prune(db: Session, now: datetime | None = None) -> None:
+        """Apply retention: drop old raw partitions, delete old hourly rollups (commits)"""
+        now = now or datetime.now(timezone.utc)
+
+        raw_cutoff = now - timedelta(days=settings.HISTORY_RAW_RETENTION_DAYS)
+        for name in partitions_before(db, HISTORY_TABLE, raw_cutoff):
+            db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            print(f"[HISTORY] Dropped partition {name}")
+
+        db.execute(
+            text("DELETE FROM ward_risk_history_hourly WHERE bucket < :cutoff"),
+            {"cutoff": now - timedelta(days=settings.HISTORY_HOURLY_RETENTION_DAYS)}
+        )
+        db.commit()
+
+    @staticmethod
+    def choose_step(start: datetime, end: datetime) -> str:
+        span = end - start
+        if span <= RAW_MAX_SPAN:
+            return "raw"
+        if span <= HOURLY_MAX_SPAN:
+            return "hour"
+        return "day"
+
+    @staticmethod
+    def query(db: Session, ward_id: int, start: datetime, end: datetime, step: str) -> dict:
+        """Columnar series for [start, end): {"t": [...], <column>: [...]}"""
+        if step == "raw":
+            table, time_column, columns = HISTORY_TABLE, "recorded_at", RAW_COLUMNS
+        else:
+            table, time_column, columns = ROLLUP_TABLES[step], "bucket", ROLLUP_COLUMNS
+
+        rows = db.execute(
+            text(f"""
+                SELECT {time_column} AS t, {", ".join(columns)}
+                FROM {table}
+                WHERE ward_id = :ward_id
+                  AND {time_column} >= :start
+                  AND {time_column} < :end
+                ORDER BY {time_column}
+            """),
+            {"ward_id": ward_id, "start": start, "end": end}
+        ).fetchall()
+
+        series = {"t": [row.t.isoformat() for row in rows]}
+        for i, column in enumerate(columns, start=1):
+            series[column] = [row[i] for row in rows]
+        return series
@@ -1,41 +1,155 @@
+import numpy as np
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+
+from ..config import settings
+from ..gis.clustering import detect_hotspots
+
+WINDOW_DAYS = 90
+
+# Clustering runs in metres: UTM zone 43N covers Delhi
+METRIC_SRID = 32643
+# Metres per degree of longitude at ~36°N — turns a metre radius into a
+# degree bound that safely over-covers it, for GiST-indexed prefilters
+METRES_PER_DEGREE_MIN = 90_000
+
+# New, unmatched reports are re-clustered with older unclustered reports
+# this close to them (a few radii, so short DBSCAN chains are still found)
+NEIGHBOURHOOD_RADII = 3
+
+# Columns the writers below fill that tables created before the model
+# declared them lack
+DENORMALISED_COLUMNS = (
+    ("latitude", "DOUBLE PRECISION"),
+    ("longitude", "DOUBLE PRECISION"),
+    ("ward_name", "VARCHAR"),
+)
+
+# Shared INSERT for cluster rows: ward_id, report_count, latitude, longitude, last_occurrence.
+# A cluster's ward is the one containing its centre — looked up among the
+# ward its reports gave and that ward's neighbours (stored bbox first,
+# then the exact test), falling back to the reports' ward
+INSERT_HOTSPOTS_FROM_CLUSTERS = """
+    INSERT INTO hotspots (
+        ward_id,
+        latitude,
+        longitude,
+        location,
+        frequency,
+        ward_name,
+        avg_rainfall,
+        last_occurrence,
+        created_at
+    )
+    SELECT
+        COALESCE(home.id, c.ward_id),
+        c.latitude,
+        c.longitude,
+        ST_SetSRID(ST_MakePoint(c.longitude, c.latitude), 4326),
+        c.report_count,
+        COALESCE(home.ward_name, 'Unknown'),
+        0.0,
+        c.last_occurrence,
+        :now
+    FROM clusters c
+    LEFT JOIN LATERAL (
+        SELECT w.id, w.ward_name
+        FROM wards w
+        WHERE (
+                w.id = c.ward_id
+                OR w.id IN (SELECT n.neighbour_id FROM ward_neighbours n WHERE n.ward_id = c.ward_id)
+            )
+          AND c.latitude BETWEEN w.bbox_min_lat AND w.bbox_max_lat
+          AND c.longitude BETWEEN w.bbox_min_lng AND w.bbox_max_lng
+          AND ST_Intersects(w.geometry, ST_SetSRID(ST_MakePoint(c.longitude, c.latitude), 4326))
+        ORDER BY w.id = c.ward_id DESC
+        LIMIT 1
+    ) home ON TRUE
+"""
 
 
 class HotspotService:
 
+    # Highest report id already folded into hotspots (process-local; None
+    # forces a full rebuild, e.g. after a restart)
+    _last_report_id: int | None = None
+    _last_full_rebuild: datetime | None = None
+
+    @staticmethod
+    def ensure_columns(db: Session) -> None:
+        """Add latitude/longitude/ward_name to hotspots tables that predate them (commits)"""
+        existing = set(db.execute(text("""
+            SELECT column_name FROM information_schema.columns WHERE table_name = 'hotspots'
+        """)).scalars().all())
+        missing = [(name, sql_type) for name, sql_type in DENORMALISED_COLUMNS if name not in existing]
+        if missing:
+            columns = ", ".join(f"ADD COLUMN IF NOT EXISTS {name} {sql_type}" for name, sql_type in missing)
+            db.execute(text(f"ALTER TABLE hotspots {columns}"))
+        db.commit()
+
     @staticmethod
     def recompute_hotspots(db: Session):
         """
-        Detect clusters of reports and store them as hotspots
+        Detect clusters of reports and store them as hotspots.
+
+        Normally incremental: only reports added since the last run are
+        clustered and merged into existing hotspots. A full rebuild runs on
+        the first call and every HOTSPOT_FULL_REBUILD_HOURS to correct drift
+        (expired reports, late-committing ids). Either way all changes land
+        in one transaction, so readers never see a partial table.
         """
+        rebuild_due = (
+            HotspotService._last_report_id is None
+            or HotspotService._last_full_rebuild is None
+            or datetime.utcnow() - HotspotService._last_full_rebuild
+            >= timedelta(hours=settings.HOTSPOT_FULL_REBUILD_HOURS)
+        )
+
+        upto = db.execute(text("SELECT COALESCE(MAX(id), 0) FROM reports")).scalar()
+
+        try:
+            if rebuild_due and settings.HOTSPOT_ENGINE == "python":
+                HotspotService._rebuild_all_python(db, upto)
+            elif rebuild_due:
+                HotspotService._rebuild_all(db, upto)
+            else:
+                HotspotService._merge_new_reports(db, HotspotService._last_report_id, upto)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        HotspotService._last_report_id = upto
+        if rebuild_due:
+            HotspotService._last_full_rebuild = datetime.utcnow()
 
-        print("[HOTSPOT] Recomputing hotspots...")
+    @staticmethod
+    def _rebuild_all(db: Session, upto: int):
+        """Re-cluster the whole window and replace the table (caller commits)"""
+        print("[HOTSPOT] Rebuilding all hotspots...")
 
-        # 1️⃣ Clear old hotspots
         db.execute(text("DELETE FROM hotspots"))
 
-        # 2️⃣ Detect clusters using PostGIS (DBSCAN)
-        result = db.execute(text("""
+        result = db.execute(text(f"""
             WITH report_clusters AS (
                 SELECT
                     ST_ClusterDBSCAN(
-                        location,
-                        eps := 0.002,          -- ~200m
-                        minpoints := 3
+                        ST_Transform(location, :metric_srid),
+                        eps := :eps_m,
+                        minpoints := :min_points
                     ) OVER () AS cluster_id,
                     ward_id,
                     location,
                     created_at
                 FROM reports
-                WHERE created_at >= NOW() - INTERVAL '90 days'
+                WHERE created_at >= NOW() - make_interval(days => :window_days)
+                  AND id <= :upto
             ),
             cluster_stats AS (
                 SELECT
                     cluster_id,
                     COUNT(*) AS report_count,
-                    COUNT(DISTINCT DATE(created_at)) AS unique_days,
                     ST_Centroid(ST_Collect(location)) AS centroid,
                     MAX(ward_id) AS ward_id,
                     MAX(created_at) AS last_occurrence
@@ -43,52 +157,218 @@ class HotspotService:
                 WHERE cluster_id IS NOT NULL
                 GROUP BY cluster_id
                 HAVING
-                    COUNT(*) >= 3
-                    AND COUNT(DISTINCT DATE(created_at)) >= 3
+                    COUNT(*) >= :min_points
+                    AND COUNT(DISTINCT DATE(created_at)) >= :min_days
+            ),
+            clusters AS (
+                SELECT
+                    ward_id,
+                    report_count,
+                    ST_Y(centroid) AS latitude,
+                    ST_X(centroid) AS longitude,
+                    last_occurrence
+                FROM cluster_stats
             )
+            {INSERT_HOTSPOTS_FROM_CLUSTERS}
+        """), HotspotService._params(upto=upto))
+
+        print(f"[HOTSPOT] {result.rowcount} hotspot(s) detected")
+
+    @staticmethod
+    def load_report_arrays(db: Session, upto: int | None = None) -> dict:
+        """Reports in the window as NumPy columns: lat, lng, created_at (epoch s), ward_id (-1 = none)"""
+        rows = db.execute(text("""
+            SELECT
+                ST_Y(location) AS lat,
+                ST_X(location) AS lng,
+                EXTRACT(EPOCH FROM created_at)::bigint AS created_at,
+                COALESCE(ward_id, -1) AS ward_id
+            FROM reports
+            WHERE created_at >= NOW() - make_interval(days => :window_days)
+              AND (CAST(:upto AS integer) IS NULL OR id <= :upto)
+        """), HotspotService._params(upto=upto)).fetchall()
+
+        data = np.array(rows, dtype=np.float64).reshape(-1, 4)
+        return {
+            "lat": data[:, 0],
+            "lng": data[:, 1],
+            "created_at": data[:, 2].astype(np.int64),
+            "ward_id": data[:, 3].astype(np.int64),
+        }
+
+    @staticmethod
+    def _rebuild_all_python(db: Session, upto: int):
+        """
+        Full rebuild with the in-process grid-hash DBSCAN (gis.clustering),
+        honouring HOTSPOT_RADIUS_METERS / MIN_REPORTS / MIN_DAYS (caller commits)
+        """
+        print("[HOTSPOT] Rebuilding all hotspots (python engine)...")
+
+        reports = HotspotService.load_report_arrays(db, upto)
+        found = detect_hotspots(
+            reports["lat"],
+            reports["lng"],
+            reports["created_at"],
+            reports["ward_id"],
+            radius_m=settings.HOTSPOT_RADIUS_METERS,
+            min_reports=settings.HOTSPOT_MIN_REPORTS,
+            min_days=settings.HOTSPOT_MIN_DAYS,
+        )
+
+        db.execute(text("DELETE FROM hotspots"))
+        if len(found["report_count"]):
+            db.execute(text(f"""
+                WITH clusters AS (
+                    SELECT * FROM unnest(
+                        CAST(:ward_ids AS integer[]),
+                        CAST(:report_counts AS integer[]),
+                        CAST(:latitudes AS double precision[]),
+                        CAST(:longitudes AS double precision[]),
+                        CAST(:last_occurrences AS timestamptz[])
+                    ) AS c(ward_id, report_count, latitude, longitude, last_occurrence)
+                )
+                {INSERT_HOTSPOTS_FROM_CLUSTERS}
+            """), HotspotService._params(
+                ward_ids=[int(w) if w >= 0 else None for w in found["ward_id"]],
+                report_counts=found["report_count"].tolist(),
+                latitudes=found["latitude"].tolist(),
+                longitudes=found["longitude"].tolist(),
+                last_occurrences=[
+                    datetime.fromtimestamp(int(ts), tz=timezone.utc) for ts in found["last_occurrence"]
+                ],
+            ))
+
+        print(f"[HOTSPOT] {len(found['report_count'])} hotspot(s) detected")
+
+    @staticmethod
+    def _merge_new_reports(db: Session, after: int, upto: int):
+        """Fold reports with after < id <= upto into the hotspot table (caller commits)"""
+        params = HotspotService._params(after=after, upto=upto)
+
+        # 1️⃣ Match each new report to its nearest existing hotspot (if any)
+        db.execute(text("""
+            CREATE TEMP TABLE new_report_matches ON COMMIT DROP AS
             SELECT
-                ward_id,
-                report_count,
-                ST_Y(centroid) AS latitude,
-                ST_X(centroid) AS longitude,
-                last_occurrence
-            FROM cluster_stats
-        """)).fetchall()
-
-        # 3️⃣ Insert hotspots (LOCATION FIX — CRITICAL)
-        for row in result:
-            db.execute(text("""
-                INSERT INTO hotspots (
+                r.id,
+                r.ward_id,
+                r.location,
+                r.created_at,
+                nearest.id AS hotspot_id
+            FROM reports r
+            LEFT JOIN LATERAL (
+                SELECT h.id
+                FROM hotspots h
+                WHERE h.location && ST_Expand(r.location, :eps_deg)
+                  AND ST_DWithin(h.location::geography, r.location::geography, :eps_m)
+                ORDER BY h.location <-> r.location
+                LIMIT 1
+            ) nearest ON TRUE
+            WHERE r.id > :after
+              AND r.id <= :upto
+              AND r.created_at >= NOW() - make_interval(days => :window_days)
+        """), params)
+
+        # 2️⃣ Grow matched hotspots: frequency-weighted centroid, latest occurrence
+        grown = db.execute(text("""
+            WITH additions AS (
+                SELECT
+                    hotspot_id,
+                    COUNT(*) AS n,
+                    AVG(ST_Y(location)) AS latitude,
+                    AVG(ST_X(location)) AS longitude,
+                    MAX(created_at) AS last_occurrence
+                FROM new_report_matches
+                WHERE hotspot_id IS NOT NULL
+                GROUP BY hotspot_id
+            ),
+            merged AS (
+                SELECT
+                    h.id,
+                    h.frequency + a.n AS frequency,
+                    (ST_Y(h.location) * h.frequency + a.latitude * a.n) / (h.frequency + a.n) AS latitude,
+                    (ST_X(h.location) * h.frequency + a.longitude * a.n) / (h.frequency + a.n) AS longitude,
+                    GREATEST(h.last_occurrence, a.last_occurrence) AS last_occurrence
+                FROM hotspots h
+                JOIN additions a ON a.hotspot_id = h.id
+            )
+            UPDATE hotspots h SET
+                frequency = m.frequency,
+                latitude = m.latitude,
+                longitude = m.longitude,
+                location = ST_SetSRID(ST_MakePoint(m.longitude, m.latitude), 4326),
+                last_occurrence = m.last_occurrence
+            FROM merged m
+            WHERE h.id = m.id
+        """)).rowcount
+
+        # 3️⃣ Cluster unmatched new reports with unclustered reports around them
+        created = db.execute(text(f"""
+            WITH candidates AS (
+                SELECT DISTINCT r.id, r.ward_id, r.location, r.created_at
+                FROM new_report_matches m
+                JOIN reports r
+                  ON r.location && ST_Expand(m.location, :neighbourhood_deg)
+                 AND ST_DWithin(r.location::geography, m.location::geography, :neighbourhood_m)
+                WHERE m.hotspot_id IS NULL
+                  AND r.id <= :upto
+                  AND r.created_at >= NOW() - make_interval(days => :window_days)
+                  AND NOT EXISTS (
+                      SELECT 1 FROM hotspots h
+                      WHERE h.location && ST_Expand(r.location, :eps_deg)
+                        AND ST_DWithin(h.location::geography, r.location::geography, :eps_m)
+                  )
+            ),
+            report_clusters AS (
+                SELECT
+                    ST_ClusterDBSCAN(ST_Transform(location, :metric_srid), eps := :eps_m, minpoints := :min_points)
+                        OVER () AS cluster_id,
+                    id,
                     ward_id,
-                    latitude,
-                    longitude,
                     location,
-                    frequency,
-                    ward_name,
-                    avg_rainfall,
-                    last_occurrence,
                     created_at
-                )
-                VALUES (
-                    :ward_id,
-                    :lat,
-                    :lng,
-                    ST_SetSRID(ST_MakePoint(:lng, :lat), 4326),
-                    :freq,
-                    'Unknown',
-                    0.0,
-                    :last_occurrence,
-                    :now
-                )
-            """), {
-                "ward_id": row.ward_id,
-                "lat": row.latitude,
-                "lng": row.longitude,
-                "freq": row.report_count,
-                "last_occurrence": row.last_occurrence,
-                "now": datetime.utcnow()
-            })
+                FROM candidates
+            ),
+            clusters AS (
+                SELECT
+                    MAX(ward_id) AS ward_id,
+                    COUNT(*) AS report_count,
+                    ST_Y(ST_Centroid(ST_Collect(location))) AS latitude,
+                    ST_X(ST_Centroid(ST_Collect(location))) AS longitude,
+                    MAX(created_at) AS last_occurrence
+                FROM report_clusters
+                WHERE cluster_id IS NOT NULL
+                GROUP BY cluster_id
+                HAVING
+                    COUNT(*) >= :min_points
+                    AND COUNT(DISTINCT DATE(created_at)) >= :min_days
+                    AND MAX(id) > :after  -- unchanged clusters were already evaluated
+            )
+            {INSERT_HOTSPOTS_FROM_CLUSTERS}
+        """), params).rowcount
 
-        db.commit()
+        # 4️⃣ Drop hotspots that have gone quiet for the whole window
+        expired = db.execute(text("""
+            DELETE FROM hotspots
+            WHERE last_occurrence < NOW() - make_interval(days => :window_days)
+        """), params).rowcount
+
+        print(
+            f"[HOTSPOT] Reports {after + 1}..{upto}: "
+            f"{grown} grown, {created} new, {expired} expired"
+        )
 
-        print(f"[HOTSPOT] {len(result)} hotspot(s) detected")
\ No newline at end of file
+    @staticmethod
+    def _params(**extra) -> dict:
+        eps_m = settings.HOTSPOT_RADIUS_METERS
+        return {
+            "eps_m": eps_m,
+            "eps_deg": eps_m / METRES_PER_DEGREE_MIN,
+            "neighbourhood_m": eps_m * NEIGHBOURHOOD_RADII,
+            "neighbourhood_deg": eps_m * NEIGHBOURHOOD_RADII / METRES_PER_DEGREE_MIN,
+            "metric_srid": METRIC_SRID,
+            "min_points": settings.HOTSPOT_MIN_REPORTS,
+            "min_days": settings.HOTSPOT_MIN_DAYS,
+            "window_days": WINDOW_DAYS,
+            "now": datetime.utcnow(),
+            **extra,
+        }
@@ -0,0 +1,363 @@
+import asyncio
+import fcntl
+import glob
+import json
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from itertools import count
+
+from pydantic import ValidationError
+from sqlalchemy.exc import DataError, IntegrityError
+
+from ..config import settings
+from ..database import SessionLocal
+from ..gis.tiles import tile_cache
+from ..schemas import ReportCreate
+from .report_service import ReportService
+
+RETRY_BASE_DELAY = 0.5  # seconds
+RETRY_MAX_DELAY = 30.0
+
+# Errors caused by a record itself: retrying can't help, so the batch is
+# split and the offending record dead-lettered. Anything else (connection
+# loss, timeouts, schema trouble) is retried until it succeeds.
+DATA_ERRORS = (IntegrityError, DataError, ValidationError, ValueError, TypeError, KeyError)
+
+
+def journal_slot_path(base_path: str, slot: int) -> str:
+    """Journal file for a slot: the configured path, then reports-1.jsonl, reports-2.jsonl, ..."""
+    if slot == 0:
+        return base_path
+    root, ext = os.path.splitext(base_path)
+    return f"{root}-{slot}{ext}"
+
+
+class ReportIngestQueue:
+    """
+    Write-behind ingestion for public reports.
+
+    `submit` appends the report to a local append-only journal (JSONL) and
+    to an asyncio queue, then returns at once. A background writer drains
+    the queue in micro-batches (INGEST_BATCH_SIZE reports or INGEST_FLUSH_MS,
+    whichever comes first) with one multi-row INSERT and one commit per
+    batch, then advances a checkpoint (journal byte offset). On startup
+    everything past the checkpoint is replayed.
+
+    Replays are idempotent: each row carries its ingest_id and journaled
+    received_at (unique together), so a batch committed just before a crash
+    is skipped when replayed.
+
+    Batches that fail on a data error (constraint, bad value) are retried
+    record by record and only the records that fail alone go to the
+    dead-letter file (<journal>.dead). Any other failure — the database
+    being down, most often — is retried with capped backoff and the batch
+    stays unacknowledged, however long that takes.
+
+    Each process claims its own journal slot under an exclusive lock, so
+    uvicorn workers never append to or compact each other's journal.
+    Slots left unlocked by processes that are gone (a restart, fewer
+    workers) are adopted: their pending records move into this journal.
+    """
+
+    def __init__(
+        self,
+        journal_path: str,
+        batch_size: int,
+        flush_ms: int,
+        fsync: bool = False,
+        stop_timeout: float = 10.0,
+    ):
+        self.base_path = journal_path
+        self._use_slot(journal_path)
+        self.batch_size = batch_size
+        self.flush_seconds = flush_ms / 1000.0
+        self.fsync = fsync
+        self.stop_timeout = stop_timeout
+
+        self._lock = threading.Lock()
+        self._journal = None
+        self._slot_lock = None
+        self._queue: asyncio.Queue | None = None
+        self._writer: asyncio.Task | None = None
+        self._flush_hooks = []
+
+    # ---------- journal slots ----------
+
+    def _use_slot(self, path: str) -> None:
+        self.journal_path = path
+        self.checkpoint_path = path + ".checkpoint"
+        self.dead_letter_path = path + ".dead"
+
+    @staticmethod
+    def _try_lock(path: str):
+        """Exclusive non-blocking lock on <path>.lock; the open file, or None if another process holds it"""
+        lock = open(path + ".lock", "a")
+        try:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock.close()
+            return None
+        return lock
+
+    def _claim_slot(self) -> None:
+        for slot in count():
+            path = journal_slot_path(self.base_path, slot)
+            lock = self._try_lock(path)
+            if lock is not None:
+                self._slot_lock = lock
+                self._use_slot(path)
+                return
+
+    def _orphan_paths(self) -> list[str]:
+        """Every existing slot journal except this process's own"""
+        root, ext = os.path.splitext(self.base_path)
+        paths = [self.base_path]
+        for path in sorted(glob.glob(f"{glob.escape(root)}-*{ext}")):
+            if path[len(root) + 1:len(path) - len(ext)].isdigit():
+                paths.append(path)
+        return [path for path in paths if path != self.journal_path and os.path.exists(path)]
+
+    def _adopt_orphans(self) -> list[tuple[dict, int]]:
+        """Move the pending records of journals no live process holds into ours"""
+        adopted = []
+        for path in self._orphan_paths():
+            lock = self._try_lock(path)
+            if lock is None:
+                continue  # another worker's live journal
+            try:
+                checkpoint_path = path + ".checkpoint"
+                pending, _, _ = self._pending_records(path, checkpoint_path)
+                # Appended to ours before the orphan is emptied: a crash in between
+                # only replays them twice, which ingest_id makes harmless
+                adopted.extend((record, self._append(record)) for record, _ in pending)
+                with open(path, "wb"):
+                    pass
+                self._write_checkpoint(0, checkpoint_path)
+            finally:
+                lock.close()
+        return adopted
+
+    # ---------- journal ----------
+
+    def _read_checkpoint(self, checkpoint_path: str) -> int:
+        try:
+            with open(checkpoint_path, "r") as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _write_checkpoint(self, offset: int, checkpoint_path: str | None = None) -> None:
+        checkpoint_path = checkpoint_path or self.checkpoint_path
+        tmp = checkpoint_path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(str(offset))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, checkpoint_path)
+
+    def _append(self, record: dict) -> int:
+        """Append one record; returns the journal offset just past it"""
+        line = (json.dumps(record) + "\n").encode()
+        with self._lock:
+            self._journal.write(line)
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            return self._journal.tell()
+
+    def _pending_records(self, journal_path: str, checkpoint_path: str) -> tuple[list[tuple[dict, int]], int, int]:
+        """
+        Journal records past the checkpoint with their end offsets, plus the
+        (checkpoint, end of last complete record) offsets
+        """
+        try:
+            size = os.path.getsize(journal_path)
+        except FileNotFoundError:
+            size = 0
+        # A checkpoint past the end means the journal was replaced
+        start = min(self._read_checkpoint(checkpoint_path), size)
+
+        pending = []
+        end = start
+        if size > start:
+            with open(journal_path, "rb") as f:
+                f.seek(start)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # torn write from a crash mid-append
+                    end += len(line)
+                    pending.append((json.loads(line), end))
+        return pending, start, end
+
+    def _dead_letter(self, record: dict, error: Exception) -> None:
+        line = json.dumps({**record, "error": str(error), "failed_at": datetime.utcnow().isoformat()})
+        with open(self.dead_letter_path, "a") as f:
+            f.write(line + "\n")
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        print(f"[INGEST] Dead-lettered report {record['ingest_id']}: {error}")
+
+    def _compact_if_drained(self, offset: int) -> None:
+        """Start a fresh journal once everything written so far is committed"""
+        with self._lock:
+            if self._journal.tell() != offset:
+                return
+            self._journal.seek(0)
+            self._journal.truncate()
+            self._write_checkpoint(0)
+
+    # ---------- lifecycle ----------
+
+    async def start(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.base_path)), exist_ok=True)
+        self._claim_slot()
+        pending, start, end = self._pending_records(self.journal_path, self.checkpoint_path)
+        self._journal = open(self.journal_path, "ab")
+        # Drop a torn tail so new appends start on a clean line
+        self._journal.truncate(end)
+        self._write_checkpoint(start)
+
+        adopted = self._adopt_orphans()
+        pending.extend(adopted)
+
+        self._queue = asyncio.Queue()
+        for record, offset in pending:
+            self._queue.put_nowait((record, offset))
+        if pending:
+            print(f"[INGEST] Replaying {len(pending)} journaled report(s) from {self.journal_path}"
+                  + (f" ({len(adopted)} adopted from stale journals)" if adopted else ""))
+
+        self._writer = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Flush what's queued (up to stop_timeout), then stop the writer.
+        Anything left is still in the journal and is replayed on next start.
+        """
+        if self._writer is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), self.stop_timeout)
+        except asyncio.TimeoutError:
+            print(f"[INGEST] Stopping with {self.depth()} report(s) unwritten; they stay journaled")
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+        self._writer = None
+        self._journal.close()
+        self._slot_lock.close()  # releases the slot
+        self._slot_lock = None
+
+    def add_flush_hook(self, hook) -> None:
+        """Call hook(reports, ward_ids) (sync, in the writer thread) after each committed batch"""
+        self._flush_hooks.append(hook)
+
+    # ---------- producer ----------
+
+    def submit(self, report: ReportCreate) -> str:
+        """Journal + enqueue a validated report; returns its ingest id"""
+        if self._queue is None:
+            raise RuntimeError("Ingest queue is not running")
+
+        record = {
+            "ingest_id": uuid.uuid4().hex,
+            "received_at": datetime.utcnow().isoformat(),
+            "report": report.model_dump(),
+        }
+        offset = self._append(record)
+        self._queue.put_nowait((record, offset))
+        return record["ingest_id"]
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    # ---------- writer ----------
+
+    async def _next_batch(self) -> list[tuple[dict, int]]:
+        """Block for one record, then gather more until the batch is full or the flush window ends"""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _write_batch(self, records: list[dict]) -> None:
+        reports = [ReportCreate.model_validate(r["report"]) for r in records]
+        keys = [(r["ingest_id"], datetime.fromisoformat(r["received_at"]).replace(tzinfo=timezone.utc)) for r in records]
+        db = SessionLocal()
+        try:
+            # Only rows new to the table reach the hooks (replays aren't counted twice)
+            reports, ward_ids = ReportService.ingest_create(db, reports, keys)
+        finally:
+            db.close()
+
+        for hook in self._flush_hooks:
+            try:
+                hook(reports, ward_ids)
+            except Exception as e:
+                print(f"[INGEST] Flush hook failed: {e}")
+
+        if len(reports) > 100:
+            tile_cache.clear()
+        else:
+            for report in reports:
+                tile_cache.invalidate_point(report.latitude, report.longitude)
+
+    async def _write_with_retries(self, records: list[dict]) -> None:
+        """
+        Write records until they're committed or dead-lettered. Data errors
+        split the batch down to the offending records; other errors are
+        retried with exponential backoff (capped at RETRY_MAX_DELAY)
+        """
+        delay = RETRY_BASE_DELAY
+        while True:
+            try:
+                await asyncio.to_thread(self._write_batch, records)
+                return
+            except DATA_ERRORS as e:
+                if len(records) == 1:
+                    self._dead_letter(records[0], e)
+                    return
+                print(f"[INGEST] Batch of {len(records)} rejected, writing one by one: {e}")
+                for record in records:
+                    await self._write_with_retries([record])
+                return
+            except Exception as e:
+                print(f"[INGEST] Batch of {len(records)} failed, retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RETRY_MAX_DELAY)
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+
+            # Records are only acknowledged (checkpointed) once committed or dead-lettered
+            await self._write_with_retries([record for record, _ in batch])
+
+            offset = batch[-1][1]
+            self._write_checkpoint(offset)
+            self._compact_if_drained(offset)
+            for _ in batch:
+                self._queue.task_done()
+
+
+report_ingest_queue = ReportIngestQueue(
+    journal_path=settings.INGEST_JOURNAL_PATH,
+    batch_size=settings.INGEST_BATCH_SIZE,
+    flush_ms=settings.INGEST_FLUSH_MS,
+    fsync=settings.INGEST_FSYNC,
+    stop_timeout=settings.INGEST_STOP_TIMEOUT_SECONDS,
+)
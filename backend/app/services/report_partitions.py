@@ -0,0 +1,63 @@
+from datetime import datetime, timezone
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..utils.partitions import (
+    add_months, ensure_default_partition, ensure_monthly_partitions, month_start, partitions_before,
+)
+
+REPORTS_TABLE = "reports"
+ARCHIVE_SCHEMA = "reports_archive"
+
+
+class ReportPartitions:
+    """
+    Monthly partition upkeep for the reports table: create partitions ahead
+    of time and apply the retention policy (REPORT_RETENTION_MONTHS) by
+    archiving or dropping whole months. A reports_default partition takes
+    rows outside every month (e.g. journal replays of an old received_at)
+    instead of failing the insert; they move into their month partition
+    when it is created. No-op while reports is still an unpartitioned
+    table (see scripts/partition_reports.py).
+    """
+
+    @staticmethod
+    def is_partitioned(db: Session) -> bool:
+        return bool(db.execute(text("""
+            SELECT EXISTS (
+                SELECT 1
+                FROM pg_partitioned_table pt
+                JOIN pg_class c ON c.oid = pt.partrelid
+                WHERE c.relname = :table
+            )
+        """), {"table": REPORTS_TABLE}).scalar())
+
+    @staticmethod
+    def maintain(db: Session, now: datetime | None = None) -> None:
+        """Ensure upcoming partitions exist and expire old ones (commits)"""
+        if not ReportPartitions.is_partitioned(db):
+            return
+
+        now = now or datetime.now(timezone.utc)
+        ensure_default_partition(db, REPORTS_TABLE)
+        ensure_monthly_partitions(db, REPORTS_TABLE, now, months_ahead=settings.REPORT_PARTITIONS_AHEAD)
+
+        if settings.REPORT_RETENTION_MONTHS > 0:
+            cutoff = add_months(month_start(now), -settings.REPORT_RETENTION_MONTHS)
+            for name in partitions_before(db, REPORTS_TABLE, cutoff):
+                ReportPartitions.expire(db, name)
+
+        db.commit()
+
+    @staticmethod
+    def expire(db: Session, name: str) -> None:
+        """Detach a month into the archive schema, or drop it (REPORT_RETENTION_MODE)"""
+        db.execute(text(f"ALTER TABLE {REPORTS_TABLE} DETACH PARTITION {name}"))
+        if settings.REPORT_RETENTION_MODE == "drop":
+            db.execute(text(f"DROP TABLE {name}"))
+            print(f"[REPORTS] Dropped partition {name}")
+        else:
+            db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+            db.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+            print(f"[REPORTS] Archived partition {name} to {ARCHIVE_SCHEMA}")
@@ -0,0 +1,316 @@
+import base64
+import json
+from datetime import datetime
+from pydantic import ValidationError
+from sqlalchemy import insert, select, text, tuple_
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from ..models import Report, Ward
+from ..schemas import ReportCreate
+from ..gis.operations import GISOperations
+
+SEVERITIES = ("LOW", "MEDIUM", "HIGH")
+
+# Rows fetched per round-trip when streaming with a server-side cursor
+STREAM_BATCH_SIZE = 1000
+
+# Largest batch accepted by POST /api/reports/bulk
+BULK_MAX_ITEMS = 10000
+
+
+class BulkRowError(ValueError):
+    """The database rejected one row of a bulk insert; `position` is its index in the batch"""
+
+    def __init__(self, position: int, message: str):
+        super().__init__(message)
+        self.position = position
+
+
+class ReportService:
+
+    @staticmethod
+    def encode_cursor(created_at: datetime, report_id: int) -> str:
+        """Opaque keyset cursor for (created_at, id)"""
+        raw = json.dumps([created_at.isoformat(), report_id]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[datetime, int]:
+        """Raises ValueError on a malformed cursor"""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            created_at, report_id = json.loads(base64.urlsafe_b64decode(padded))
+            return datetime.fromisoformat(created_at), int(report_id)
+        except Exception as e:
+            raise ValueError("Invalid cursor") from e
+
+    @staticmethod
+    def list_statement(
+        since: datetime | None = None,
+        bbox: tuple[float, float, float, float] | None = None,
+        severities: list[str] | None = None,
+        cursor: tuple[datetime, int] | None = None,
+    ):
+        """
+        Newest-first report rows (plain columns + ward name), keyset-ordered
+        on (created_at, id) so pages are stable while reports keep arriving.
+        A plain SELECT, so it runs on sync and async sessions alike.
+        """
+        query = (
+            select(
+                Report.id,
+                Report.latitude,
+                Report.longitude,
+                Report.severity,
+                Report.description,
+                Report.ward_id,
+                Ward.name.label("ward_name"),
+                Report.created_at,
+            )
+            .outerjoin(Ward, Ward.id == Report.ward_id)
+        )
+
+        if since is not None:
+            query = query.where(Report.created_at >= since)
+        if bbox is not None:
+            min_lng, min_lat, max_lng, max_lat = bbox
+            query = query.where(
+                Report.longitude.between(min_lng, max_lng),
+                Report.latitude.between(min_lat, max_lat),
+            )
+        if severities:
+            query = query.where(Report.severity.in_(severities))
+        if cursor is not None:
+            query = query.where(tuple_(Report.created_at, Report.id) < cursor)
+
+        return query.order_by(Report.created_at.desc(), Report.id.desc())
+
+    @staticmethod
+    def to_dict(row) -> dict:
+        return {
+            "id": row.id,
+            "latitude": row.latitude,
+            "longitude": row.longitude,
+            "severity": row.severity,
+            "description": row.description,
+            "ward_id": row.ward_id,
+            "ward_name": row.ward_name,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+        }
+
+    @staticmethod
+    def to_feature(row) -> dict:
+        properties = ReportService.to_dict(row)
+        properties.pop("latitude")
+        properties.pop("longitude")
+        return {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [row.longitude, row.latitude]},
+            "properties": properties,
+        }
+
+    @staticmethod
+    def encode(row, fmt: str) -> str:
+        """One row as json (array element), ndjson (line) or geojsonseq (RFC 8142 record)"""
+        if fmt == "ndjson":
+            return json.dumps(ReportService.to_dict(row)) + "\n"
+        if fmt == "geojsonseq":
+            return "\x1e" + json.dumps(ReportService.to_feature(row)) + "\n"
+        return json.dumps(ReportService.to_dict(row))
+
+    @staticmethod
+    def serialize(rows, fmt: str):
+        """Yield encoded chunks for an iterable of rows (json is wrapped in one array)"""
+        if fmt != "json":
+            for row in rows:
+                yield ReportService.encode(row, fmt)
+            return
+
+        yield "["
+        first = True
+        for row in rows:
+            yield ("" if first else ",") + ReportService.encode(row, fmt)
+            first = False
+        yield "]"
+
+    @staticmethod
+    async def aserialize(rows, fmt: str):
+        """serialize() for an async iterable of rows"""
+        if fmt != "json":
+            async for row in rows:
+                yield ReportService.encode(row, fmt)
+            return
+
+        yield "["
+        first = True
+        async for row in rows:
+            yield ("" if first else ",") + ReportService.encode(row, fmt)
+            first = False
+        yield "]"
+
+    @staticmethod
+    def parse_bulk(body: bytes, content_type: str) -> list:
+        """
+        Raw items from a JSON array or NDJSON body (blank lines skipped).
+        Raises ValueError if the body itself can't be parsed.
+        """
+        if "ndjson" in content_type or "jsonlines" in content_type:
+            items = []
+            for line_no, line in enumerate(body.splitlines(), start=1):
+                if not line.strip():
+                    continue
+                try:
+                    items.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid JSON on line {line_no}: {e.msg}") from e
+            return items
+
+        try:
+            items = json.loads(body)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e.msg}") from e
+        if not isinstance(items, list):
+            raise ValueError("Body must be a JSON array of reports")
+        return items
+
+    @staticmethod
+    def validate_bulk(items: list) -> tuple[list, list]:
+        """Split raw items into ([(index, ReportCreate)], [{index, error}])"""
+        valid = []
+        errors = []
+        severities = set(SEVERITIES)
+        for index, item in enumerate(items):
+            try:
+                report = ReportCreate.model_validate(item)
+            except ValidationError as e:
+                error = e.errors()[0]
+                field = ".".join(str(part) for part in error["loc"])
+                errors.append({"index": index, "error": f"{field}: {error['msg']}" if field else error["msg"]})
+                continue
+
+            if report.severity not in severities:
+                errors.append({"index": index, "error": "Invalid severity level"})
+            else:
+                valid.append((index, report))
+        return valid, errors
+
+    @staticmethod
+    def bulk_create(db: Session, reports: list, user_id: str = "public") -> tuple[list[int], list[int | None]]:
+        """
+        Insert many reports in one transaction: wards resolved with one
+        index query, rows written with multi-row INSERT ... RETURNING.
+        Returns (new ids, ward ids), both in input order. Raises
+        BulkRowError naming the first row the database rejects (nothing is
+        inserted then).
+        """
+        if not reports:
+            return [], []
+
+        rows, ward_ids = ReportService._insert_rows(db, reports, user_id)
+        try:
+            ids = db.scalars(
+                insert(Report).returning(Report.id, sort_by_parameter_order=True),
+                rows,
+            ).all()
+            db.commit()
+        except (DataError, IntegrityError, ValueError) as e:
+            db.rollback()
+            position = ReportService._first_rejected_row(db, rows)
+            raise BulkRowError(position, str(getattr(e, "orig", e)).strip()) from e
+        except Exception:
+            db.rollback()
+            raise
+        return list(ids), ward_ids
+
+    @staticmethod
+    def _first_rejected_row(db: Session, rows: list[dict]) -> int:
+        """Bisect with savepoints for the first row the database rejects; rolls everything back"""
+        lo, hi = 0, len(rows)
+        try:
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                savepoint = db.begin_nested()
+                try:
+                    db.execute(insert(Report), rows[lo:mid])
+                except (DataError, IntegrityError, ValueError):
+                    savepoint.rollback()
+                    hi = mid
+                    continue
+                savepoint.rollback()
+                lo = mid
+        finally:
+            db.rollback()
+        return lo
+
+    @staticmethod
+    def _insert_rows(db: Session, reports: list, user_id: str) -> tuple[list[dict], list[int | None]]:
+        """Column dicts for an INSERT, wards resolved with one index query"""
+        ward_ids = GISOperations.find_ward_ids(
+            db,
+            [r.latitude for r in reports],
+            [r.longitude for r in reports],
+        )
+        rows = [
+            {
+                "latitude": r.latitude,
+                "longitude": r.longitude,
+                "location": f"SRID=4326;POINT({r.longitude!r} {r.latitude!r})",
+                "severity": r.severity,
+                "description": r.description,
+                "user_id": user_id,
+                "ward_id": ward_id,
+            }
+            for r, ward_id in zip(reports, ward_ids)
+        ]
+        return rows, ward_ids
+
+    @staticmethod
+    def ingest_create(
+        db: Session,
+        reports: list,
+        keys: list[tuple[str, datetime]],
+        user_id: str = "public",
+    ) -> tuple[list, list[int | None]]:
+        """
+        bulk_create for journaled reports: each row carries its (ingest_id,
+        received_at) key and rows already written by an earlier attempt are
+        skipped. Returns (reports inserted now, their ward ids).
+        """
+        if not reports:
+            return [], []
+
+        rows, ward_ids = ReportService._insert_rows(db, reports, user_id)
+        for row, (ingest_id, received_at) in zip(rows, keys):
+            row["ingest_id"] = ingest_id
+            row["created_at"] = received_at  # fixed, so a replay hits the same unique key
+
+        try:
+            inserted = set(db.scalars(
+                pg_insert(Report)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=["ingest_id", "created_at"])
+                .returning(Report.ingest_id)
+            ).all())
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        fresh = [i for i, (ingest_id, _) in enumerate(keys) if ingest_id in inserted]
+        return [reports[i] for i in fresh], [ward_ids[i] for i in fresh]
+
+    @staticmethod
+    def ensure_ingest_key(db: Session) -> None:
+        """Add reports.ingest_id and its unique index to tables created before it existed (commits)"""
+        exists = db.execute(text("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'reports' AND column_name = 'ingest_id'
+        """)).scalar()
+        if not exists:
+            db.execute(text("ALTER TABLE reports ADD COLUMN ingest_id VARCHAR"))
+        db.execute(text("""
+            CREATE UNIQUE INDEX IF NOT EXISTS ux_reports_ingest_id_created_at
+            ON reports (ingest_id, created_at)
+        """))
+        db.commit()
@@ -1,47 +1,176 @@
+import threading
+import numpy as np
+from sqlalchemy import text
 from sqlalchemy.orm import Session
-from app.models import WardRiskScore, Ward
-from app.services.weather_service import WeatherService
-from app.services.hotspot_service import HotspotService
+
+from app.config import settings
+from app.database import SessionLocal
+from app.gis.geojson_cache import geojson_cache, WARDS_RISK_KEY
+from app.gis.tiles import tile_cache
+from app.prediction.risk_calculator import RiskCalculator
+from app.services.risk_snapshot import risk_snapshots
 
 
 class RiskService:
+    """
+    Incremental ward risk between scheduler cycles.
+
+    New reports bump in-memory per-ward counters and mark their ward dirty.
+    A debouncer recomputes all dirty wards together once per
+    RISK_DEBOUNCE_SECONDS, so a burst of reports in one ward costs a single
+    recomputation. Counters are reseeded from grouped queries every
+    scheduler cycle, which also ages out reports older than 30 days.
+    New scores go to the live rows and the risk snapshot overlay; the next
+    scheduler cycle publishes them as a new version.
+    """
+
+    _lock = threading.Lock()
+    _seed_lock = threading.Lock()  # one seed at a time
+    # ward_id -> {"recent_reports", "report_count", "hotspot_count"}; None until seeded
+    _counters: dict | None = None
+    # Wards of reports ingested while a seed is reading (replayed onto its result)
+    _seed_increments: list | None = None
+    _dirty: set = set()
+    _timer: threading.Timer | None = None
+
     @staticmethod
-    def compute_for_ward(db: Session, ward_id: int):
+    def seed(db: Session) -> None:
         """
-        Compute risk score for a single ward
+        Replace the counters with fresh grouped aggregates. Reports ingested
+        while the aggregates are read are counted on top of them, so they
+        aren't lost to the swap
         """
+        with RiskService._seed_lock:
+            with RiskService._lock:
+                RiskService._seed_increments = []
+            try:
+                counters = RiskCalculator.load_ward_aggregates(db)
+            except Exception:
+                with RiskService._lock:
+                    RiskService._seed_increments = None
+                raise
+            with RiskService._lock:
+                for ward_id in RiskService._seed_increments:
+                    RiskService._count_report(counters, ward_id)
+                RiskService._counters = counters
+                RiskService._seed_increments = None
 
-        rainfall = WeatherService.get_recent_rainfall(db, ward_id)
-        recurrence = HotspotService.get_recurrence_score(db, ward_id)
+    @staticmethod
+    def _count_report(counters: dict, ward_id: int) -> None:
+        counts = counters.setdefault(ward_id, {})
+        counts["recent_reports"] = counts.get("recent_reports", 0) + 1
+        counts["report_count"] = counts.get("report_count", 0) + 1
 
-        # Simple weighted risk model (can be improved later)
-        total_score = (
-            0.4 * rainfall +
-            0.3 * recurrence +
-            0.3
-        )
+    @staticmethod
+    def on_reports_ingested(reports: list, ward_ids: list) -> None:
+        """Count committed reports against their wards and schedule a recompute"""
+        wards = [ward_id for ward_id in ward_ids if ward_id is not None]
+        if not wards:
+            return
+
+        with RiskService._lock:
+            if RiskService._counters is not None:
+                for ward_id in wards:
+                    RiskService._count_report(RiskService._counters, ward_id)
+            if RiskService._seed_increments is not None:
+                RiskService._seed_increments.extend(wards)
+            RiskService._dirty.update(wards)
+            RiskService._arm_timer()
+
+    @staticmethod
+    def _arm_timer() -> None:
+        """Schedule a flush unless one is pending (call with _lock held)"""
+        if RiskService._timer is None:
+            RiskService._timer = threading.Timer(settings.RISK_DEBOUNCE_SECONDS, RiskService._flush)
+            RiskService._timer.daemon = True
+            RiskService._timer.start()
+
+    @staticmethod
+    def _flush() -> None:
+        with RiskService._lock:
+            dirty = RiskService._dirty
+            RiskService._dirty = set()
+            RiskService._timer = None
+
+        db = SessionLocal()
+        try:
+            RiskService.compute_for_wards(db, sorted(dirty))
+        except Exception as e:
+            print(f"[RISK] Incremental update failed, retrying in {settings.RISK_DEBOUNCE_SECONDS}s: {e}")
+            db.rollback()
+            # Keep the wards dirty (with any marked meanwhile) and try again
+            with RiskService._lock:
+                RiskService._dirty |= dirty
+                RiskService._arm_timer()
+        finally:
+            db.close()
+
+    @staticmethod
+    def compute_for_wards(db: Session, ward_ids: list) -> int:
+        """
+        Rescore the given wards from the in-memory counters, keeping each
+        ward's current rainfall, and write them back in one statement
+        """
+        if not ward_ids:
+            return 0
+        if RiskService._counters is None:
+            RiskService.seed(db)
 
-        if total_score >= 0.7:
-            level = "HIGH"
-        elif total_score >= 0.4:
-            level = "MEDIUM"
-        else:
-            level = "LOW"
-
-        existing = (
-            db.query(WardRiskScore)
-            .filter(WardRiskScore.ward_id == ward_id)
-            .first()
+        wards = db.execute(
+            text("""
+                SELECT id, rainfall_mm, drainage_stress, population_density
+                FROM wards
+                WHERE id = ANY(:ids)
+                ORDER BY id
+            """),
+            {"ids": list(ward_ids)}
+        ).fetchall()
+        if not wards:
+            return 0
+
+        with RiskService._lock:
+            counts = [dict(RiskService._counters.get(ward.id, {})) for ward in wards]
+
+        recent = np.array([c.get("recent_reports", 0) for c in counts], dtype=float)
+        hotspots = np.array([c.get("hotspot_count", 0) for c in counts], dtype=float)
+        rainfall = np.array([ward.rainfall_mm or 0.0 for ward in wards], dtype=float)
+
+        scores = RiskCalculator.calculate_risk_scores(
+            rainfall_mm=rainfall,
+            recurrence_rate=np.minimum(recent / 10.0, 1.0),
+            hotspot_persistence=np.minimum(hotspots / 5.0, 1.0),
+            drainage_stress=np.array([ward.drainage_stress or 0.5 for ward in wards]),
+            population_exposure=np.array([ward.population_density or 0.5 for ward in wards]),
         )
+        levels = RiskCalculator.get_risk_levels(scores)
 
-        if existing:
-            existing.total_risk_score = total_score
-            existing.risk_level = level
-        else:
-            db.add(
-                WardRiskScore(
-                    ward_id=ward_id,
-                    total_risk_score=total_score,
-                    risk_level=level
-                )
+        rows = [
+            (
+                ward.id,
+                float(score),
+                str(level),
+                float(rain),
+                c.get("report_count", 0),
+                c.get("hotspot_count", 0),
             )
+            for ward, score, level, rain, c in zip(wards, scores, levels, rainfall, counts)
+        ]
+        RiskCalculator.write_ward_risks(db, rows)
+
+        # Unversioned reads pick these up without a new snapshot version
+        risk_snapshots.apply_updates({
+            ward_id: {
+                "risk_score": score,
+                "risk_level": level,
+                "rainfall_mm": rain,
+                "report_count": report_count,
+                "hotspot_count": hotspot_count,
+            }
+            for ward_id, score, level, rain, report_count, hotspot_count in rows
+        })
+        # Risk map payloads and tiles carry these scores
+        geojson_cache.invalidate(WARDS_RISK_KEY)
+        tile_cache.clear()
+
+        print(f"[RISK] Recomputed {len(wards)} dirty ward(s)")
+        return len(wards)
@@ -0,0 +1,205 @@
+import threading
+from datetime import datetime, timezone
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..gis.ward_geometry import DERIVED_SELECT, bbox_list, centroid_dict
+from ..models import RiskSnapshot
+from ..utils.cache import LRUCache
+
+# Live hotspot rows, as served by /api/hotspots
+HOTSPOTS_SQL = """
+    SELECT
+        h.id,
+        ST_Y(h.location) AS latitude,
+        ST_X(h.location) AS longitude,
+        h.frequency,
+        h.ward_id,
+        w.ward_name AS ward_name,
+        h.avg_rainfall,
+        COALESCE(h.last_occurrence, h.created_at) AS last_occurrence
+    FROM hotspots h
+    LEFT JOIN wards w ON w.id = h.ward_id
+    WHERE h.frequency > 0
+    ORDER BY h.last_occurrence DESC NULLS LAST
+"""
+
+
+def hotspot_to_dict(row) -> dict:
+    return {
+        "id": row.id,
+        "latitude": row.latitude,
+        "longitude": row.longitude,
+        "frequency": row.frequency,
+        "ward_id": row.ward_id or 0,
+        "ward_name": row.ward_name or "Unknown",
+        "avg_rainfall": row.avg_rainfall or 0.0,
+        "last_occurrence": row.last_occurrence.isoformat() if row.last_occurrence else None,
+    }
+
+
+class Snapshot:
+    """One published, read-only version of the ward risk state"""
+
+    __slots__ = ("version", "created_at", "total_reports", "total_hotspots", "high_risk_wards", "wards", "hotspots", "by_ward")
+
+    def __init__(self, row: RiskSnapshot):
+        self.version = row.id
+        self.created_at = row.created_at
+        self.total_reports = row.total_reports
+        self.total_hotspots = row.total_hotspots
+        self.high_risk_wards = row.high_risk_wards
+        self.wards = row.payload["wards"]
+        self.hotspots = row.payload["hotspots"]
+        self.by_ward = {ward["id"]: ward for ward in self.wards}
+
+    def updated(self, changes: dict) -> "Snapshot":
+        """Copy with per-ward field changes ({ward_id: {field: value}}) applied"""
+        snapshot = object.__new__(Snapshot)
+        for name in self.__slots__:
+            setattr(snapshot, name, getattr(self, name))
+        snapshot.wards = [{**ward, **changes[ward["id"]]} if ward["id"] in changes else ward for ward in self.wards]
+        snapshot.by_ward = {ward["id"]: ward for ward in snapshot.wards}
+        snapshot.high_risk_wards = sum(1 for ward in snapshot.wards if ward["risk_level"] == "HIGH")
+        return snapshot
+
+
+class RiskSnapshotStore:
+    """
+    Versioned risk snapshots for the read endpoints.
+
+    The scheduler (and the report-driven risk updater) publish a snapshot
+    after each update: ward scores/levels/counts, the hotspot list and the
+    dashboard totals, stored as one risk_snapshots row. Readers get the
+    latest from memory, or any recent version with one single-row fetch,
+    so they never touch the wards/hotspots tables mid-update.
+
+    Only the scheduler publishes (one version per cycle). Report-driven
+    rescoring between cycles goes into an in-memory overlay on the latest
+    version: unversioned reads see it, `?version=` reads get the published
+    snapshot unchanged. The overlay is dropped when the next version lands.
+    """
+
+    def __init__(self, keep_in_memory: int):
+        self._lock = threading.Lock()
+        self._latest: Snapshot | None = None
+        self._versions = LRUCache(keep_in_memory)
+        self._overlay: dict = {}
+        self._current: Snapshot | None = None  # latest with the overlay applied
+
+    def _remember(self, snapshot: Snapshot) -> Snapshot:
+        with self._lock:
+            self._versions.set(snapshot.version, snapshot)
+            if self._latest is None or snapshot.version > self._latest.version:
+                self._latest = snapshot
+                # Published from the live rows, which already carry the overlay
+                self._overlay = {}
+                self._current = snapshot
+        return snapshot
+
+    def _cached(self, version: int | None) -> Snapshot | None:
+        return self._current if version is None else self._versions.get(version)
+
+    def apply_updates(self, changes: dict) -> None:
+        """Overlay per-ward changes ({ward_id: {field: value}}) on the latest version"""
+        with self._lock:
+            for ward_id, fields in changes.items():
+                self._overlay.setdefault(ward_id, {}).update(fields)
+            if self._latest is not None:
+                self._current = self._latest.updated(self._overlay)
+
+    @property
+    def latest_version(self) -> int | None:
+        latest = self._latest
+        return latest.version if latest else None
+
+    @staticmethod
+    def _query(version: int | None):
+        query = select(RiskSnapshot)
+        if version is None:
+            return query.order_by(RiskSnapshot.id.desc()).limit(1)
+        return query.where(RiskSnapshot.id == version)
+
+    def load(self, db: Session, version: int | None = None) -> Snapshot | None:
+        """Snapshot `version` (latest when None) from memory, else one row from the table"""
+        snapshot = self._cached(version)
+        if snapshot is None:
+            row = db.execute(self._query(version)).scalar_one_or_none()
+            snapshot = self._remember(Snapshot(row)) if row else None
+        return snapshot
+
+    async def aload(self, db: AsyncSession, version: int | None = None) -> Snapshot | None:
+        """load() on an async session"""
+        snapshot = self._cached(version)
+        if snapshot is None:
+            row = (await db.execute(self._query(version))).scalar_one_or_none()
+            snapshot = self._remember(Snapshot(row)) if row else None
+        return snapshot
+
+    def publish(self, db: Session) -> Snapshot:
+        """Capture the current ward/hotspot state as a new version (commits)"""
+        # One consistent read of wards, hotspots and totals
+        db.commit()
+        db.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ"))
+        wards = db.execute(text(f"""
+            SELECT
+                id,
+                ward_name,
+                COALESCE(risk_score, 0) AS risk_score,
+                COALESCE(risk_level, 'LOW') AS risk_level,
+                COALESCE(rainfall_mm, 0) AS rainfall_mm,
+                COALESCE(report_count, 0) AS report_count,
+                COALESCE(hotspot_count, 0) AS hotspot_count,
+                {DERIVED_SELECT}
+            FROM wards
+            ORDER BY id
+        """)).fetchall()
+        hotspots = db.execute(text(HOTSPOTS_SQL)).fetchall()
+        totals = db.execute(text("""
+            SELECT
+                (SELECT COUNT(*) FROM reports) AS total_reports,
+                (SELECT COUNT(*) FROM hotspots) AS total_hotspots
+        """)).fetchone()
+
+        row = RiskSnapshot(
+            total_reports=totals.total_reports,
+            total_hotspots=totals.total_hotspots,
+            high_risk_wards=sum(1 for w in wards if w.risk_level == "HIGH"),
+            payload={
+                "wards": [
+                    {
+                        "id": w.id,
+                        "name": w.ward_name,
+                        "risk_score": float(w.risk_score),
+                        "risk_level": w.risk_level,
+                        "rainfall_mm": float(w.rainfall_mm),
+                        "report_count": w.report_count,
+                        "hotspot_count": w.hotspot_count,
+                        "centroid": centroid_dict(w),
+                        "area_sq_km": w.area_sq_km,
+                        "bbox": bbox_list(w),
+                    }
+                    for w in wards
+                ],
+                "hotspots": [hotspot_to_dict(h) for h in hotspots],
+            },
+            created_at=datetime.now(timezone.utc),
+        )
+        db.add(row)
+        db.flush()
+        # Read before commit expires the row's attributes
+        snapshot = Snapshot(row)
+        db.execute(
+            text("DELETE FROM risk_snapshots WHERE id <= :oldest"),
+            {"oldest": snapshot.version - settings.RISK_SNAPSHOT_KEEP}
+        )
+        db.commit()
+
+        self._remember(snapshot)
+        print(f"[SNAPSHOT] Published risk snapshot v{snapshot.version}")
+        return snapshot
+
+
+risk_snapshots = RiskSnapshotStore(settings.RISK_SNAPSHOT_MEMORY)
@@ -1,30 +1,62 @@
+import asyncio
+import random
 import httpx
 from datetime import datetime, timedelta
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from ..config import settings
 from ..models import WeatherCache
+from ..utils.cache import TTLCache
+from ..utils.rate_limit import TokenBucket
+from .weather_grid import grid_for_wards
+
+# Shared across runs so the OpenWeather quota holds between scheduler cycles
+_rate_limiter = TokenBucket(
+    rate=settings.WEATHER_RATE_PER_MINUTE / 60.0,
+    capacity=max(1, settings.WEATHER_MAX_CONCURRENCY),
+)
+
+# Process-local tier in front of the weather_cache table: ward_id -> (rain_1h, rain_3h)
+_memory_cache = TTLCache(
+    maxsize=settings.WEATHER_MEMORY_CACHE_SIZE,
+    ttl=settings.WEATHER_CACHE_DURATION,
+)
+# Refreshes in flight per ward (futures belong to the loop that created them)
+_inflight: dict = {}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_BASE_DELAY = 0.5  # seconds
+
 
 class WeatherService:
-    BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
-    
+    BASE_URL = settings.OPENWEATHER_BASE_URL
+
     @staticmethod
-    async def get_rainfall(lat: float, lng: float, db: Session, ward_id: int = None) -> float:
-        """Get rainfall data from OpenWeather API with caching"""
-        
-        # Check cache first
-        if ward_id:
-            cache = db.query(WeatherCache).filter(
-                WeatherCache.ward_id == ward_id
-            ).first()
-            
-            if cache and cache.cached_at:
-                age = datetime.utcnow() - cache.cached_at.replace(tzinfo=None)
-                if age < timedelta(seconds=settings.WEATHER_CACHE_DURATION):
-                    return cache.rainfall_1h + cache.rainfall_3h
-        
-        # Fetch from API
-        try:
-            async with httpx.AsyncClient() as client:
+    def client() -> httpx.AsyncClient:
+        """One pooled client per batch — connections (and TLS sessions) are reused"""
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.WEATHER_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=settings.WEATHER_MAX_CONCURRENCY,
+                max_keepalive_connections=settings.WEATHER_MAX_CONCURRENCY,
+            ),
+        )
+
+    @staticmethod
+    def total_rainfall(rain_1h: float, rain_3h: float) -> float:
+        """Hourly rainfall rate; the 3h accumulation is normalized to hourly"""
+        return (rain_1h or 0.0) + (rain_3h or 0.0) / 3
+
+    @staticmethod
+    async def fetch_observation(client: httpx.AsyncClient, lat: float, lng: float) -> tuple[float, float]:
+        """
+        Fetch (rain_1h, rain_3h) for a point, rate-limited, retrying
+        transport errors, 429 and 5xx with exponential backoff + jitter
+        """
+        for attempt in range(settings.WEATHER_MAX_RETRIES + 1):
+            await _rate_limiter.acquire()
+            delay = RETRY_BASE_DELAY * 2 ** attempt
+            try:
                 response = await client.get(
                     WeatherService.BASE_URL,
                     params={
@@ -33,49 +65,199 @@ class WeatherService:
                         "appid": settings.OPENWEATHER_API_KEY,
                         "units": "metric"
                     },
-                    timeout=10.0
                 )
+                if response.status_code in RETRY_STATUSES and attempt < settings.WEATHER_MAX_RETRIES:
+                    retry_after = response.headers.get("Retry-After")
+                    if retry_after and retry_after.isdigit():
+                        delay = max(delay, float(retry_after))
+                    await asyncio.sleep(random.uniform(0, delay))
+                    continue
+
                 response.raise_for_status()
-                data = response.json()
-                
-                rain_1h = data.get("rain", {}).get("1h", 0.0)
-                rain_3h = data.get("rain", {}).get("3h", 0.0)
-                total_rain = rain_1h + (rain_3h / 3)  # Normalize 3h to hourly rate
-                
-                # Update cache
-                if ward_id:
-                    if cache:
-                        cache.rainfall_1h = rain_1h
-                        cache.rainfall_3h = rain_3h
-                        cache.cached_at = datetime.utcnow()
-                    else:
-                        cache = WeatherCache(
-                            ward_id=ward_id,
-                            rainfall_1h=rain_1h,
-                            rainfall_3h=rain_3h
-                        )
-                        db.add(cache)
-                    db.commit()
-                
-                return total_rain
-                
+                rain = response.json().get("rain", {})
+                return rain.get("1h", 0.0), rain.get("3h", 0.0)
+
+            except httpx.TransportError:
+                if attempt >= settings.WEATHER_MAX_RETRIES:
+                    raise
+                await asyncio.sleep(random.uniform(0, delay))
+
+        raise RuntimeError("unreachable")
+
+    @staticmethod
+    def _remaining_ttl(cache: WeatherCache | None) -> float:
+        """Seconds until a weather_cache row goes stale (<= 0 when stale or missing)"""
+        if not cache or not cache.cached_at:
+            return 0.0
+        age = datetime.utcnow() - cache.cached_at.replace(tzinfo=None)
+        return settings.WEATHER_CACHE_DURATION - age.total_seconds()
+
+    @staticmethod
+    def _read_through(db: Session, ward_ids: list) -> tuple[dict, dict]:
+        """
+        Two-tier read. Returns ({ward_id: (rain_1h, rain_3h)} for fresh wards,
+        {ward_id: WeatherCache | None} for stale ones). Postgres is only
+        queried for wards missing from the in-memory tier.
+        """
+        fresh = {}
+        misses = []
+        for ward_id in ward_ids:
+            observation = _memory_cache.get(ward_id)
+            if observation is not None:
+                fresh[ward_id] = observation
+            else:
+                misses.append(ward_id)
+
+        stale = {}
+        if misses:
+            rows = {
+                c.ward_id: c
+                for c in db.query(WeatherCache).filter(WeatherCache.ward_id.in_(misses)).all()
+            }
+            for ward_id in misses:
+                cache = rows.get(ward_id)
+                remaining = WeatherService._remaining_ttl(cache)
+                if remaining > 0:
+                    fresh[ward_id] = (cache.rainfall_1h, cache.rainfall_3h)
+                    _memory_cache.set(ward_id, fresh[ward_id], ttl=remaining)
+                else:
+                    stale[ward_id] = cache
+
+        return fresh, stale
+
+    @staticmethod
+    def _write_through(db: Session, observations: dict) -> None:
+        """
+        Put fresh observations in memory and persist them in one batched
+        upsert (weather_cache.ward_id has no unique constraint, so the rows
+        are replaced with a single DELETE + multi-row INSERT) and one commit
+        """
+        if not observations:
+            return
+        for ward_id, observation in observations.items():
+            _memory_cache.set(ward_id, observation)
+
+        now = datetime.utcnow()
+        db.query(WeatherCache).filter(
+            WeatherCache.ward_id.in_(list(observations))
+        ).delete(synchronize_session=False)
+        db.execute(
+            insert(WeatherCache),
+            [
+                {"ward_id": ward_id, "rainfall_1h": rain_1h, "rainfall_3h": rain_3h, "cached_at": now}
+                for ward_id, (rain_1h, rain_3h) in observations.items()
+            ]
+        )
+        db.commit()
+
+    @staticmethod
+    async def get_rainfall(lat: float, lng: float, db: Session, ward_id: int = None) -> float:
+        """Get rainfall data from OpenWeather API with two-tier caching"""
+        if not ward_id:
+            try:
+                async with WeatherService.client() as client:
+                    return WeatherService.total_rainfall(
+                        *await WeatherService.fetch_observation(client, lat, lng)
+                    )
+            except Exception as e:
+                print(f"Weather API error: {e}")
+                return 0.0
+
+        observation = _memory_cache.get(ward_id)
+        if observation is not None:
+            return WeatherService.total_rainfall(*observation)
+
+        # Single-flight: concurrent callers for an expired ward share one refresh
+        loop = asyncio.get_running_loop()
+        inflight = _inflight.get(ward_id)
+        if inflight is not None and inflight.get_loop() is loop:
+            observation = await asyncio.shield(inflight)
+            return WeatherService.total_rainfall(*observation) if observation else 0.0
+
+        future = loop.create_future()
+        _inflight[ward_id] = future
+        observation = None
+        try:
+            observation = await WeatherService._refresh_one(lat, lng, db, ward_id)
+        finally:
+            _inflight.pop(ward_id, None)
+            future.set_result(observation)
+
+        return WeatherService.total_rainfall(*observation) if observation else 0.0
+
+    @staticmethod
+    async def _refresh_one(lat: float, lng: float, db: Session, ward_id: int) -> tuple | None:
+        fresh, stale = WeatherService._read_through(db, [ward_id])
+        if ward_id in fresh:
+            return fresh[ward_id]
+
+        try:
+            async with WeatherService.client() as client:
+                observation = await WeatherService.fetch_observation(client, lat, lng)
         except Exception as e:
             print(f"Weather API error: {e}")
-            return 0.0
-    
+            cache = stale.get(ward_id)
+            return (cache.rainfall_1h, cache.rainfall_3h) if cache else None
+
+        WeatherService._write_through(db, {ward_id: observation})
+        return observation
+
     @staticmethod
     async def get_rainfall_batch(wards: list, db: Session) -> dict:
-        """Get rainfall for multiple wards"""
-        rainfall_data = {}
-        for ward in wards:
-            if ward.centroid_lat and ward.centroid_lng:
-                rainfall = await WeatherService.get_rainfall(
-                    ward.centroid_lat, 
-                    ward.centroid_lng, 
-                    db, 
-                    ward.id
+        """
+        Get rainfall for multiple wards: two-tier cache read, one observation
+        per weather grid cell fetched concurrently over a shared client
+        (bounded by WEATHER_MAX_CONCURRENCY), IDW-interpolated per ward,
+        one batched cache write
+        """
+        located = [ward for ward in wards if ward.centroid_lat and ward.centroid_lng]
+        fresh, stale_rows = WeatherService._read_through(db, [ward.id for ward in located])
+
+        rainfall_data = {ward.id: 0.0 for ward in wards}
+        for ward_id, observation in fresh.items():
+            rainfall_data[ward_id] = WeatherService.total_rainfall(*observation)
+
+        if not stale_rows:
+            return rainfall_data
+
+        grid = grid_for_wards(wards)
+        cells = sorted(grid.cells_for(stale_rows))
+        semaphore = asyncio.Semaphore(settings.WEATHER_MAX_CONCURRENCY)
+
+        async def fetch(client, position):
+            async with semaphore:
+                lat, lng = grid.cell_center(position)
+                return await WeatherService.fetch_observation(client, lat, lng)
+
+        async with WeatherService.client() as client:
+            results = await asyncio.gather(
+                *(fetch(client, position) for position in cells),
+                return_exceptions=True
+            )
+
+        rain_1h_by_cell = {}
+        rain_3h_by_cell = {}
+        for position, result in zip(cells, results):
+            if isinstance(result, Exception):
+                print(f"Weather API error for cell {grid.cells[position]}: {result}")
+                continue
+            rain_1h_by_cell[position], rain_3h_by_cell[position] = result
+
+        print(f"[WEATHER] {len(cells)} grid observation(s) for {len(stale_rows)} ward(s)")
+
+        observations = {}
+        for ward_id, cache in stale_rows.items():
+            rain_1h = grid.interpolate(ward_id, rain_1h_by_cell)
+            rain_3h = grid.interpolate(ward_id, rain_3h_by_cell)
+            if rain_1h is None:
+                # Every nearby cell failed — fall back to the stale observation
+                rainfall_data[ward_id] = (
+                    WeatherService.total_rainfall(cache.rainfall_1h, cache.rainfall_3h) if cache else 0.0
                 )
-                rainfall_data[ward.id] = rainfall
-            else:
-                rainfall_data[ward.id] = 0.0
+                continue
+
+            observations[ward_id] = (rain_1h, rain_3h)
+            rainfall_data[ward_id] = WeatherService.total_rainfall(rain_1h, rain_3h)
+
+        WeatherService._write_through(db, observations)
         return rainfall_data
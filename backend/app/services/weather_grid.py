@@ -0,0 +1,85 @@
+import math
+from ..config import settings
+
+
+class WeatherGrid:
+    """
+    Ward centroids snapped to a regular lat/lng grid.
+
+    One observation is fetched per occupied cell (at the cell centre) and each
+    ward's rainfall is interpolated with inverse-distance weighting over the
+    occupied cells around it. Weights depend only on the ward set, so they are
+    computed once and reused every cycle.
+    """
+
+    def __init__(self, centroids: dict[int, tuple[float, float]], cell_deg: float, power: float):
+        self.cell_deg = cell_deg
+        self.power = power
+
+        occupied = sorted({self.cell_of(lat, lng) for lat, lng in centroids.values()})
+        self.cells = occupied
+        index = {cell: i for i, cell in enumerate(occupied)}
+
+        # ward_id -> [(cell position, normalized weight)]
+        self.weights: dict[int, list[tuple[int, float]]] = {}
+        for ward_id, (lat, lng) in centroids.items():
+            ci, cj = self.cell_of(lat, lng)
+            neighbours = [
+                index[(ci + di, cj + dj)]
+                for di in (-1, 0, 1)
+                for dj in (-1, 0, 1)
+                if (ci + di, cj + dj) in index
+            ]
+            self.weights[ward_id] = self._idw_weights(lat, lng, neighbours)
+
+    def cell_of(self, lat: float, lng: float) -> tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg)
+
+    def cell_center(self, position: int) -> tuple[float, float]:
+        """(lat, lng) where the cell's observation is taken"""
+        ci, cj = self.cells[position]
+        return (ci + 0.5) * self.cell_deg, (cj + 0.5) * self.cell_deg
+
+    def _idw_weights(self, lat: float, lng: float, positions: list[int]) -> list[tuple[int, float]]:
+        # Distances in a local equirectangular frame (degrees, lng scaled by cos(lat))
+        scale = math.cos(math.radians(lat))
+        raw = []
+        for position in positions:
+            clat, clng = self.cell_center(position)
+            d = math.hypot(lat - clat, (lng - clng) * scale)
+            if d < 1e-9:
+                return [(position, 1.0)]
+            raw.append((position, 1.0 / d ** self.power))
+        total = sum(w for _, w in raw)
+        return [(p, w / total) for p, w in raw]
+
+    def cells_for(self, ward_ids) -> set[int]:
+        """Cell positions whose observations these wards depend on"""
+        return {p for ward_id in ward_ids for p, _ in self.weights.get(ward_id, [])}
+
+    def interpolate(self, ward_id: int, cell_values: dict[int, float]) -> float | None:
+        """IDW value for a ward; cells without a value are skipped and weights renormalized"""
+        available = [(cell_values[p], w) for p, w in self.weights.get(ward_id, []) if p in cell_values]
+        total = sum(w for _, w in available)
+        if total <= 0:
+            return None
+        return sum(v * w for v, w in available) / total
+
+
+_grid_cache: dict = {}
+
+
+def grid_for_wards(wards: list) -> WeatherGrid:
+    """Grid + IDW weights for a ward set, rebuilt only when the set (or its centroids) changes"""
+    centroids = {
+        ward.id: (ward.centroid_lat, ward.centroid_lng)
+        for ward in wards
+        if ward.centroid_lat and ward.centroid_lng
+    }
+    key = (settings.WEATHER_GRID_DEG, settings.WEATHER_IDW_POWER, tuple(sorted(centroids.items())))
+    grid = _grid_cache.get(key)
+    if grid is None:
+        grid = WeatherGrid(centroids, settings.WEATHER_GRID_DEG, settings.WEATHER_IDW_POWER)
+        _grid_cache.clear()
+        _grid_cache[key] = grid
+    return grid
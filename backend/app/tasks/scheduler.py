@@ -1,15 +1,23 @@
 from apscheduler.schedulers.background import BackgroundScheduler
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer
 from datetime import datetime
 import asyncio
 
 from app.database import SessionLocal
 from app.models import Ward
+from app.gis.ward_index import ward_index
+from app.gis.geojson_cache import geojson_cache, WARDS_RISK_KEY, RISK_CURVES_KEY
+from app.gis.tiles import tile_cache
 from app.services.weather import WeatherService
 from app.prediction.risk_calculator import RiskCalculator
+from app.prediction.risk_matrix import invalidate_feature_matrix, get_feature_matrix, build_risk_curves
 
 # 🔥 REQUIRED IMPORT (ADDED)
 from app.services.hotspot_service import HotspotService
+from app.services.risk_service import RiskService
+from app.services.risk_snapshot import risk_snapshots
+from app.services.history_service import HistoryService
+from app.services.report_partitions import ReportPartitions
 
 scheduler = BackgroundScheduler()
 
@@ -21,30 +29,43 @@ def update_weather_and_risks():
     db: Session = SessionLocal()
 
     try:
-        wards = db.query(Ward).all()
+        # Pick up reloaded wards (scripts/load_wards.py) without a restart
+        if ward_index.refresh_if_changed(db):
+            geojson_cache.invalidate()
+            tile_cache.clear()
 
-        async def run():
-            for ward in wards:
-                if ward.centroid_lat and ward.centroid_lng:
-                    # ✅ Correct async call
-                    rainfall = await WeatherService.get_rainfall(
-                        ward.centroid_lat,
-                        ward.centroid_lng,
-                        db,
-                        ward.id
-                    )
+        # Stored centroids feed the weather grid; boundaries aren't needed here
+        wards = db.query(Ward).options(defer(Ward.geometry)).all()
 
-                    # ✅ RiskCalculator reads rainfall from DB
-                    RiskCalculator.update_ward_risk(db, ward, rainfall)
-                    
+        # Concurrent, rate-limited fetch over one pooled client
+        rainfall = asyncio.run(WeatherService.get_rainfall_batch(wards, db))
 
-            db.commit()
-
-        asyncio.run(run())
+        # Grouped aggregates + one bulk UPDATE for every ward
+        RiskCalculator.update_all_ward_risks(db, wards, rainfall)
 
         # 🔥 Recompute hotspots after risk update (ADDED)
         HotspotService.recompute_hotspots(db)
 
+        # Reseed the report-driven updater (ages out old reports, picks up new hotspots)
+        RiskService.seed(db)
+
+        # Tiles and the simulation matrix carry risk scores and hotspots — drop them
+        tile_cache.clear()
+        invalidate_feature_matrix()
+
+        # Readers switch to the new scores and hotspots in one step
+        risk_snapshots.publish(db)
+        geojson_cache.invalidate(WARDS_RISK_KEY)
+
+        # Append this tick to the risk history and apply retention
+        HistoryService.record_tick(db)
+        HistoryService.prune(db)
+        ReportPartitions.maintain(db)
+
+        # Precompute the simulation curves so the admin UI renders instantly
+        geojson_cache.invalidate(RISK_CURVES_KEY)
+        geojson_cache.get(RISK_CURVES_KEY, lambda: build_risk_curves(get_feature_matrix(db)))
+
         print(f"[{datetime.now()}] Updated {len(wards)} wards")
 
     except Exception as e:
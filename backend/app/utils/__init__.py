@@ -0,0 +1,4 @@
+from .cache import LRUCache, TTLCache
+from .rate_limit import TokenBucket
+
+__all__ = ["LRUCache", "TTLCache", "TokenBucket"]
@@ -0,0 +1,122 @@
+from datetime import datetime, timezone
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+def month_start(moment: datetime) -> datetime:
+    """First instant (UTC) of the month containing `moment`"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(start: datetime, months: int) -> datetime:
+    index = start.year * 12 + start.month - 1 + months
+    return start.replace(year=index // 12, month=index % 12 + 1)
+
+
+def month_partition_name(table: str, start: datetime) -> str:
+    return f"{table}_y{start.year:04d}m{start.month:02d}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def ensure_default_partition(db: Session, table: str) -> None:
+    """Catch-all partition for rows outside every month partition (idempotent)"""
+    db.execute(text(f"CREATE TABLE IF NOT EXISTS {default_partition_name(table)} PARTITION OF {table} DEFAULT"))
+
+
+def relation_exists(db: Session, name: str) -> bool:
+    return db.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+
+
+def partition_key(db: Session, table: str) -> str:
+    """The column a single-column RANGE-partitioned table is partitioned on"""
+    definition = db.execute(text("SELECT pg_get_partkeydef(CAST(:table AS regclass))"), {"table": table}).scalar()
+    return definition[definition.index("(") + 1:definition.rindex(")")].strip()
+
+
+def ensure_monthly_partitions(db: Session, table: str, moment: datetime, months_ahead: int = 1) -> None:
+    """Create the month partitions of a RANGE-partitioned table around `moment` (idempotent)"""
+    start = month_start(moment)
+    default = default_partition_name(table)
+    has_default = relation_exists(db, default)
+    for offset in range(months_ahead + 1):
+        lower = add_months(start, offset)
+        upper = add_months(lower, 1)
+        name = month_partition_name(table, lower)
+        if has_default and not relation_exists(db, name):
+            # Postgres refuses a new partition while the default holds rows in its range
+            move_from_default(db, table, name, lower, upper)
+            continue
+        db.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {name}
+            PARTITION OF {table}
+            FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')
+        """))
+
+
+def move_from_default(db: Session, table: str, name: str, lower: datetime, upper: datetime) -> int:
+    """Create month partition `name`, moving the default partition's rows for that month into it"""
+    default = default_partition_name(table)
+    key = partition_key(db, table)
+    bounds = {"lower": lower, "upper": upper}
+    in_range = f"{key} >= :lower AND {key} < :upper"
+
+    moving = db.execute(text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})"), bounds).scalar()
+    if moving:
+        db.execute(text(f"CREATE TEMP TABLE {name}_moving (LIKE {table}) ON COMMIT DROP"))
+        db.execute(
+            text(f"""
+                WITH moved AS (DELETE FROM {default} WHERE {in_range} RETURNING *)
+                INSERT INTO {name}_moving SELECT * FROM moved
+            """),
+            bounds
+        )
+    db.execute(text(f"""
+        CREATE TABLE {name}
+        PARTITION OF {table}
+        FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')
+    """))
+    if not moving:
+        return 0
+    moved = db.execute(text(f"INSERT INTO {table} SELECT * FROM {name}_moving")).rowcount
+    db.execute(text(f"DROP TABLE {name}_moving"))
+    print(f"[PARTITIONS] Moved {moved} row(s) from {default} into {name}")
+    return moved
+
+
+def list_monthly_partitions(db: Session, table: str) -> list[tuple[str, datetime]]:
+    """(partition name, month start) for each month partition of `table`, oldest first"""
+    rows = db.execute(
+        text("""
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = :table
+        """),
+        {"table": table}
+    ).fetchall()
+
+    partitions = []
+    prefix = f"{table}_y"
+    for (name,) in rows:
+        suffix = name[len(prefix):] if name.startswith(prefix) else ""
+        try:
+            year, month = suffix.split("m")
+            partitions.append((name, datetime(int(year), int(month), 1, tzinfo=timezone.utc)))
+        except ValueError:
+            continue  # default or hand-made partitions aren't managed here
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def partitions_before(db: Session, table: str, cutoff: datetime) -> list[str]:
+    """Month partitions whose whole range ends on or before `cutoff`"""
+    return [
+        name
+        for name, start in list_monthly_partitions(db, table)
+        if add_months(start, 1) <= cutoff
+    ]
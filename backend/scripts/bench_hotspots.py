@@ -0,0 +1,159 @@
+"""
+Benchmark hotspot clustering on synthetic Delhi report clouds.
+
+    python scripts/bench_hotspots.py                  # 10k .. 5M points, python engine
+    python scripts/bench_hotspots.py --sizes 10000 100000 --sql
+
+Each cloud is uniform background noise over the Delhi bbox plus Gaussian
+clusters, with report times spread over the 90-day window. The python engine
+(app.gis.clustering) is timed with peak memory from tracemalloc; with --sql
+and DATABASE_URL set, the same points are loaded into a temp table and
+clustered with ST_ClusterDBSCAN for comparison.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from app.gis.clustering import detect_hotspots
+
+load_dotenv()
+
+DELHI_BBOX = (28.40, 76.84, 28.88, 77.35)  # min_lat, min_lng, max_lat, max_lng
+WINDOW_SECONDS = 90 * 86400
+DEFAULT_SIZES = (10_000, 100_000, 500_000, 1_000_000, 5_000_000)
+
+
+def synthetic_reports(n: int, hotspot_share: float = 0.3, seed: int = 42) -> dict:
+    """Background noise + Gaussian hotspots (sigma ~50m), timestamps over 90 days"""
+    rng = np.random.default_rng(seed)
+    min_lat, min_lng, max_lat, max_lng = DELHI_BBOX
+
+    n_hot = int(n * hotspot_share)
+    n_centres = max(1, n_hot // 200)
+    centre_lat = rng.uniform(min_lat, max_lat, n_centres)
+    centre_lng = rng.uniform(min_lng, max_lng, n_centres)
+    pick = rng.integers(0, n_centres, n_hot)
+
+    lat = np.concatenate([
+        rng.uniform(min_lat, max_lat, n - n_hot),
+        centre_lat[pick] + rng.normal(0, 0.00045, n_hot),
+    ])
+    lng = np.concatenate([
+        rng.uniform(min_lng, max_lng, n - n_hot),
+        centre_lng[pick] + rng.normal(0, 0.0005, n_hot),
+    ])
+    created_at = int(time.time()) - rng.integers(0, WINDOW_SECONDS, n)
+    ward_id = rng.integers(1, 273, n)
+    return {"lat": lat, "lng": lng, "created_at": created_at, "ward_id": ward_id}
+
+
+def bench_python(reports: dict, radius_m: float, min_reports: int, min_days: int) -> tuple[float, float, int]:
+    """(seconds, peak MiB, hotspots)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    found = detect_hotspots(
+        reports["lat"],
+        reports["lng"],
+        reports["created_at"],
+        reports["ward_id"],
+        radius_m=radius_m,
+        min_reports=min_reports,
+        min_days=min_days,
+    )
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20, len(found["report_count"])
+
+
+def bench_sql(engine, reports: dict, radius_m: float, min_reports: int, min_days: int) -> tuple[float, int]:
+    """(seconds, hotspots) for ST_ClusterDBSCAN over a temp table of the same points"""
+    from sqlalchemy import text
+    from app.services.hotspot_service import METRIC_SRID
+
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TEMP TABLE bench_reports (
+                location GEOMETRY(POINT, 4326),
+                created_at TIMESTAMPTZ
+            ) ON COMMIT DROP
+        """))
+        conn.execute(text("""
+            INSERT INTO bench_reports (location, created_at)
+            SELECT ST_SetSRID(ST_MakePoint(lng, lat), 4326), to_timestamp(ts)
+            FROM unnest(
+                CAST(:lat AS double precision[]),
+                CAST(:lng AS double precision[]),
+                CAST(:ts AS bigint[])
+            ) AS p(lat, lng, ts)
+        """), {
+            "lat": reports["lat"].tolist(),
+            "lng": reports["lng"].tolist(),
+            "ts": reports["created_at"].tolist(),
+        })
+
+        start = time.perf_counter()
+        count = conn.execute(text("""
+            WITH report_clusters AS (
+                SELECT
+                    ST_ClusterDBSCAN(
+                        ST_Transform(location, :metric_srid),
+                        eps := :eps_m,
+                        minpoints := :min_points
+                    ) OVER () AS cluster_id,
+                    created_at
+                FROM bench_reports
+            )
+            SELECT COUNT(*) FROM (
+                SELECT cluster_id
+                FROM report_clusters
+                WHERE cluster_id IS NOT NULL
+                GROUP BY cluster_id
+                HAVING COUNT(*) >= :min_points
+                   AND COUNT(DISTINCT DATE(created_at)) >= :min_days
+            ) c
+        """), {
+            "metric_srid": METRIC_SRID,
+            "eps_m": radius_m,
+            "min_points": min_reports,
+            "min_days": min_days,
+        }).scalar()
+        return time.perf_counter() - start, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--radius", type=float, default=100.0, help="eps in metres")
+    parser.add_argument("--min-reports", type=int, default=5)
+    parser.add_argument("--min-days", type=int, default=3)
+    parser.add_argument("--sql", action="store_true", help="also time ST_ClusterDBSCAN (needs DATABASE_URL)")
+    args = parser.parse_args()
+
+    engine = None
+    if args.sql:
+        database_url = os.getenv("DATABASE_URL")
+        if not database_url:
+            parser.error("--sql needs DATABASE_URL")
+        from sqlalchemy import create_engine
+        engine = create_engine(database_url)
+
+    print(f"{'points':>10} {'python s':>10} {'peak MiB':>10} {'hotspots':>9}" + (f" {'sql s':>9} {'sql hs':>7}" if engine else ""))
+    for n in args.sizes:
+        reports = synthetic_reports(n)
+        seconds, peak, hotspots = bench_python(reports, args.radius, args.min_reports, args.min_days)
+        line = f"{n:>10} {seconds:>10.2f} {peak:>10.1f} {hotspots:>9}"
+        if engine is not None:
+            sql_seconds, sql_hotspots = bench_sql(engine, reports, args.radius, args.min_reports, args.min_days)
+            line += f" {sql_seconds:>9.2f} {sql_hotspots:>7}"
+        print(line, flush=True)
+
+
+if __name__ == "__main__":
+    main()
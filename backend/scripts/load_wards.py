@@ -1,11 +1,44 @@
+"""
+Load ward boundaries from a GeoJSON FeatureCollection into `wards`.
+
+    python scripts/load_wards.py                       # data/delhi_wards.geojson
+    python scripts/load_wards.py path/to/wards.geojson --workers 8 --batch-size 1000
+
+Features are streamed (ijson) rather than parsed whole, and repaired in a
+process pool: make_valid, polygonal parts only, forced to MULTIPOLYGON,
+with centroid (point on surface for concave wards) and bbox computed
+alongside; area is computed by PostGIS in the same transaction, exactly
+as the startup backfill does. Points and lines are skipped.
+Batches are COPYed as hex EWKB into a temp staging table, then merged into
+`wards` in one transaction keyed by ward_code: matched wards keep their id
+(and so their reports, hotspots and history; rows from before ward_code
+existed are matched by geometry or name first), new wards are inserted,
+missing wards are deleted, and the neighbour table is rebuilt. Readers
+see the old set until the commit.
+"""
+import argparse
+import io
 import json
-from sqlalchemy import create_engine, text
-from geoalchemy2 import Geometry
-from shapely.geometry import shape
-from shapely.ops import unary_union
 import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import create_engine, text
+from shapely import make_valid, set_srid, to_wkb
+from shapely.geometry import MultiPolygon, shape
 from dotenv import load_dotenv
 
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from app.gis.simplification import SIMPLIFY_TOLERANCES
+from app.gis.ward_geometry import AREA_SQ_KM, WardGeometry
+from app.models import Ward, WardGeometryLevel, WardNeighbour
+
+try:
+    import ijson
+except ImportError:  # falls back to json.load
+    ijson = None
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -19,49 +52,331 @@ GEOJSON_PATH = os.path.join(
     "delhi_wards.geojson"
 )
 
-def load_wards():
-    with open(GEOJSON_PATH, "r", encoding="utf-8") as f:
-        geojson = json.load(f)
+STAGING_COLUMNS = (
+    "ward_code", "ward_name", "geometry", "centroid_lat", "centroid_lng", "area_sq_km",
+    "bbox_min_lng", "bbox_min_lat", "bbox_max_lng", "bbox_max_lat",
+)
+# Columns the workers fill (area_sq_km is set in SQL after COPY)
+COPY_COLUMNS = tuple(column for column in STAGING_COLUMNS if column != "area_sq_km")
+# Columns a reload overwrites on matched wards (matched on ward_code)
+UPDATED_COLUMNS = STAGING_COLUMNS[1:]
 
-    with engine.begin() as conn:
-        # Create table if not exists
+# Wards loaded before ward_code existed adopt the code of the staged ward
+# within this Hausdorff distance (degrees, ~10 m), else of the staged ward
+# with the same (unique) name — so they keep their id, history and snapshots
+ADOPT_TOLERANCE_DEG = 0.0001
+
+ADOPT_CODES = """
+    WITH unclaimed AS (
+        SELECT s.*
+        FROM ward_staging s
+        WHERE NOT EXISTS (SELECT 1 FROM wards c WHERE c.ward_code = s.ward_code)
+    ),
+    candidates AS (
+        SELECT w.id, s.ward_code, ST_HausdorffDistance(w.geometry, s.geometry) AS distance
+        FROM wards w
+        JOIN unclaimed s
+          ON w.geometry && s.geometry
+         AND (ST_Equals(w.geometry, s.geometry) OR ST_HausdorffDistance(w.geometry, s.geometry) <= :tolerance)
+        WHERE w.ward_code IS NULL
+        UNION ALL
+        -- Name matches rank after any geometry match
+        SELECT w.id, s.ward_code, :tolerance * 2 AS distance
+        FROM wards w
+        JOIN unclaimed s ON s.ward_name = w.ward_name
+        WHERE w.ward_code IS NULL
+          AND s.ward_name IN (SELECT ward_name FROM ward_staging GROUP BY ward_name HAVING COUNT(*) = 1)
+    ),
+    best_per_ward AS (
+        SELECT DISTINCT ON (id) id, ward_code, distance
+        FROM candidates
+        ORDER BY id, distance
+    ),
+    best AS (
+        SELECT DISTINCT ON (ward_code) id, ward_code
+        FROM best_per_ward
+        ORDER BY ward_code, distance, id
+    )
+    UPDATE wards w
+    SET ward_code = b.ward_code
+    FROM best b
+    WHERE w.id = b.id
+"""
+
+
+def iter_features(path: str):
+    """Yield features one at a time without loading the whole file"""
+    with open(path, "rb") as f:
+        if ijson is None:
+            yield from json.load(f)["features"]
+        else:
+            yield from ijson.items(f, "features.item", use_float=True)
+
+
+def polygonal(geom) -> MultiPolygon | None:
+    """The polygon parts of `geom` as one MultiPolygon (None when there are none)"""
+    if geom.geom_type == "Polygon":
+        return MultiPolygon([geom])
+    if geom.geom_type == "MultiPolygon":
+        return geom
+    if geom.geom_type == "GeometryCollection":
+        polygons = []
+        for part in geom.geoms:
+            part = polygonal(part)
+            if part is not None:
+                polygons.extend(part.geoms)
+        return MultiPolygon(polygons) if polygons else None
+    return None
+
+
+def feature_to_row(feature: dict) -> tuple | None:
+    props = feature.get("properties") or {}
+    if not feature.get("geometry"):
+        return None
+
+    geom = shape(feature["geometry"])
+    if not geom.is_valid:
+        geom = make_valid(geom)
+    geom = polygonal(geom)
+    if geom is None or geom.is_empty:
+        return None
+
+    code = props.get("Ward_No") or props.get("ward_code") or props.get("@id")
+    name = props.get("Ward_Name") or props.get("ward_name") or props.get("name") or code
+    if code is None:
+        return None
+
+    # A concave ward's centroid can fall outside it (or inside a neighbour)
+    anchor = geom.centroid
+    if not geom.contains(anchor):
+        anchor = geom.representative_point()
+    return (
+        str(code),
+        str(name),
+        to_wkb(set_srid(geom, 4326), hex=True, include_srid=True),
+        anchor.y,
+        anchor.x,
+        *geom.bounds,
+    )
+
+
+def process_batch(features: list) -> tuple[list, int]:
+    """Worker: (staging rows, skipped count) for one batch of features"""
+    rows = []
+    for feature in features:
+        row = feature_to_row(feature)
+        if row is not None:
+            rows.append(row)
+    return rows, len(features) - len(rows)
+
+
+def batched(features, size: int):
+    batch = []
+    for feature in features:
+        batch.append(feature)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_rows(cursor, rows: list) -> None:
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(copy_value(v) for v in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY ward_staging ({', '.join(COPY_COLUMNS)}) FROM STDIN", buffer)
+
+
+def ensure_schema(conn) -> None:
+    """Create the ward tables, or bring an older `wards` table up to the model"""
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+    Ward.metadata.create_all(
+        conn, tables=[Ward.__table__, WardGeometryLevel.__table__, WardNeighbour.__table__]
+    )
+
+    WardGeometry.ensure_columns(conn)
+
+    # Early loads declared GEOMETRY(POLYGON)
+    geometry_type = conn.execute(text("""
+        SELECT type FROM geometry_columns
+        WHERE f_table_name = 'wards' AND f_geometry_column = 'geometry'
+    """)).scalar()
+    if geometry_type and geometry_type.upper() != "MULTIPOLYGON":
         conn.execute(text("""
-            CREATE EXTENSION IF NOT EXISTS postgis;
+            ALTER TABLE wards
+            ALTER COLUMN geometry TYPE GEOMETRY(MULTIPOLYGON, 4326) USING ST_Multi(geometry)
+        """))
+        print(f"Converted wards.geometry from {geometry_type} to MULTIPOLYGON")
+
+
+def merge_staging(conn) -> dict:
+    """Apply ward_staging to wards; returns counts per action"""
+    # Last occurrence of a duplicated code wins
+    conn.execute(text("""
+        DELETE FROM ward_staging a
+        USING ward_staging b
+        WHERE a.ward_code = b.ward_code AND a.ctid < b.ctid
+    """))
+    conn.execute(text(f"UPDATE ward_staging SET area_sq_km = {AREA_SQ_KM}"))
+    conn.execute(text("ANALYZE ward_staging"))
+
+    adopted = conn.execute(text(ADOPT_CODES), {"tolerance": ADOPT_TOLERANCE_DEG}).rowcount
+
+    updated = conn.execute(text(f"""
+        UPDATE wards w
+        SET {", ".join(f"{column} = s.{column}" for column in UPDATED_COLUMNS)},
+            geometry_updated_at = NOW()
+        FROM ward_staging s
+        WHERE w.ward_code = s.ward_code
+    """)).rowcount
+
+    inserted = conn.execute(text(f"""
+        INSERT INTO wards (
+            {", ".join(STAGING_COLUMNS)}, geometry_updated_at,
+            risk_score, risk_level, rainfall_mm, report_count, hotspot_count, drainage_stress, population_density
+        )
+        SELECT
+            {", ".join(f"s.{column}" for column in STAGING_COLUMNS)}, NOW(),
+            0, 'LOW', 0, 0, 0, 0.5, 0.5
+        FROM ward_staging s
+        WHERE NOT EXISTS (SELECT 1 FROM wards w WHERE w.ward_code = s.ward_code)
+    """)).rowcount
 
-            CREATE TABLE IF NOT EXISTS wards (
-                id SERIAL PRIMARY KEY,
-                ward_code VARCHAR(50),
-                ward_name VARCHAR(255),
-                geometry GEOMETRY(POLYGON, 4326)
-            );
+    removed = conn.execute(text("""
+        SELECT w.id FROM wards w
+        WHERE w.ward_code IS NULL
+           OR NOT EXISTS (SELECT 1 FROM ward_staging s WHERE s.ward_code = w.ward_code)
+    """)).scalars().all()
 
-            CREATE INDEX IF NOT EXISTS idx_wards_geom
-            ON wards USING GIST (geometry);
+    if removed:
+        # Re-home reports and hotspots of removed wards onto the ward that now contains them
+        conn.execute(
+            text("""
+                UPDATE reports r
+                SET ward_id = (
+                    SELECT w.id FROM wards w
+                    WHERE w.id <> ALL(:removed) AND ST_Intersects(w.geometry, r.location)
+                    LIMIT 1
+                )
+                WHERE r.ward_id = ANY(:removed)
+            """),
+            {"removed": removed}
+        )
+        conn.execute(
+            text("""
+                UPDATE hotspots h
+                SET ward_id = home.id,
+                    ward_name = COALESCE(home.ward_name, 'Unknown')
+                FROM hotspots o
+                LEFT JOIN LATERAL (
+                    SELECT w.id, w.ward_name FROM wards w
+                    WHERE w.id <> ALL(:removed) AND ST_Intersects(w.geometry, o.location)
+                    LIMIT 1
+                ) home ON TRUE
+                WHERE h.id = o.id AND o.ward_id = ANY(:removed)
+            """),
+            {"removed": removed}
+        )
+        conn.execute(text("DELETE FROM wards WHERE id = ANY(:removed)"), {"removed": removed})
+
+    return {"adopted": adopted, "updated": updated, "inserted": inserted, "removed": len(removed)}
+
+
+def load_wards(path: str = GEOJSON_PATH, workers: int | None = None, batch_size: int = 512):
+    started = time.perf_counter()
+    loaded = skipped = 0
+
+    with engine.begin() as conn:
+        ensure_schema(conn)
+        conn.execute(text("""
+            CREATE TEMP TABLE ward_staging (
+                ward_code TEXT NOT NULL,
+                ward_name TEXT NOT NULL,
+                geometry GEOMETRY(MULTIPOLYGON, 4326) NOT NULL,
+                centroid_lat DOUBLE PRECISION,
+                centroid_lng DOUBLE PRECISION,
+                area_sq_km DOUBLE PRECISION,
+                bbox_min_lng DOUBLE PRECISION,
+                bbox_min_lat DOUBLE PRECISION,
+                bbox_max_lng DOUBLE PRECISION,
+                bbox_max_lat DOUBLE PRECISION
+            ) ON COMMIT DROP
         """))
+        cursor = conn.connection.cursor()
+
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Bounded in flight: parsing never runs far ahead of COPY
+            pending = deque()
+
+            def drain(limit: int):
+                nonlocal loaded, skipped
+                while len(pending) > limit:
+                    rows, dropped = pending.popleft().result()
+                    copy_rows(cursor, rows)
+                    loaded += len(rows)
+                    skipped += dropped
+
+            for batch in batched(iter_features(path), batch_size):
+                pending.append(pool.submit(process_batch, batch))
+                drain(workers * 2)
+            drain(0)
+
+        parsed = time.perf_counter()
+        print(f"Staged {loaded} ward(s), skipped {skipped} non-polygonal feature(s) "
+              f"in {parsed - started:.2f}s")
+        if loaded == 0:
+            raise SystemExit("No polygonal features found — leaving wards untouched")
+
+        counts = merge_staging(conn)
+        counts["neighbour_pairs"] = WardGeometry.rebuild_neighbours(conn) // 2
+        conn.execute(text("DELETE FROM ward_geometry_levels"))
+        precompute_simplified_levels(conn)
 
-        # Clear existing wards (safe for dev)
-        conn.execute(text("DELETE FROM wards;"))
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("ANALYZE wards"))
 
-        for feature in geojson["features"]:
-            props = feature["properties"]
-            geom = shape(feature["geometry"])
+    print(f"✅ Wards loaded: {counts['inserted']} inserted, {counts['updated']} updated "
+          f"({counts['adopted']} matched to pre-ward_code rows), "
+          f"{counts['removed']} removed, {counts['neighbour_pairs']} neighbour pair(s) in {time.perf_counter() - started:.2f}s")
 
-            ward_code = props.get("Ward_No") or props.get("ward_code")
-            ward_name = props.get("Ward_Name") or props.get("ward_name")
 
-            conn.execute(
-                text("""
-                    INSERT INTO wards (ward_code, ward_name, geometry)
-                    VALUES (:code, :name, ST_SetSRID(ST_GeomFromGeoJSON(:geom), 4326))
-                """),
-                {
-                    "code": ward_code,
-                    "name": ward_name,
-                    "geom": json.dumps(feature["geometry"])
-                }
-            )
+def precompute_simplified_levels(conn):
+    """Store a topology-preserving simplified copy of every ward per tolerance"""
+    for tolerance in SIMPLIFY_TOLERANCES:
+        if tolerance <= 0:
+            continue  # level 0 is the original geometry
+        conn.execute(
+            text("""
+                INSERT INTO ward_geometry_levels (ward_id, tolerance, geometry)
+                SELECT id, :tol, ST_SimplifyPreserveTopology(geometry, :tol)
+                FROM wards
+                WHERE geometry IS NOT NULL
+            """),
+            {"tol": tolerance}
+        )
+    print(f"✅ Precomputed {len(SIMPLIFY_TOLERANCES) - 1} simplification level(s)")
 
-    print("✅ Delhi wards loaded successfully")
 
 if __name__ == "__main__":
-    load_wards()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", default=GEOJSON_PATH, help="GeoJSON FeatureCollection")
+    parser.add_argument("--workers", type=int, default=None, help="geometry worker processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=512, help="features per worker batch / COPY")
+    args = parser.parse_args()
+    load_wards(args.path, workers=args.workers, batch_size=args.batch_size)
@@ -0,0 +1,105 @@
+"""
+Migrate an existing, unpartitioned `reports` table to monthly RANGE
+partitions on created_at, in one transaction.
+
+    python scripts/partition_reports.py                # keeps the old table as reports_legacy
+    python scripts/partition_reports.py --drop-legacy
+
+Steps: lock reports, rename it (and its indexes) to *_legacy, create the
+partitioned table from the ORM model (PK (id, created_at), GiST on
+location, BRIN on created_at, (ward_id, created_at), keyset index), create
+one partition per month from the oldest report to REPORT_PARTITIONS_AHEAD
+months ahead plus a DEFAULT partition for anything outside them, copy the
+rows, and hand the id sequence to the new table. Tables from before
+reports.ingest_id get the column first, so its unique index can be built.
+Readers and writers block on the lock for the duration of the copy.
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timezone
+from sqlalchemy import create_engine, text
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from app.config import settings
+from app.models import Report
+from app.services.report_partitions import ReportPartitions
+from app.utils.partitions import ensure_default_partition, ensure_monthly_partitions, month_start
+
+load_dotenv()
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+engine = create_engine(DATABASE_URL)
+
+
+def months_between(start: datetime, end: datetime) -> int:
+    return (end.year - start.year) * 12 + end.month - start.month
+
+
+def partition_reports(drop_legacy: bool = False):
+    with engine.begin() as conn:
+        if ReportPartitions.is_partitioned(conn):
+            print("reports is already partitioned — nothing to do")
+            return
+
+        conn.execute(text("LOCK TABLE reports IN ACCESS EXCLUSIVE MODE"))
+        # The partition key can't be NULL
+        conn.execute(text("UPDATE reports SET created_at = NOW() WHERE created_at IS NULL"))
+        # The model's indexes (created below) include ux_reports_ingest_id_created_at
+        conn.execute(text("ALTER TABLE reports ADD COLUMN IF NOT EXISTS ingest_id VARCHAR"))
+
+        # Free the table and index names for the new table
+        conn.execute(text("ALTER TABLE reports RENAME TO reports_legacy"))
+        legacy_indexes = conn.execute(text("""
+            SELECT indexname FROM pg_indexes WHERE tablename = 'reports_legacy'
+        """)).scalars().all()
+        for name in legacy_indexes:
+            conn.execute(text(f'ALTER INDEX "{name}" RENAME TO "{name}_legacy"'))
+
+        conn.execute(text("""
+            CREATE TABLE reports (LIKE reports_legacy INCLUDING DEFAULTS)
+            PARTITION BY RANGE (created_at)
+        """))
+        conn.execute(text("ALTER TABLE reports ALTER COLUMN created_at SET NOT NULL"))
+        conn.execute(text("ALTER TABLE reports ADD CONSTRAINT reports_pkey PRIMARY KEY (id, created_at)"))
+        conn.execute(text("""
+            ALTER TABLE reports
+            ADD CONSTRAINT reports_ward_id_fkey FOREIGN KEY (ward_id) REFERENCES wards(id)
+        """))
+
+        now = datetime.now(timezone.utc)
+        oldest = conn.execute(text("SELECT MIN(created_at) FROM reports_legacy")).scalar() or now
+        first = month_start(oldest)
+        ensure_monthly_partitions(
+            conn, "reports", first,
+            months_ahead=months_between(first, month_start(now)) + settings.REPORT_PARTITIONS_AHEAD,
+        )
+        ensure_default_partition(conn, "reports")
+
+        copied = conn.execute(text("INSERT INTO reports SELECT * FROM reports_legacy")).rowcount
+        print(f"Copied {copied} report(s)")
+
+        # Indexes after the copy (faster than maintaining them row by row)
+        for index in Report.__table__.indexes:
+            index.create(conn, checkfirst=True)
+
+        sequence = conn.execute(text("SELECT pg_get_serial_sequence('reports_legacy', 'id')")).scalar()
+        if sequence:
+            conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY reports.id"))
+
+        if drop_legacy:
+            conn.execute(text("DROP TABLE reports_legacy"))
+            print("Dropped reports_legacy")
+
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("ANALYZE reports"))
+    print("✅ reports is now partitioned by month")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--drop-legacy", action="store_true", help="drop the old table after the copy")
+    args = parser.parse_args()
+    partition_reports(drop_legacy=args.drop_legacy)
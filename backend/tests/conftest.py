@@ -0,0 +1,9 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# Database tests run against TEST_DATABASE_URL (PostgreSQL + PostGIS) and
+# are skipped without it. Never fall through to a configured DATABASE_URL.
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL or "postgresql+psycopg2://test@localhost/test"
@@ -0,0 +1,136 @@
+"""FirebaseTokenVerifier against a locally generated RSA key set"""
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from jose import JWTError, jwt
+
+from app.services.auth import FirebaseTokenVerifier
+
+PROJECT_ID = "test-project"
+ISSUER = f"https://securetoken.google.com/{PROJECT_ID}"
+CERTS_URL = "https://certs.test/x509"
+
+
+def make_key(common_name: str) -> tuple[str, str]:
+    """(private key PEM, self-signed x509 certificate PEM) — the shape Google serves"""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, common_name)])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    return private_pem, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+KEYS = {kid: make_key(kid) for kid in ("key-1", "key-2")}
+
+
+def make_token(kid: str = "key-1", **overrides) -> str:
+    now = int(time.time())
+    claims = {
+        "aud": PROJECT_ID,
+        "iss": ISSUER,
+        "sub": "user-1",
+        "email": "someone@example.com",
+        "iat": now,
+        "auth_time": now,
+        "exp": now + 3600,
+        **overrides,
+    }
+    return jwt.encode(claims, KEYS[kid][0], algorithm="RS256", headers={"kid": kid})
+
+
+class CertsServer:
+    """Mock transport serving a {kid: cert} set and counting fetches"""
+
+    def __init__(self, kids):
+        self.kids = list(kids)
+        self.fetches = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.fetches += 1
+        body = json.dumps({kid: KEYS[kid][1] for kid in self.kids})
+        return httpx.Response(200, content=body, headers={"cache-control": "public, max-age=3600"})
+
+
+def make_verifier(server: CertsServer) -> FirebaseTokenVerifier:
+    return FirebaseTokenVerifier(
+        project_id=PROJECT_ID,
+        certs_url=CERTS_URL,
+        cache_size=100,
+        cache_seconds=300,
+        transport=httpx.MockTransport(server),
+    )
+
+
+def test_valid_token():
+    server = CertsServer(["key-1"])
+    verifier = make_verifier(server)
+
+    claims = asyncio.run(verifier.verify(make_token()))
+    assert claims["sub"] == "user-1"
+    # Second check is served from the claims cache and the cached certs
+    asyncio.run(verifier.verify(make_token()))
+    assert server.fetches == 1
+
+
+@pytest.mark.parametrize("overrides", [
+    {"aud": "other-project"},
+    {"iss": "https://securetoken.google.com/other-project"},
+])
+def test_wrong_audience_or_issuer(overrides):
+    verifier = make_verifier(CertsServer(["key-1"]))
+    with pytest.raises(JWTError):
+        asyncio.run(verifier.verify(make_token(**overrides)))
+
+
+def test_expired_token():
+    verifier = make_verifier(CertsServer(["key-1"]))
+    past = int(time.time()) - 7200
+    with pytest.raises(JWTError):
+        asyncio.run(verifier.verify(make_token(iat=past, auth_time=past, exp=past + 3600)))
+
+
+def test_unknown_kid_is_throttled():
+    server = CertsServer(["key-1"])
+    verifier = make_verifier(server)
+    asyncio.run(verifier.verify(make_token()))
+    assert server.fetches == 1
+
+    # key-2 isn't served: one forced refetch, then it is known-unknown until the next refresh
+    for _ in range(5):
+        with pytest.raises(JWTError):
+            asyncio.run(verifier.verify(make_token(kid="key-2")))
+    assert server.fetches == 2
+
+
+def test_key_rotation():
+    server = CertsServer(["key-1"])
+    verifier = make_verifier(server)
+    asyncio.run(verifier.verify(make_token()))
+
+    # Google starts signing with key-2 before our cached set expires
+    server.kids = ["key-1", "key-2"]
+    claims = asyncio.run(verifier.verify(make_token(kid="key-2")))
+    assert claims["sub"] == "user-1"
+    assert server.fetches == 2
@@ -0,0 +1,34 @@
+"""DATABASE_URL translation for the asyncpg engine"""
+import ssl
+
+from app.database import asyncpg_url
+
+
+def test_plain_url_switches_driver():
+    url, connect_args = asyncpg_url("postgresql+psycopg2://user:pw@db:5432/app")
+    assert url.drivername == "postgresql+asyncpg"
+    assert url.host == "db" and url.database == "app"
+    assert connect_args == {}
+
+
+def test_sslmode_becomes_ssl():
+    url, connect_args = asyncpg_url("postgresql://u@db/app?sslmode=require&application_name=api&connect_timeout=5")
+    assert dict(url.query) == {}
+    assert connect_args == {"ssl": "require", "timeout": 5.0, "server_settings": {"application_name": "api"}}
+
+
+def test_other_params_are_kept():
+    url, _ = asyncpg_url("postgresql://u@db/app?sslmode=disable&prepared_statement_cache_size=0")
+    assert dict(url.query) == {"prepared_statement_cache_size": "0"}
+
+
+def test_root_cert_builds_ssl_context(tmp_path):
+    from tests.test_auth import make_key
+
+    cafile = tmp_path / "root.crt"
+    cafile.write_text(make_key("test-ca")[1])
+    url, connect_args = asyncpg_url(f"postgresql://u@db/app?sslmode=verify-full&sslrootcert={cafile}")
+    context = connect_args["ssl"]
+    assert isinstance(context, ssl.SSLContext)
+    assert context.check_hostname and context.verify_mode == ssl.CERT_REQUIRED
+    assert dict(url.query) == {}
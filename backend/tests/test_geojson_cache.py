@@ -0,0 +1,111 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+from starlette.requests import Request
+
+from app.gis.geojson_cache import CachedPayload, GeoJSONCache, HeadedPayload, choose_encoding
+
+BOTH = ("br", "gzip")
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("", None),
+    ("gzip", "gzip"),
+    ("gzip, deflate, br", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("gzip;q=0", None),
+    ("GZIP ; Q=0.5", "gzip"),
+    ("br;q=0.2, gzip;q=0.8", "gzip"),
+    ("*", "br"),
+    ("*;q=0.5, br;q=0", "gzip"),
+    ("identity", None),
+    ("gzip;q=bogus", None),
+    ("embr, xgzip", None),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header, BOTH) == expected
+
+
+def test_choose_encoding_without_brotli():
+    assert choose_encoding("br", ("gzip",)) is None
+    assert choose_encoding("br, gzip;q=0.1", ("gzip",)) == "gzip"
+
+
+def request_with(accept_encoding: str) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    })
+
+
+def test_serve_refused_gzip_gets_identity():
+    entry = CachedPayload({"type": "FeatureCollection", "features": []})
+
+    response = GeoJSONCache.serve(request_with("gzip;q=0"), entry)
+
+    assert "content-encoding" not in response.headers
+    assert json.loads(response.body) == {"type": "FeatureCollection", "features": []}
+
+
+def test_serve_gzip():
+    entry = CachedPayload({"a": 1})
+
+    response = GeoJSONCache.serve(request_with("br;q=0, gzip"), entry)
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.body)) == {"a": 1}
+
+
+def test_build_overlapping_invalidate_is_not_stored():
+    cache = GeoJSONCache()
+    version = {"n": 1}
+
+    def stale_build():
+        data = {"version": version["n"]}
+        cache.invalidate("wards")  # data changes while this build is in flight
+        version["n"] = 2
+        return data
+
+    assert json.loads(cache.get("wards", stale_build).body) == {"version": 1}
+    assert json.loads(cache.get("wards", lambda: {"version": version["n"]}).body) == {"version": 2}
+
+
+def test_async_build_overlapping_invalidate_is_not_stored():
+    cache = GeoJSONCache()
+
+    async def stale_build():
+        cache.invalidate()
+        return {"stale": True}
+
+    async def fresh_build():
+        return {"stale": False}
+
+    async def run():
+        first = await cache.aget(("wards-risk", 0.0, 7), stale_build, bounded=True)
+        second = await cache.aget(("wards-risk", 0.0, 7), fresh_build, bounded=True)
+        return json.loads(first.body), json.loads(second.body)
+
+    assert asyncio.run(run()) == ({"stale": True}, {"stale": False})
+
+
+def test_headers_are_cached_with_their_body():
+    cache = GeoJSONCache()
+    version = {"n": 1}
+
+    async def build():
+        return HeadedPayload({"version": version["n"]}, {"X-Snapshot-Version": str(version["n"])})
+
+    async def run():
+        await cache.aresponse(request_with(""), "wards-risk", build)
+        version["n"] = 2  # a new snapshot lands but this entry wasn't invalidated
+        return await cache.aresponse(request_with(""), "wards-risk", build)
+
+    response = asyncio.run(run())
+
+    assert json.loads(response.body) == {"version": 1}
+    assert response.headers["x-snapshot-version"] == "1"
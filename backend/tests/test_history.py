@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta, timezone
+
+from app.config import settings
+from app.services.history_service import HistoryService
+
+UTC = timezone.utc
+
+
+def test_buckets_follow_ist_midnight(monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_TIMEZONE", "Asia/Kolkata")
+
+    # 19:00 UTC is 00:30 IST the next day
+    hour, hour_end, day, day_end = HistoryService.buckets(datetime(2026, 10, 17, 19, 0, tzinfo=UTC))
+
+    assert hour.astimezone(UTC) == datetime(2026, 10, 17, 18, 30, tzinfo=UTC)
+    assert hour_end - hour == timedelta(hours=1)
+    assert day.astimezone(UTC) == datetime(2026, 10, 17, 18, 30, tzinfo=UTC)
+    assert day_end.astimezone(UTC) == datetime(2026, 10, 18, 18, 30, tzinfo=UTC)
+
+
+def test_hour_buckets_tile_the_day(monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_TIMEZONE", "Asia/Kolkata")
+    now = datetime(2026, 10, 17, 6, 45, tzinfo=UTC)
+
+    _, _, day, day_end = HistoryService.buckets(now)
+    hours = {HistoryService.buckets(day + timedelta(minutes=30 + 60 * i))[0] for i in range(24)}
+
+    assert len(hours) == 24
+    assert min(hours) == day
+    assert max(hours) + timedelta(hours=1) == day_end
+
+
+def test_buckets_in_utc(monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_TIMEZONE", "UTC")
+
+    _, _, day, day_end = HistoryService.buckets(datetime(2026, 10, 17, 19, 0, tzinfo=UTC))
+
+    assert day.astimezone(UTC) == datetime(2026, 10, 17, tzinfo=UTC)
+    assert day_end - day == timedelta(days=1)
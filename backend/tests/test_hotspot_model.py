@@ -0,0 +1,16 @@
+import re
+
+from app.models import Hotspot
+from app.services.hotspot_service import DENORMALISED_COLUMNS, INSERT_HOTSPOTS_FROM_CLUSTERS
+
+
+def test_cluster_insert_only_writes_model_columns():
+    # create_all builds hotspots from the model, so every column the writer names must be declared
+    names = re.search(r"INSERT INTO hotspots \((.*?)\)", INSERT_HOTSPOTS_FROM_CLUSTERS, re.S).group(1)
+    written = {name.strip() for name in names.split(",")}
+
+    assert written <= set(Hotspot.__table__.columns.keys())
+
+
+def test_denormalised_columns_are_declared():
+    assert {name for name, _ in DENORMALISED_COLUMNS} <= set(Hotspot.__table__.columns.keys())
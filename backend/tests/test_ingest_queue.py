@@ -0,0 +1,135 @@
+import asyncio
+import json
+import os
+
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.schemas import ReportCreate
+from app.services import ingest_queue
+from app.services.ingest_queue import ReportIngestQueue, journal_slot_path
+
+
+def make_queue(tmp_path) -> ReportIngestQueue:
+    return ReportIngestQueue(str(tmp_path / "reports.jsonl"), batch_size=50, flush_ms=10, stop_timeout=5)
+
+
+def make_report(i: int = 0) -> ReportCreate:
+    return ReportCreate(latitude=28.6 + i * 1e-4, longitude=77.2, severity="HIGH", description=f"report {i}")
+
+
+def read_lines(path: str) -> list[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_outage_keeps_records_unacknowledged(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest_queue, "RETRY_BASE_DELAY", 0.01)
+    monkeypatch.setattr(ingest_queue, "RETRY_MAX_DELAY", 0.02)
+    queue = make_queue(tmp_path)
+    written, failures = [], []
+
+    def write_batch(records):
+        if len(failures) < 20:
+            failures.append(1)
+            raise OperationalError("INSERT", {}, Exception("connection refused"))
+        written.extend(r["ingest_id"] for r in records)
+
+    async def run():
+        await queue.start()
+        queue._write_batch = write_batch
+        ids = [queue.submit(make_report(i)) for i in range(3)]
+        await queue.stop()
+        return ids
+
+    ids = asyncio.run(run())
+
+    assert written == ids
+    assert read_lines(queue.dead_letter_path) == []
+
+
+def test_data_error_dead_letters_only_the_bad_record(tmp_path):
+    queue = make_queue(tmp_path)
+    written = []
+
+    async def run():
+        await queue.start()
+        ids = [queue.submit(make_report(i)) for i in range(3)]
+
+        def write_batch(records):
+            if ids[1] in [r["ingest_id"] for r in records]:
+                raise IntegrityError("INSERT", {}, Exception("violates check constraint"))
+            written.extend(r["ingest_id"] for r in records)
+
+        queue._write_batch = write_batch
+        await queue.stop()
+        return ids
+
+    ids = asyncio.run(run())
+
+    assert written == [ids[0], ids[2]]
+    assert [r["ingest_id"] for r in read_lines(queue.dead_letter_path)] == [ids[1]]
+
+
+def test_unwritten_records_are_replayed_on_restart(tmp_path):
+    first = make_queue(tmp_path)
+
+    def database_down(records):
+        raise OperationalError("INSERT", {}, Exception("down"))
+
+    async def crash():
+        await first.start()
+        first._write_batch = database_down
+        ingest_id = first.submit(make_report())
+        await first.stop()  # times out: the record stays journaled
+        return ingest_id
+
+    first.stop_timeout = 0.05
+    ingest_id = asyncio.run(crash())
+
+    second = make_queue(tmp_path)
+    written = []
+
+    async def restart():
+        await second.start()
+        second._write_batch = lambda records: written.extend(r["ingest_id"] for r in records)
+        await second.stop()
+
+    asyncio.run(restart())
+    assert written == [ingest_id]
+
+
+def test_processes_claim_separate_journals(tmp_path):
+    base = str(tmp_path / "reports.jsonl")
+    a, b = make_queue(tmp_path), make_queue(tmp_path)
+
+    async def run():
+        await a.start()
+        await b.start()
+        paths = (a.journal_path, b.journal_path)
+        await b.stop()
+        await a.stop()
+        return paths
+
+    assert asyncio.run(run()) == (base, journal_slot_path(base, 1))
+    assert journal_slot_path(base, 1) == str(tmp_path / "reports-1.jsonl")
+
+
+def test_stale_journal_is_adopted(tmp_path):
+    stale = journal_slot_path(str(tmp_path / "reports.jsonl"), 3)
+    with open(stale, "w") as f:
+        f.write(json.dumps({"ingest_id": "abc", "received_at": "2026-10-17T10:00:00", "report": make_report().model_dump()}) + "\n")
+
+    queue = make_queue(tmp_path)
+    written = []
+
+    async def run():
+        await queue.start()
+        queue._write_batch = lambda records: written.extend(r["ingest_id"] for r in records)
+        await queue.stop()
+
+    asyncio.run(run())
+
+    assert written == ["abc"]
+    assert os.path.getsize(stale) == 0
@@ -0,0 +1,128 @@
+"""
+Query-count regression tests: listing reports and the admin dashboard must
+issue the same number of statements however many reports there are (no
+per-row ward lookups).
+"""
+import asyncio
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+if not os.getenv("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL (PostGIS) not set", allow_module_level=True)
+
+import httpx
+from sqlalchemy import event, text
+
+from app.database import Base, SessionLocal, async_engine, engine
+from app.main import app
+from app.services.auth import require_admin
+from app.utils.partitions import add_months, ensure_monthly_partitions, month_start
+
+# Below the dashboard's 20 recent reports, so a per-row lookup there would show
+N = 10
+
+WARD_SQUARES = [
+    (1, "Ward A", "MULTIPOLYGON(((77.0 28.5, 77.1 28.5, 77.1 28.6, 77.0 28.6, 77.0 28.5)))"),
+    (2, "Ward B", "MULTIPOLYGON(((77.1 28.5, 77.2 28.5, 77.2 28.6, 77.1 28.6, 77.1 28.5)))"),
+    (3, "Ward C", "MULTIPOLYGON(((77.2 28.5, 77.3 28.5, 77.3 28.6, 77.2 28.6, 77.2 28.5)))"),
+]
+
+
+@pytest.fixture(scope="module")
+def database():
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    start = add_months(month_start(datetime.now(timezone.utc)), -1)
+    ensure_monthly_partitions(db, "reports", start, months_ahead=2)
+    for ward_id, name, wkt in WARD_SQUARES:
+        db.execute(
+            text("INSERT INTO wards (id, ward_name, geometry) VALUES (:id, :name, ST_GeomFromText(:wkt, 4326))"),
+            {"id": ward_id, "name": name, "wkt": wkt},
+        )
+    db.commit()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def seed_reports(db, total: int) -> None:
+    """Top the reports table up to `total` rows, spread over the wards"""
+    existing = db.execute(text("SELECT COUNT(*) FROM reports")).scalar()
+    db.execute(
+        text("""
+            INSERT INTO reports (latitude, longitude, location, severity, description, user_id, ward_id, created_at)
+            SELECT
+                28.55,
+                77.05 + (i % 3) * 0.1,
+                ST_SetSRID(ST_MakePoint(77.05 + (i % 3) * 0.1, 28.55), 4326),
+                'MEDIUM',
+                'seeded',
+                'test',
+                1 + i % 3,
+                NOW() - make_interval(secs => i)
+            FROM generate_series(:first, :last) AS i
+        """),
+        {"first": existing, "last": total - 1},
+    )
+    db.commit()
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def count_queries(paths: list[str]) -> dict[str, int]:
+    """Statements executed (sync + async engines) by one GET of each path"""
+    counter = QueryCounter()
+    engines = [engine, async_engine.sync_engine]
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            counts = {}
+            for path in paths:
+                await client.get(path)  # warm-up: connection setup isn't per-row work
+                counter.count = 0
+                response = await client.get(path)
+                assert response.status_code == 200, response.text
+                counts[path] = counter.count
+        await async_engine.dispose()
+        return counts
+
+    for target in engines:
+        event.listen(target, "before_cursor_execute", counter)
+    try:
+        return asyncio.run(run())
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", counter)
+
+
+PATHS = [
+    "/api/reports/all",
+    "/api/reports/all?limit=5000",
+    "/api/admin/dashboard",
+]
+
+
+def test_query_count_does_not_grow_with_reports(database):
+    app.dependency_overrides[require_admin] = lambda: {"uid": "admin", "is_admin": True}
+    try:
+        seed_reports(database, N)
+        small = count_queries(PATHS)
+        seed_reports(database, 10 * N)
+        large = count_queries(PATHS)
+    finally:
+        app.dependency_overrides.pop(require_admin, None)
+
+    assert large == small
@@ -0,0 +1,39 @@
+import pytest
+from pydantic import ValidationError
+
+from app.schemas import ReportCreate
+from app.services.report_service import ReportService
+
+
+def item(**overrides) -> dict:
+    return {"latitude": 28.61, "longitude": 77.21, "severity": "HIGH", **overrides}
+
+
+@pytest.mark.parametrize("overrides", [
+    {"latitude": 90.5},
+    {"latitude": -91},
+    {"longitude": 180.01},
+    {"longitude": -200},
+    {"latitude": float("nan")},
+    {"longitude": float("inf")},
+    {"description": "flooded\x00"},
+])
+def test_report_schema_rejects(overrides):
+    with pytest.raises(ValidationError):
+        ReportCreate.model_validate(item(**overrides))
+
+
+def test_report_schema_accepts_edges():
+    report = ReportCreate.model_validate(item(latitude=-90, longitude=180))
+    assert (report.latitude, report.longitude) == (-90, 180)
+
+
+def test_validate_bulk_names_each_bad_index():
+    items = [item(), item(latitude=123), item(severity="EXTREME"), item(longitude=-181), "not an object"]
+
+    valid, errors = ReportService.validate_bulk(items)
+
+    assert [index for index, _ in valid] == [0]
+    assert [e["index"] for e in errors] == [1, 2, 3, 4]
+    assert errors[0]["error"].startswith("latitude:")
+    assert errors[2]["error"].startswith("longitude:")
@@ -0,0 +1,40 @@
+import pytest
+
+from app.prediction.risk_calculator import RiskCalculator
+from app.services.risk_service import RiskService
+
+
+@pytest.fixture
+def risk_service(monkeypatch):
+    monkeypatch.setattr(RiskService, "_counters", None)
+    monkeypatch.setattr(RiskService, "_seed_increments", None)
+    monkeypatch.setattr(RiskService, "_dirty", set())
+    monkeypatch.setattr(RiskService, "_arm_timer", staticmethod(lambda: None))
+    return RiskService
+
+
+def test_reports_ingested_during_seed_are_kept(risk_service, monkeypatch):
+    def load_ward_aggregates(db):
+        # The ingest writer commits and counts a report while the aggregates are read
+        risk_service.on_reports_ingested([object(), object()], [7, 8])
+        return {7: {"recent_reports": 3, "report_count": 10, "hotspot_count": 1}}
+
+    monkeypatch.setattr(RiskCalculator, "load_ward_aggregates", staticmethod(load_ward_aggregates))
+
+    risk_service.seed(db=None)
+
+    assert risk_service._counters[7] == {"recent_reports": 4, "report_count": 11, "hotspot_count": 1}
+    assert risk_service._counters[8] == {"recent_reports": 1, "report_count": 1}
+    assert risk_service._seed_increments is None
+
+
+def test_failed_seed_stops_recording(risk_service, monkeypatch):
+    def load_ward_aggregates(db):
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(RiskCalculator, "load_ward_aggregates", staticmethod(load_ward_aggregates))
+
+    with pytest.raises(RuntimeError):
+        risk_service.seed(db=None)
+    assert risk_service._seed_increments is None
+    assert risk_service._counters is None
@@ -0,0 +1,35 @@
+"""Simulation request validation (rejected before the feature matrix is loaded, so no database needed)"""
+import asyncio
+
+import httpx
+import pytest
+
+from app.main import app
+from app.services.auth import require_admin
+
+
+def post_simulation(body: str) -> httpx.Response:
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(
+                "/api/admin/simulate", content=body, headers={"content-type": "application/json"}
+            )
+
+    app.dependency_overrides[require_admin] = lambda: {"uid": "admin", "is_admin": True}
+    try:
+        return asyncio.run(run())
+    finally:
+        app.dependency_overrides.pop(require_admin, None)
+
+
+@pytest.mark.parametrize("body", [
+    '{"ward_rainfall": {"1": -5}}',
+    '{"ward_rainfall": {"1": 10, "2": NaN}}',
+    '{"ward_rainfall": {"1": Infinity}}',
+    '{"rainfall_multiplier": NaN}',
+    '{"rainfall_multipliers": [1.0, 12]}',
+])
+def test_invalid_simulation_inputs_are_rejected(body):
+    response = post_simulation(body)
+    assert response.status_code == 400, response.text
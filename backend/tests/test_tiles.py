@@ -0,0 +1,45 @@
+from app.gis.tiles import REPORT_MIN_ZOOM, TileCache, lnglat_to_tile
+
+LAT, LNG = 28.61, 77.21
+
+
+def test_tile_invalidated_mid_build_is_not_stored():
+    cache = TileCache(64)
+    key = (REPORT_MIN_ZOOM, *lnglat_to_tile(LNG, LAT, REPORT_MIN_ZOOM))
+
+    generation = cache.generation()
+    cache.invalidate_point(LAT, LNG)  # a report lands while the tile query runs
+
+    assert not cache.set_if_current(key, b"stale", generation)
+    assert cache.get(key) is None
+    assert cache.set_if_current(key, b"fresh", cache.generation())
+    assert cache.get(key) == b"fresh"
+
+
+def test_other_tiles_survive_unrelated_invalidation():
+    cache = TileCache(64)
+    far_key = (REPORT_MIN_ZOOM, *lnglat_to_tile(72.87, 19.07, REPORT_MIN_ZOOM))
+
+    generation = cache.generation()
+    cache.invalidate_point(LAT, LNG)
+
+    assert cache.set_if_current(far_key, b"tile", generation)
+
+
+def test_clear_mid_build_discards_every_tile():
+    cache = TileCache(64)
+
+    generation = cache.generation()
+    cache.clear()
+
+    assert not cache.set_if_current((3, 1, 1), b"stale", generation)
+
+
+def test_forgotten_invalidations_are_treated_as_overlapping():
+    cache = TileCache(4)
+    key = (0, 0, 0)
+
+    generation = cache.generation()
+    cache.invalidate_point(LAT, LNG)  # marks more keys than the cache remembers
+
+    assert not cache.set_if_current(key, b"maybe stale", generation)